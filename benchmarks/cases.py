@@ -0,0 +1,97 @@
+# Copyright © 2023 Electric Power Research Institute, Inc. All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+# · Redistributions of source code must retain the above copyright notice,
+#   this list of conditions and the following disclaimer.
+# · Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+# · Neither the name of the EPRI nor the names of its contributors may be used
+#   to endorse or promote products derived from this software without specific
+#   prior written permission.
+
+
+"""
+Circuits used by the benchmark suite: the bundled test circuit, the IEEE 34-bus feeder and synthetic radial feeders
+of a chosen size (refer to opender_interface.FeederGenerator).
+"""
+
+import os
+import pathlib
+import tempfile
+from typing import Dict, List
+from opender import DERCommonFileFormat
+from opender_interface import DERInterface, OpenDSSInterface, FeederGenerator
+
+repo_path = pathlib.Path(os.path.dirname(__file__)).parents[0]
+
+
+class Case:
+    """
+    A benchmark circuit, with the DER type and the DER settings used to create OpenDER objects
+    """
+
+    def __init__(self, name: str, dss_file: str, der_sim_type: str = 'pvsystem', der_file: DERCommonFileFormat = None,
+                 commands: List[str] = None, vr: bool = False):
+        """
+        :param name: Case name used in the benchmark results
+        :param dss_file: DSS file of the circuit
+        :param der_sim_type: Circuit element which represents DERs
+        :param der_file: DER settings of the OpenDER objects
+        :param commands: Optional DSS commands executed before initialization, e.g. to add DERs
+        :param vr: If True, voltage regulator models are created to replace the ones in the circuit
+        """
+        self.name = name
+        self.dss_file = str(dss_file)
+        self.der_sim_type = der_sim_type
+        self.der_file = der_file if der_file is not None else DERCommonFileFormat(NP_VA_MAX=300e3,
+                                                                                  NP_P_MAX=300e3,
+                                                                                  NP_Q_MAX_INJ=132e3,
+                                                                                  NP_Q_MAX_ABS=132e3,
+                                                                                  QV_MODE_ENABLE=True)
+        self.commands = commands if commands is not None else []
+        self.vr = vr
+
+    def interface(self, initialize: bool = True, ders: bool = True) -> DERInterface:
+        """
+        Compile the circuit and return the DERInterface
+
+        :param initialize: If True, the circuit is initialized
+        :param ders: If True, OpenDER objects are created and the initial condition is established
+        """
+        ckt_int = DERInterface(OpenDSSInterface(self.dss_file), t_s=1, print_der=False)
+        if self.commands:
+            ckt_int.cmd(self.commands)
+        if initialize:
+            ckt_int.initialize(DER_sim_type=self.der_sim_type)
+            if self.vr:
+                ckt_int.create_vr_objs()
+            if ders:
+                ckt_int.create_opender_objs(der_files=self.der_file, p_pu=1)
+                ckt_int.der_convergence_process()
+        return ckt_int
+
+
+def cases(synthetic_sizes: List[int] = (100, 500), path: str = None) -> Dict[str, Case]:
+    """
+    Return the benchmark cases
+
+    :param synthetic_sizes: Number of buses of the synthetic feeders
+    :param path: Directory of the synthetic feeder files. Default is a temporary directory
+    """
+    if path is None:
+        path = tempfile.mkdtemp(prefix='opender_benchmarks_')
+
+    result = [
+        Case('test_circuit', repo_path.joinpath('tests', 'opender_interface', 'test_circuit.dss'),
+             der_sim_type='generator',
+             der_file=DERCommonFileFormat(NP_VA_MAX=4000000, NP_P_MAX=4000000, NP_Q_MAX_INJ=1760000,
+                                          NP_Q_MAX_ABS=1760000),
+             commands=['New generator.PV1 Bus1=der.1.2.3 Phases=3, kV=12.47 kw=5000 kVA=5000'], vr=True),
+        Case('ieee34', repo_path.joinpath('Examples', 'OpenDSS_34bus', 'IEEE_34Bus', 'ieee34Mod2_der.dss'), vr=True),
+    ]
+    for n_buses in synthetic_sizes:
+        generator = FeederGenerator(n_buses, n_regulators=1, seed=0)
+        result.append(Case(f'synthetic_{n_buses}', generator.write(path), der_sim_type=generator.der_type, vr=True))
+    return {case.name: case for case in result}
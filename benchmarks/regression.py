@@ -0,0 +1,293 @@
+# Copyright © 2023 Electric Power Research Institute, Inc. All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+# · Redistributions of source code must retain the above copyright notice,
+#   this list of conditions and the following disclaimer.
+# · Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+# · Neither the name of the EPRI nor the names of its contributors may be used
+#   to endorse or promote products derived from this software without specific
+#   prior written permission.
+
+
+"""
+Performance regression gate. The end-to-end scenarios (refer to scenarios.py) are run repeatedly, each run in a fresh
+process, and their wall time, memory peak and counters (e.g. convergence iterations) are compared with the baselines
+stored for the same machine fingerprint.
+
+Timings are noisy, so a regression is flagged only if the median exceeds the baseline median by more than the
+relative tolerance and more than iqr_factor times the interquartile range (IQR) of the runs. Counters are
+deterministic, and any increase over the baseline (above counter_tolerance) is flagged.
+
+Usage:
+    python benchmarks/regression.py record --repeat 5
+    python benchmarks/regression.py compare --repeat 5 --output regression_report.json
+
+The exit code of compare is 1 if a regression is flagged, and 2 if there is no baseline for this machine.
+"""
+
+import argparse
+import datetime
+import hashlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(__file__))
+from scenarios import SCENARIOS, DURATIONS
+
+try:
+    import resource
+except ImportError:
+    # not available on Windows, memory peaks are not recorded
+    resource = None
+
+BASELINES_PATH = os.path.join(os.path.dirname(__file__), 'baselines.json')
+
+
+def fingerprint() -> Dict[str, str]:
+    """
+    Return the machine fingerprint: hardware, operating system and Python version. Baselines are only compared on
+    the same fingerprint. The host name is not included, so that identical CI runners share baselines.
+    """
+    machine = {
+        'system': platform.system(),
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'cpu_count': str(os.cpu_count()),
+        'python': f'{platform.python_implementation()} {".".join(platform.python_version_tuple()[:2])}',
+    }
+    machine['key'] = hashlib.sha1(json.dumps(machine, sort_keys=True).encode()).hexdigest()[:12]
+    return machine
+
+
+def max_rss_mb() -> float:
+    """
+    Return the memory peak (maximum resident set size) of the current process in MB, or None if not available
+    """
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return max_rss / (1024 ** 2 if sys.platform == 'darwin' else 1024)
+
+
+def run_once(name: str, duration: float) -> dict:
+    """
+    Run a scenario once in the current process
+
+    :return: Dictionary of the wall time (s), the memory peak (MB) and the counters
+    """
+    start = time.perf_counter()
+    counters = SCENARIOS[name](duration)
+    wall_time = time.perf_counter() - start
+    return {'wall_time': wall_time, 'max_rss_mb': max_rss_mb(), 'counters': counters}
+
+
+def run_isolated(name: str, duration: float) -> dict:
+    """
+    Run a scenario once in a fresh process, so that the memory peak and caches are not shared between runs
+    """
+    with tempfile.TemporaryDirectory() as path:
+        result_file = os.path.join(path, 'result.json')
+        subprocess.run([sys.executable, __file__, 'worker', name, '--duration', str(duration),
+                        '--result', result_file], check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        with open(result_file) as f:
+            return json.load(f)
+
+
+def summarize(samples: List[float]) -> dict:
+    """
+    Return the median, interquartile range and extremes of samples, or None if there is no sample
+    """
+    samples = [sample for sample in samples if sample is not None]
+    if not samples:
+        return None
+    q1, median, q3 = np.percentile(samples, [25, 50, 75])
+    return {'median': float(median), 'iqr': float(q3 - q1), 'min': float(min(samples)), 'max': float(max(samples)),
+            'samples': samples}
+
+
+def run_scenario(name: str, repeat: int = 5, duration: float = None, isolated: bool = True) -> dict:
+    """
+    Run a scenario repeatedly and summarize the results
+
+    :param name: Scenario name
+    :param repeat: Number of runs
+    :param duration: Simulated duration (s). Default is the scenario default
+    :param isolated: If True, each run is executed in a fresh process
+    """
+    if name not in SCENARIOS:
+        raise ValueError(f'Scenario {name} does not exist, use one of {list(SCENARIOS)}')
+    if duration is None:
+        duration = DURATIONS[name]
+
+    runs = [(run_isolated if isolated else run_once)(name, duration) for _ in range(repeat)]
+    counters = runs[0]['counters']
+    for run in runs[1:]:
+        if run['counters'] != counters:
+            raise ValueError(f'Counters of scenario {name} are not deterministic: {counters} and {run["counters"]}')
+
+    return {
+        'duration': duration,
+        'repeat': repeat,
+        'wall_time': summarize([run['wall_time'] for run in runs]),
+        'max_rss_mb': summarize([run['max_rss_mb'] for run in runs]),
+        'counters': counters,
+    }
+
+
+def compare(baseline: dict, current: dict, time_tolerance: float = 0.1, memory_tolerance: float = 0.1,
+            iqr_factor: float = 3, counter_tolerance: float = 0) -> List[dict]:
+    """
+    Compare the results of a scenario with its baseline
+
+    :param baseline: Baseline results of the scenario, refer to run_scenario()
+    :param current: Current results of the scenario
+    :param time_tolerance: Relative increase of the median wall time tolerated
+    :param memory_tolerance: Relative increase of the median memory peak tolerated
+    :param iqr_factor: Increase of the medians tolerated, in number of IQRs (the largest of baseline and current)
+    :param counter_tolerance: Relative increase of the counters tolerated
+    :return: List of the compared metrics, as dictionaries of {'metric', 'baseline', 'current', 'limit',
+             'regression'}
+    """
+    if baseline['duration'] != current['duration']:
+        raise ValueError(f'Simulated durations differ: {baseline["duration"]} s in baseline and '
+                         f'{current["duration"]} s in current run')
+
+    findings = []
+    for metric, tolerance in [('wall_time', time_tolerance), ('max_rss_mb', memory_tolerance)]:
+        if baseline.get(metric) is None or current.get(metric) is None:
+            continue
+        base, cur = baseline[metric], current[metric]
+        limit = base['median'] + max(tolerance * base['median'], iqr_factor * max(base['iqr'], cur['iqr']))
+        findings.append({'metric': metric, 'baseline': base['median'], 'current': cur['median'], 'limit': limit,
+                         'regression': cur['median'] > limit})
+
+    for counter, value in current['counters'].items():
+        if counter not in baseline['counters']:
+            continue
+        limit = baseline['counters'][counter] * (1 + counter_tolerance)
+        findings.append({'metric': counter, 'baseline': baseline['counters'][counter], 'current': value,
+                         'limit': limit, 'regression': value > limit})
+    return findings
+
+
+def load_baselines(path: str = BASELINES_PATH) -> dict:
+    """
+    Load the stored baselines, as {fingerprint key: {'machine': fingerprint, 'scenarios': {name: results}}}
+    """
+    if not os.path.isfile(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def record(scenarios: List[str], repeat: int, duration: float = None, path: str = BASELINES_PATH) -> dict:
+    """
+    Run the scenarios and store their results as the baselines of this machine
+    """
+    from run_benchmarks import environment
+
+    machine = fingerprint()
+    baselines = load_baselines(path)
+    entry = baselines.setdefault(machine['key'], {'machine': machine, 'scenarios': {}})
+    for name in scenarios:
+        results = run_scenario(name, repeat, duration)
+        results['date'] = datetime.datetime.now().isoformat(timespec='seconds')
+        results['versions'] = environment()['versions']
+        entry['scenarios'][name] = results
+        print(f'{name}: {results["wall_time"]["median"]:.3f} s (IQR {results["wall_time"]["iqr"]:.3f} s), '
+              f'counters {results["counters"]}')
+
+    with open(path, 'w') as f:
+        json.dump(baselines, f, indent=2)
+    print(f'Baselines of machine {machine["key"]} saved in {path}')
+    return baselines
+
+
+def check(scenarios: List[str], repeat: int, duration: float = None, path: str = BASELINES_PATH,
+          **tolerances) -> dict:
+    """
+    Run the scenarios and compare them with the baselines of this machine
+
+    :return: Report dictionary of {'machine', 'status': 'ok', 'regression' or 'no baseline', 'scenarios'}
+    """
+    machine = fingerprint()
+    entry = load_baselines(path).get(machine['key'])
+    report = {'machine': machine, 'status': 'ok', 'scenarios': {}}
+    if entry is None:
+        report['status'] = 'no baseline'
+        print(f'No baseline for machine {machine["key"]} in {path}, run record first')
+        return report
+
+    for name in scenarios:
+        if name not in entry['scenarios']:
+            print(f'{name}: no baseline, skipped')
+            continue
+        baseline = entry['scenarios'][name]
+        current = run_scenario(name, repeat, baseline['duration'] if duration is None else duration)
+        findings = compare(baseline, current, **tolerances)
+        report['scenarios'][name] = {'current': current, 'findings': findings}
+        for finding in findings:
+            flag = 'REGRESSION' if finding['regression'] else 'ok'
+            print(f'{name:<24}{finding["metric"]:<26}{finding["baseline"]:>12.4g}{finding["current"]:>12.4g}'
+                  f'{finding["limit"]:>12.4g}  {flag}')
+            if finding['regression']:
+                report['status'] = 'regression'
+    return report
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description='Performance regression gate of opender_interface')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    for command in ['record', 'compare']:
+        sub = subparsers.add_parser(command)
+        sub.add_argument('--scenarios', nargs='+', default=list(SCENARIOS), help=f'out of {list(SCENARIOS)}')
+        sub.add_argument('--repeat', type=int, default=5, help='number of runs of each scenario')
+        sub.add_argument('--duration', type=float, help='simulated duration (s), default is the scenario default')
+        sub.add_argument('--baselines', default=BASELINES_PATH, help='JSON file of the baselines')
+        if command == 'compare':
+            sub.add_argument('--time-tolerance', type=float, default=0.1, help='relative wall time increase tolerated')
+            sub.add_argument('--memory-tolerance', type=float, default=0.1,
+                             help='relative memory peak increase tolerated')
+            sub.add_argument('--iqr-factor', type=float, default=3, help='increase tolerated in number of IQRs')
+            sub.add_argument('--counter-tolerance', type=float, default=0,
+                             help='relative counter increase tolerated, e.g. convergence iterations')
+            sub.add_argument('--output', help='JSON file of the report')
+
+    worker = subparsers.add_parser('worker', help='run a scenario once, used internally for isolated runs')
+    worker.add_argument('scenario')
+    worker.add_argument('--duration', type=float, required=True)
+    worker.add_argument('--result', required=True)
+
+    args = parser.parse_args(argv)
+    if args.command == 'worker':
+        with open(args.result, 'w') as f:
+            json.dump(run_once(args.scenario, args.duration), f)
+        return 0
+
+    if args.command == 'record':
+        record(args.scenarios, args.repeat, args.duration, args.baselines)
+        return 0
+
+    report = check(args.scenarios, args.repeat, args.duration, args.baselines, time_tolerance=args.time_tolerance,
+                   memory_tolerance=args.memory_tolerance, iqr_factor=args.iqr_factor,
+                   counter_tolerance=args.counter_tolerance)
+    if args.output is not None:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    return {'ok': 0, 'regression': 1, 'no baseline': 2}[report['status']]
+
+
+if __name__ == '__main__':
+    sys.exit(main())
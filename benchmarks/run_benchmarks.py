@@ -0,0 +1,244 @@
+# Copyright © 2023 Electric Power Research Institute, Inc. All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+# · Redistributions of source code must retain the above copyright notice,
+#   this list of conditions and the following disclaimer.
+# · Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+# · Neither the name of the EPRI nor the names of its contributors may be used
+#   to endorse or promote products derived from this software without specific
+#   prior written permission.
+
+
+"""
+Benchmark suite for the co-simulation hot paths. Each benchmark is timed on each circuit case with timeit, and the
+results are written as JSON, so that the timings of different releases or machines can be compared.
+
+Usage:
+    python benchmarks/run_benchmarks.py --output results.json
+    python benchmarks/run_benchmarks.py --benchmarks read_line_flow der_convergence_process --cases ieee34
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import sys
+import timeit
+from importlib import metadata
+from typing import Callable, Dict, List
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(__file__))
+from cases import Case, cases
+from opender_interface import TimePlots, VR_Model
+
+# Registered benchmarks, as {name: (setup function, circuit based, fresh setup for each call)}
+BENCHMARKS: Dict[str, tuple] = {}
+
+
+def benchmark(name: str, circuit: bool = True, fresh: bool = False) -> Callable:
+    """
+    Register a benchmark. The decorated setup function is called with the circuit case (None if not circuit based)
+    and returns the function to be timed.
+
+    :param name: Benchmark name
+    :param circuit: If True, the benchmark is run on each circuit case
+    :param fresh: If True, the setup is repeated before each timed call, for operations that cannot be repeated on
+                  the same objects (e.g. initialization)
+    """
+    def register(setup):
+        BENCHMARKS[name] = (setup, circuit, fresh)
+        return setup
+    return register
+
+
+@benchmark('initialize', fresh=True)
+def bench_initialize(case: Case) -> Callable:
+    ckt_int = case.interface(initialize=False)
+    return lambda: ckt_int.initialize(DER_sim_type=case.der_sim_type)
+
+
+@benchmark('create_opender_objs', fresh=True)
+def bench_create_opender_objs(case: Case) -> Callable:
+    ckt_int = case.interface(ders=False)
+    return lambda: ckt_int.create_opender_objs(der_files=case.der_file, p_pu=1)
+
+
+@benchmark('read_sys_voltage')
+def bench_read_sys_voltage(case: Case) -> Callable:
+    ckt_int = case.interface()
+    return ckt_int.read_sys_voltage
+
+
+@benchmark('read_der_voltage')
+def bench_read_der_voltage(case: Case) -> Callable:
+    ckt_int = case.interface()
+    ckt_int.read_sys_voltage()
+    return ckt_int.read_der_voltage
+
+
+@benchmark('read_line_flow')
+def bench_read_line_flow(case: Case) -> Callable:
+    ckt_int = case.interface()
+    return ckt_int.read_line_flow
+
+
+@benchmark('update_der_output_powers')
+def bench_update_der_output_powers(case: Case) -> Callable:
+    ckt_int = case.interface()
+    return ckt_int.update_der_output_powers
+
+
+@benchmark('der_convergence_process')
+def bench_der_convergence_process(case: Case) -> Callable:
+    ckt_int = case.interface()
+    mult = [1.0]
+
+    def converge():
+        # the load alternates between two levels, so that each call converges to a new operating point
+        mult[0] = 1.5 - mult[0]
+        ckt_int.load_scaling(mult[0])
+        ckt_int.der_convergence_process()
+    return converge
+
+
+@benchmark('VR_Model.run', circuit=False)
+def bench_vr_run(case: None) -> Callable:
+    vr = VR_Model('vr', Ts=1)
+    vreg = 120 + 4 * np.sin(np.arange(10000) / 100)
+
+    def run():
+        for v in vreg:
+            vr.run(Vreg=v)
+    return run
+
+
+@benchmark('TimePlots.prepare', circuit=False)
+def bench_time_plots_prepare(case: None) -> Callable:
+    plot_obj = TimePlots(2, 1)
+    t = np.arange(100000)
+    for i in range(len(t)):
+        plot_obj.add_to_traces({'time': t[i], 'P': np.sin(t[i] / 1000), 'Q': np.cos(t[i] / 1000)},
+                               {'time': t[i], 'V': 1 + 0.05 * np.sin(t[i] / 300)})
+
+    def prepare():
+        plot_obj.prepare()
+        plt.close('all')
+    return prepare
+
+
+def time_benchmark(setup: Callable, case: Case, fresh: bool, repeat: int, min_time: float) -> dict:
+    """
+    Time a benchmark on a case
+
+    :return: Dictionary of the number of calls per repeat and the time per call of each repeat (s)
+    """
+    if fresh:
+        times = []
+        for _ in range(repeat):
+            timer = timeit.Timer(setup(case))
+            times.append(timer.timeit(number=1))
+        number = 1
+    else:
+        timer = timeit.Timer(setup(case))
+        number, elapsed = timer.autorange()
+        # autorange reaches 0.2 s, scale the number of calls to reach min_time
+        number = max(1, int(number * min_time / max(elapsed, 1e-9)))
+        times = [elapsed / number for elapsed in timer.repeat(repeat=repeat, number=number)]
+    return {
+        'number': number,
+        'repeat': repeat,
+        'times': times,
+        'min': min(times),
+        'median': statistics.median(times),
+        'mean': statistics.mean(times),
+    }
+
+
+def environment() -> dict:
+    """
+    Return the information of the machine and package versions, to be stored with the results
+    """
+    versions = {}
+    for package in ['opender_interface', 'opender', 'py-dss-interface', 'numpy', 'pandas', 'matplotlib']:
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            versions[package] = None
+    return {
+        'date': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+        'versions': versions,
+    }
+
+
+def run_benchmarks(benchmarks: List[str] = None, case_names: List[str] = None, synthetic_sizes: List[int] = (100, 500),
+                   repeat: int = 5, min_time: float = 0.2, verbose: bool = True) -> dict:
+    """
+    Run the benchmarks and return the results
+
+    :param benchmarks: Names of the benchmarks to run. Default is all
+    :param case_names: Names of the circuit cases to run. Default is all
+    :param synthetic_sizes: Number of buses of the synthetic feeders
+    :param repeat: Number of timed repeats
+    :param min_time: Minimum time (s) of each repeat, for benchmarks without fresh setup
+    :param verbose: Print the results as they are measured
+    """
+    if benchmarks is None:
+        benchmarks = list(BENCHMARKS)
+    for name in benchmarks:
+        if name not in BENCHMARKS:
+            raise ValueError(f'Benchmark {name} does not exist, use one of {list(BENCHMARKS)}')
+
+    all_cases = cases(synthetic_sizes)
+    if case_names is None:
+        case_names = list(all_cases)
+    for name in case_names:
+        if name not in all_cases:
+            raise ValueError(f'Case {name} does not exist, use one of {list(all_cases)}')
+
+    results = []
+    for name in benchmarks:
+        setup, circuit, fresh = BENCHMARKS[name]
+        for case_name in (case_names if circuit else [None]):
+            result = time_benchmark(setup, all_cases[case_name] if circuit else None, fresh, repeat, min_time)
+            results.append({'benchmark': name, 'case': case_name, **result})
+            if verbose:
+                print(f'{name:<28}{str(case_name):<18}{result["median"] * 1e3:12.4f} ms  (min {result["min"] * 1e3:.4f}'
+                      f' ms, {result["number"]} x {repeat})')
+
+    return {'environment': environment(), 'results': results}
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description='Benchmark suite for the opender_interface co-simulation hot paths')
+    parser.add_argument('--benchmarks', nargs='+', help=f'benchmarks to run, out of {list(BENCHMARKS)}')
+    parser.add_argument('--cases', nargs='+', help='circuit cases to run, e.g. test_circuit ieee34 synthetic_100')
+    parser.add_argument('--synthetic-sizes', nargs='*', type=int, default=[100, 500],
+                        help='number of buses of the synthetic feeders')
+    parser.add_argument('--repeat', type=int, default=5, help='number of timed repeats')
+    parser.add_argument('--min-time', type=float, default=0.2, help='minimum time (s) of each repeat')
+    parser.add_argument('--output', default='benchmark_results.json', help='JSON file of the results')
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.benchmarks, args.cases, args.synthetic_sizes, args.repeat, args.min_time)
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f'Results saved in {args.output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+# Copyright © 2023 Electric Power Research Institute, Inc. All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+# · Redistributions of source code must retain the above copyright notice,
+#   this list of conditions and the following disclaimer.
+# · Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+# · Neither the name of the EPRI nor the names of its contributors may be used
+#   to endorse or promote products derived from this software without specific
+#   prior written permission.
+
+
+"""
+End-to-end simulation scenarios of the performance regression gate (refer to regression.py). Each scenario returns
+the counters of the simulation, e.g. the convergence iterations, which are deterministic and checked along with the
+wall time and the memory peak.
+"""
+
+from typing import Callable, Dict
+import numpy as np
+from opender import DER, DERCommonFileFormat, DERCommonFileFormatBESS
+from opender_interface import DERInterface, OpenDSSInterface
+from cases import repo_path
+
+# Registered scenarios, as {name: function(duration) returning the counters}
+SCENARIOS: Dict[str, Callable[[float], Dict[str, int]]] = {}
+
+# Default simulated duration of each scenario (s)
+DURATIONS: Dict[str, float] = {}
+
+
+def solves(ckt_int: DERInterface) -> int:
+    """
+    Return the number of power flow solutions since the per-stage timing of a DERInterface was enabled, including
+    those of the convergence processes
+    """
+    report = ckt_int.timing_report()
+    return int(report.loc['solve', 'calls']) if 'solve' in report.index else 0
+
+
+def scenario(name: str, duration: float) -> Callable:
+    """
+    Register a scenario
+
+    :param name: Scenario name
+    :param duration: Default simulated duration (s)
+    """
+    def register(func):
+        SCENARIOS[name] = func
+        DURATIONS[name] = duration
+        return func
+    return register
+
+
+@scenario('ieee34_enter_service', duration=600)
+def ieee34_enter_service(duration: float) -> Dict[str, int]:
+    """
+    Dynamic simulation of the IEEE 34-bus feeder with DERs entering service after a fault, and voltage regulators
+    operating, refer to Examples/OpenDSS_34bus/pymodel/dynamic_simulation.py
+    """
+    dss_file = repo_path.joinpath('Examples', 'OpenDSS_34bus', 'IEEE_34Bus', 'ieee34Mod2_der.dss')
+    ckt_int = DERInterface(OpenDSSInterface(str(dss_file)), t_s=1, print_der=False)
+    ckt_int.initialize()
+    ckt_int.create_vr_objs()
+    ckt_int.create_opender_objs(p_pu=1, der_files=DERCommonFileFormat(NP_VA_MAX=300e3,
+                                                                      NP_P_MAX=300e3,
+                                                                      NP_Q_MAX_INJ=132e3,
+                                                                      NP_Q_MAX_ABS=132e3,
+                                                                      QV_MODE_ENABLE=True,
+                                                                      ES_DELAY=300,
+                                                                      ES_RAMP_RATE=300,
+                                                                      ES_RANDOMIZED_DELAY=0))
+    ckt_int.cmd('New Fault.F1 Phases=3 Bus1=808')
+    ckt_int.cmd('Edit Fault.F1 R=1000000')
+    ckt_int.enable_timing()
+
+    ckt_int.enable_control()
+    ckt_int.der_convergence_process()
+    ckt_int.read_vr()
+    ckt_int.update_vr_tap()
+    ckt_int.disable_control()
+
+    steps = 0
+    t = 0
+    while t < duration:
+        ckt_int.cmd(f'Edit Fault.F1 R={0.01 if 45 < t < 50 else 1000000}')
+        ckt_int.run()
+        ckt_int.update_der_output_powers()
+        ckt_int.write_vr()
+        ckt_int.solve_power_flow()
+        steps = steps + 1
+        t = t + ckt_int.t_s
+
+    return {
+        'steps': steps,
+        'solves': solves(ckt_int),
+        'convergence_iterations': ckt_int.total_convergence_iterations,
+        'tap_operations': int(sum(vr.total_sw for vr in ckt_int.vr_objs)),
+    }
+
+
+@scenario('bess_pv_qsts', duration=86400)
+def bess_pv_qsts(duration: float) -> Dict[str, int]:
+    """
+    Quasi-static time series simulation of PV peak shaving by a BESS, in 15-minute time steps with the convergence
+    process in each step, refer to Examples/OpenDSS_BESS_PV/BESS_PV.py. The PV profile is a clear-sky day.
+    """
+    t_s = 60 * 15
+    dss_file = repo_path.joinpath('Examples', 'OpenDSS_BESS_PV', 'dss_BESS_PV.dss')
+    ckt_int = DERInterface(OpenDSSInterface(str(dss_file)), t_s=t_s, print_der=False)
+    ckt_int.initialize(DER_sim_type='generator')
+    der_list = ckt_int.create_opender_objs({
+        'PV1': DERCommonFileFormat(NP_P_MAX=1000000, NP_VA_MAX=1000000, NP_Q_MAX_INJ=440000, NP_Q_MAX_ABS=440000),
+        'BESS1': DERCommonFileFormatBESS(NP_P_MAX=1000000, NP_VA_MAX=1000000, NP_Q_MAX_INJ=440000,
+                                         NP_Q_MAX_ABS=440000, NP_P_MAX_CHARGE=1000000,
+                                         NP_APPARENT_POWER_CHARGE_MAX=1000000, QV_MODE_ENABLE=True,
+                                         NP_BESS_CAPACITY=2000000)}, p_pu=0)
+    DER.t_s = t_s
+    ckt_int.enable_timing()
+    ckt_int.der_convergence_process()
+
+    hours = np.arange(0, duration, t_s) / 3600 % 24
+    pv_profile = np.clip(0.9 * np.sin(np.pi * (hours - 6) / 12), 0, None)
+
+    for p in pv_profile:
+        # shave PV peak over 0.5, and discharge when SOC is above 50%
+        bess_p = 0.5 - p if p > 0.5 else 0
+        if der_list[1].bess_soc > 0.5 and p < 0.5:
+            bess_p = 0.5 - p
+        ckt_int.update_der_p_pu(p_pu_list=[p, bess_p])
+        ckt_int.der_convergence_process()
+        ckt_int.read_line_flow()
+
+    return {
+        'steps': len(pv_profile),
+        'solves': solves(ckt_int),
+        'convergence_iterations': ckt_int.total_convergence_iterations,
+    }
@@ -1,8 +1,48 @@
 __version__ = '1.0.1'
 
+import importlib
+from typing import TYPE_CHECKING
+
 from .der_interface import DERInterface
 from .dx_tool_interface import DxToolInterfacesABC
 from .opendss_interface import OpenDSSInterface
-from .time_plots import TimePlots, CombinedTimePlots
-from .xy_plot import XYPlots
-from .voltage_regulator import VR_Model
\ No newline at end of file
+from .trace_recorder import TraceRecorder
+from .trace_stream import StreamingTraceRecorder
+from .trace_store import TraceStore
+from .trace_file import TraceFile
+from .aligned_runs import AlignedRuns
+from .feeder_profile import FeederProfilePlot
+from .feeder_generator import FeederGenerator
+from .voltage_regulator import VR_Model, VRBank
+from .cosim_service import CoSimService, FederateABC, LocalFederate, StreamFederate
+from .der_fleet import DERFleet
+from .multirate import MultirateScheduler
+from .fast_forward import FastForwardDriver
+from .instrumentation import StageTimer, TraceWriter
+
+# Plotting classes import matplotlib, so they are only imported on first access. Headless simulations (e.g. cluster
+# workers only using DERInterface and OpenDSSInterface) do not pay for its import.
+_LAZY_IMPORTS = {
+    'TimePlots': 'time_plots',
+    'CombinedTimePlots': 'time_plots',
+    'XYPlots': 'xy_plot',
+    'FigureExporter': 'figure_export',
+}
+
+if TYPE_CHECKING:
+    from .time_plots import TimePlots, CombinedTimePlots
+    from .xy_plot import XYPlots
+    from .figure_export import FigureExporter
+
+
+def __getattr__(name):
+    if name in _LAZY_IMPORTS:
+        module = importlib.import_module(f'.{_LAZY_IMPORTS[name]}', __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY_IMPORTS))
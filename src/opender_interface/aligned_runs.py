@@ -0,0 +1,187 @@
+# Copyright © 2023 Electric Power Research Institute, Inc. All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+# · Redistributions of source code must retain the above copyright notice,
+#   this list of conditions and the following disclaimer.
+# · Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+# · Neither the name of the EPRI nor the names of its contributors may be used
+#   to endorse or promote products derived from this software without specific
+#   prior written permission.
+
+
+import contextlib
+import math
+import pathlib
+import numpy as np
+import pandas as pd
+import opender.der
+from typing import List, Tuple, Union
+from opender_interface.trace_file import TraceFile
+
+RESAMPLE_METHODS = ['linear', 'hold']
+
+
+class AlignedRuns:
+    """
+    This is a lazy, time-aligned merge of multiple simulation runs, e.g. a parameter sweep, for CombinedTimePlots.
+    Runs can be TimePlots objects, recorders (TraceRecorder, StreamingTraceRecorder, TraceStore, TraceFile), or
+    paths of trace files saved by TimePlots.save().
+
+    The runs are aligned on a shared time axis, with the smallest time step of the runs by default, and a trace is
+    only read and resampled when its column is requested (e.g. when it is plotted). Trace files are opened only while
+    reading. Runs of different lengths are padded with NaN outside of their time range.
+
+    It provides the reading interface of TraceRecorder, with each trace named '{trace name} ({run label})', so it can
+    be used as the recorder of TimePlots.
+    """
+
+    def __init__(self, runs: list, groups: int, labels: List[str] = None, run_t_s: List[float] = None,
+                 t_s: float = None, t_start: float = None, t_end: float = None, method: str = 'linear',
+                 trace_names: List[List[str]] = None):
+        """
+        :param runs: List of runs, TimePlots objects, recorders or trace file paths
+        :param groups: Number of channel groups (subplots)
+        :param labels: Labels of the runs. Default is the run id of trace files, or 'run{index}'
+        :param run_t_s: Time steps (s) of runs without time index (e.g. TimePlots with TraceRecorder). Default is the
+                        OpenDER time step
+        :param t_s: Time step (s) of the shared time axis. Default is the smallest time step of the runs
+        :param t_start: Start time (s) of the shared time axis. Default is the earliest start time of the runs
+        :param t_end: End time (s) of the shared time axis. Default is the latest end time of the runs
+        :param method: Resampling method, 'linear' interpolation or zero-order 'hold' of the previous sample
+        :param trace_names: Trace names read from the runs, for each group. Default is all traces
+        """
+        if method not in RESAMPLE_METHODS:
+            raise ValueError(f'Resampling method should be one of {RESAMPLE_METHODS}, but "{method}" is provided')
+        if labels is not None and len(labels) != len(runs):
+            raise ValueError(f'{len(labels)} labels are provided for {len(runs)} runs')
+
+        self.groups = groups
+        self.method = method
+        self.runs = list(runs)
+        self.channels: List[List[str]] = [[] for _ in range(groups)]
+        self.__columns = [{} for _ in range(groups)]
+        self.__run_times = []
+
+        for k, run in enumerate(self.runs):
+            with self.__open(run) as recorder:
+                label = labels[k] if labels is not None else getattr(recorder, 'run_id', None) or f'run{k}'
+                for group in range(min(groups, recorder.groups)):
+                    for name in recorder.channels[group]:
+                        if trace_names is None or name in trace_names[group]:
+                            channel = f'{name} ({label})'
+                            self.channels[group].append(channel)
+                            self.__columns[group][channel] = (k, name)
+                self.__run_times.append(self.__time_range(recorder, None if run_t_s is None else run_t_s[k]))
+
+        valid = [times for times in self.__run_times if times is not None]
+        self.t_s = t_s if t_s is not None else min([times[2] for times in valid], default=opender.der.DER.t_s)
+        self.t_start = t_start if t_start is not None else min([times[0] for times in valid], default=0)
+        t_end = t_end if t_end is not None else max([times[1] for times in valid], default=self.t_start)
+        self.__len = max(math.floor((t_end - self.t_start) / self.t_s + 1e-9) + 1, 0)
+
+    @contextlib.contextmanager
+    def __open(self, run):
+        """
+        Open a run for reading, trace files opened from paths are closed afterwards
+        """
+        if isinstance(run, (str, pathlib.Path)):
+            with TraceFile(run) as trace_file:
+                yield trace_file
+        else:
+            yield getattr(run, 'recorder', run)
+
+    def __run_time(self, recorder, group: int, run_t_s: Union[float, None]) -> np.ndarray:
+        """
+        Return the time index of a group of a run
+        """
+        if hasattr(recorder, 'group_time'):
+            return np.asarray(recorder.group_time(group))
+        return np.arange(len(recorder)) * (opender.der.DER.t_s if run_t_s is None else run_t_s)
+
+    def __time_range(self, recorder, run_t_s: Union[float, None]) -> Union[Tuple[float, float, float, float], None]:
+        """
+        Return (start time, end time, time step, time step given) of a run, from its first group with traces
+        """
+        for group in range(min(self.groups, recorder.groups)):
+            if recorder.channels[group]:
+                time = self.__run_time(recorder, group, run_t_s)
+                if len(time) == 0:
+                    return None
+                if run_t_s is not None:
+                    step = run_t_s
+                elif len(time) > 1:
+                    # rounded to remove the floating point error of the time index
+                    step = float(f'{np.median(np.diff(time)):.12g}')
+                else:
+                    step = opender.der.DER.t_s
+                return float(time[0]), float(time[-1]), step, run_t_s
+        return None
+
+    def __len__(self):
+        return self.__len
+
+    @property
+    def time(self) -> np.ndarray:
+        """
+        Shared time axis (s)
+        """
+        return self.t_start + np.arange(self.__len) * self.t_s
+
+    def group_time(self, group: int) -> np.ndarray:
+        """
+        Shared time axis (s), identical for all groups
+        """
+        return self.time
+
+    def column(self, group: int, name: str) -> np.ndarray:
+        """
+        Read a trace of a run and resample it on the shared time axis
+
+        :param group: Group index
+        :param name: Trace name, '{trace name} ({run label})'
+        """
+        try:
+            k, trace_name = self.__columns[group][name]
+        except KeyError:
+            raise ValueError(f'Trace {name} does not exist in group {group}')
+
+        axis = self.time
+        result = np.full(len(axis), np.nan)
+        times = self.__run_times[k]
+        if times is None or len(axis) == 0:
+            return result
+
+        with self.__open(self.runs[k]) as recorder:
+            time = self.__run_time(recorder, group, times[3])
+            # Only the part of the run within the shared time axis is read
+            start = max(int(np.searchsorted(time, axis[0], side='left')) - 1, 0)
+            end = int(np.searchsorted(time, axis[-1], side='right')) + 1
+            time = time[start:end]
+            values = np.asarray(recorder.column(group, trace_name)[start:end], dtype=float)
+        if len(time) == 0:
+            return result
+
+        # samples of the run are on the shared time axis, no resampling needed
+        i0 = round((time[0] - self.t_start) / self.t_s)
+        aligned = abs(times[2] - self.t_s) <= 1e-9 * self.t_s \
+            and abs(self.t_start + i0 * self.t_s - time[0]) <= 1e-9 * self.t_s
+        if aligned and 0 <= i0 and i0 + len(time) <= len(axis):
+            result[i0:i0 + len(time)] = values
+            return result
+
+        inside = (axis >= time[0]) & (axis <= time[-1])
+        if self.method == 'linear':
+            result[inside] = np.interp(axis[inside], time, values)
+        else:
+            result[inside] = values[np.searchsorted(time, axis[inside], side='right') - 1]
+        return result
+
+    def to_frame(self, group: int):
+        """
+        Return the resampled traces of a group as a DataFrame indexed by the shared time axis
+        """
+        return pd.DataFrame({name: self.column(group, name) for name in self.channels[group]},
+                            index=pd.Index(self.time, name='time'))
@@ -0,0 +1,263 @@
+# Copyright © 2023 Electric Power Research Institute, Inc. All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+# · Redistributions of source code must retain the above copyright notice,
+#   this list of conditions and the following disclaimer.
+# · Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+# · Neither the name of the EPRI nor the names of its contributors may be used
+#   to endorse or promote products derived from this software without specific
+#   prior written permission.
+
+import asyncio
+import json
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Union, List, Dict, Tuple
+from opender import DER_BESS
+from opender_interface.der_interface import DERInterface
+
+
+class FederateABC(ABC):
+    """
+    This is the abstract class of an external federate (e.g. market or communication simulator), which drives the
+    simulation time of a CoSimService.
+
+    Messages exchanged with the federate are dictionaries. A setpoint message has the following keys:
+        - 'time': simulation time (s) the setpoints apply to
+        - 'p_pu': optional dictionary of {'DER_name': p_pu}, available DC power for PV or demanded power for BESS
+        - 'v_source_pu': optional substation bus voltage in pu
+    """
+
+    @abstractmethod
+    async def next_messages(self) -> Union[List[dict], None]:
+        """
+        Wait until the federate grants the next time and return the batch of setpoint messages received.
+
+        :return: List of setpoint messages, or None if the federate finished the simulation
+        """
+        pass
+
+    @abstractmethod
+    async def publish(self, observation: dict) -> None:
+        """
+        Publish the observations of a solved time step to the federate.
+
+        :param observation: Observation dictionary, refer to CoSimService.observe() for its format
+        """
+        pass
+
+
+class LocalFederate(FederateABC):
+    """
+    In-process stand-in for an external federate, based on bounded asyncio queues. The maxsize of the queues
+    introduces backpressure: the sender waits when the service falls behind, and the service waits when the
+    observations are not consumed.
+    """
+
+    def __init__(self, maxsize: int = 16, batch_size: int = 64):
+        """
+        :param maxsize: Maximum number of pending messages in each direction
+        :param batch_size: Maximum number of setpoint messages returned as one batch
+        """
+        self.inbox = asyncio.Queue(maxsize=maxsize)
+        self.outbox = asyncio.Queue(maxsize=maxsize)
+        self.batch_size = batch_size
+
+    async def send(self, message: Union[dict, None]) -> None:
+        """
+        Send a setpoint message to the service. Sending None finishes the simulation.
+
+        :param message: Setpoint message, refer to FederateABC for its format
+        """
+        await self.inbox.put(message)
+
+    async def close(self) -> None:
+        """
+        Finish the simulation after all pending messages are processed.
+        """
+        await self.inbox.put(None)
+
+    async def receive(self) -> dict:
+        """
+        Wait for and return the next observation published by the service.
+        """
+        return await self.outbox.get()
+
+    async def next_messages(self) -> Union[List[dict], None]:
+        message = await self.inbox.get()
+        if message is None:
+            return None
+
+        # Drain whatever else is already pending, up to batch_size
+        messages = [message]
+        while len(messages) < self.batch_size and not self.inbox.empty():
+            message = self.inbox.get_nowait()
+            if message is None:
+                # keep the end-of-simulation marker for the next call
+                self.inbox.put_nowait(None)
+                break
+            messages.append(message)
+        return messages
+
+    async def publish(self, observation: dict) -> None:
+        await self.outbox.put(observation)
+
+
+class StreamFederate(FederateABC):
+    """
+    Socket stand-in for an external federate, exchanging newline-delimited JSON over asyncio streams. Each line
+    received is either one setpoint message or a list of them (a batch). An empty line, 'null' or the end of the
+    stream finishes the simulation. Backpressure is provided by the stream drain.
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """
+        :param reader: Stream reader connected to the external federate
+        :param writer: Stream writer connected to the external federate
+        """
+        self.reader = reader
+        self.writer = writer
+
+    async def next_messages(self) -> Union[List[dict], None]:
+        line = await self.reader.readline()
+        if not line.strip():
+            return None
+        messages = json.loads(line)
+        if messages is None:
+            return None
+        if isinstance(messages, dict):
+            messages = [messages]
+        return messages
+
+    async def publish(self, observation: dict) -> None:
+        self.writer.write((json.dumps(observation) + '\n').encode())
+        await self.writer.drain()
+
+
+class CoSimService:
+    """
+    This is an asyncio-based stepping service around DERInterface, for co-simulation with external simulators that
+    drive time. For each granted time step, the service applies the external setpoints, runs the OpenDER objects and
+    the voltage regulator models, solves the power flow, and publishes the observations.
+
+    The stepping is executed in a dedicated worker thread, so that the waits of other federates (coroutines on the
+    same event loop) overlap with the circuit solution rather than being serialized behind it.
+    """
+
+    def __init__(self, der_interface: DERInterface, federate: FederateABC, converge: bool = False):
+        """
+        :param der_interface: DERInterface object, with the OpenDER objects created and initial condition established
+        :param federate: External federate driving the simulation time
+        :param converge: If True, use der_convergence_process() in each step (steady-state / QSTS). If False, run
+                         a single dynamic simulation step.
+        """
+        self.der_interface = der_interface
+        self.federate = federate
+        self.converge = converge
+
+        self.time = None
+        self.steps = 0
+
+        self.__der_by_name = {der.name.upper(): der for der in der_interface.der_objs}
+
+    async def run(self) -> int:
+        """
+        Serve the federate until it finishes the simulation. The service can be run again afterwards, e.g. to
+        continue the simulation with a new federate (assigned to .federate) or after a federate error.
+
+        :return: Number of time steps simulated
+        """
+        loop = asyncio.get_running_loop()
+        # OpenDSS engine is not thread-safe, so a single worker keeps all circuit calls on one thread.
+        executor = ThreadPoolExecutor(max_workers=1)
+        try:
+            while True:
+                messages = await self.federate.next_messages()
+                if messages is None:
+                    break
+
+                for t, setpoints in self.group_messages(messages):
+                    observation = await loop.run_in_executor(executor, self.step, t, setpoints)
+                    await self.federate.publish(observation)
+        finally:
+            executor.shutdown(wait=True)
+
+        return self.steps
+
+    @staticmethod
+    def group_messages(messages: List[dict]) -> List[Tuple[float, dict]]:
+        """
+        Merge a batch of setpoint messages by time, in ascending order. For the same time, later messages override
+        earlier ones.
+
+        :param messages: List of setpoint messages
+        :return: List of (time, merged setpoints)
+        """
+        grouped: Dict[float, dict] = {}
+        for message in messages:
+            setpoints = grouped.setdefault(message['time'], {'p_pu': {}})
+            setpoints['p_pu'].update(message.get('p_pu', {}))
+            if message.get('v_source_pu') is not None:
+                setpoints['v_source_pu'] = message['v_source_pu']
+        return sorted(grouped.items())
+
+    def step(self, t: float, setpoints: dict) -> dict:
+        """
+        Blocking simulation of one time step: apply setpoints, run, solve, and return the observations.
+
+        :param t: Simulation time (s)
+        :param setpoints: Merged setpoints for this time, refer to FederateABC for the format
+        """
+        ckt_int = self.der_interface
+        with ckt_int.step_span(t):
+            self.apply_setpoints(setpoints)
+
+            if self.converge:
+                ckt_int.der_convergence_process()
+            else:
+                ckt_int.run()
+                ckt_int.update_der_output_powers()
+                if ckt_int.vr_objs:
+                    ckt_int.write_vr()
+                ckt_int.solve_power_flow()
+
+            self.time = t
+            self.steps += 1
+            return self.observe()
+
+    def apply_setpoints(self, setpoints: dict) -> None:
+        """
+        Apply external setpoints to the OpenDER objects and circuit.
+
+        :param setpoints: Setpoints, refer to FederateABC for the format
+        """
+        for name, p_pu in setpoints.get('p_pu', {}).items():
+            try:
+                der = self.__der_by_name[name.upper()]
+            except KeyError:
+                raise ValueError(f'DER named {name} does not exist in the circuit')
+            if isinstance(der, DER_BESS):
+                der.update_der_input(p_dem_pu=p_pu, f=60)
+            else:
+                der.update_der_input(p_dc_pu=p_pu, f=60)
+
+        if setpoints.get('v_source_pu') is not None:
+            self.der_interface.set_source_voltage(setpoints['v_source_pu'])
+
+    def observe(self) -> dict:
+        """
+        Collect the observations of the latest solved time step, in the format of:
+        {'time': t, 'der': {'DER_name': {'p_kw', 'q_kvar', 'v_pu', 'status'}}, 'vr': {'VR_name': tap}}
+        """
+        return {
+            'time': self.time,
+            'der': {der.name: {'p_kw': float(der.p_out_kw),
+                               'q_kvar': float(der.q_out_kvar),
+                               'v_pu': float(der.der_input.v_meas_pu),
+                               'status': der.der_status}
+                    for der in self.der_interface.der_objs},
+            'vr': {vr.name: vr.tap for vr in self.der_interface.vr_objs},
+        }
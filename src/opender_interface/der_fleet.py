@@ -0,0 +1,417 @@
+# Copyright © 2023 Electric Power Research Institute, Inc. All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+# · Redistributions of source code must retain the above copyright notice,
+#   this list of conditions and the following disclaimer.
+# · Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+# · Neither the name of the EPRI nor the names of its contributors may be used
+#   to endorse or promote products derived from this software without specific
+#   prior written permission.
+
+import numpy as np
+from opender import DER, DER_PV, DERCommonFileFormat, DERCommonFileFormatBESS
+from opender.capability_and_priority import intercep_piecewise_circle
+from typing import Union, List, Tuple
+
+
+class DERFleet:
+    """
+    This is a vectorized engine for a homogeneous fleet of PV DERs sharing one DERCommonFileFormat. Instead of one
+    OpenDER object per DER, the states of the whole fleet are stored in NumPy arrays and the fleet is stepped in one
+    call. The equations follow the OpenDER model for the functions covered:
+        - Applicable voltage processing (AVG or POS) with measurement delay
+        - Constant power factor, volt-var, watt-var and constant reactive power functions
+        - Volt-watt and active power limit functions
+        - First-order response time (open loop response time) of all the above
+        - DER apparent power / reactive power capability and priority
+        - Normal operation current output with current limit, active current ramp and inverter delay
+
+    The engine assumes all DERs are in continuous operation (no trip, enter service or ride-through transitions),
+    at nominal frequency, with settings unchanged during the simulation. Use validate=True to compare the fleet
+    against per-object OpenDER results when these assumptions are in question.
+
+    The fleet is standalone, it is not created by DERInterface.create_opender_objs() or stepped by DERInterface.run().
+    The DER terminal voltages (e.g. from DERInterface.read_der_voltage()) are passed to step(), and the outputs
+    (p_out_kw, q_out_kvar) are written to the circuit simulation tool by the caller.
+    """
+
+    def __init__(self, der_file: DERCommonFileFormat, n: int, names: List[str] = None, validate: bool = False):
+        """
+        :param der_file: DERCommonFileFormat object shared by all DERs in the fleet
+        :param n: Number of DERs in the fleet
+        :param names: Names of the DERs. Default is 'DER1', 'DER2', ...
+        :param validate: If True, also create and step per-object OpenDER models, and record the deviation
+        """
+        if isinstance(der_file, DERCommonFileFormatBESS):
+            raise ValueError('DERFleet only supports PV DERs')
+        if der_file.QV_VREF_AUTO_MODE:
+            raise ValueError('DERFleet does not support autonomous Vref adjustment of volt-var function')
+        if der_file.NP_REACT_TIME >= DER.t_s:
+            raise ValueError('DERFleet does not support reaction time (NP_REACT_TIME) longer than time step')
+
+        self.der_file = der_file
+        self.n = n
+        self.names = names if names is not None else [f'DER{i + 1}' for i in range(n)]
+        if len(self.names) != n:
+            raise ValueError(f'{len(self.names)} names provided for a fleet of {n} DERs')
+        self.three_phase = der_file.NP_PHASE == "THREE"
+
+        self.time = 0
+
+        # Outputs
+        self.v_meas_pu = np.zeros(n)
+        self.p_desired_pu = np.zeros(n)
+        self.q_desired_pu = np.zeros(n)
+        self.p_out_pu = np.zeros(n)
+        self.q_out_pu = np.zeros(n)
+
+        # Internal states of low pass filters (input, output) and ramp rate limits (output), by function
+        self.__lpf_states = {}
+        self.__ramp_states = {}
+        self.__i_pos_d_rrl = np.zeros(n)
+
+        # Intercepts of apparent power circle and piecewise curves only depend on settings, so they are computed once.
+        self.__itcp = self.__calculate_intercepts()
+
+        self.validate = validate
+        self.der_objs = [DER_PV(der_file) for _ in range(n)] if validate else []
+        self.max_deviation = {'p_out_pu': 0.0, 'q_out_pu': 0.0}
+
+    @property
+    def p_out_kw(self) -> np.ndarray:
+        """
+        DER output active powers in kW
+        """
+        return self.p_out_pu * self.der_file.NP_VA_MAX / 1000
+
+    @property
+    def q_out_kvar(self) -> np.ndarray:
+        """
+        DER output reactive powers in kvar
+        """
+        return self.q_out_pu * self.der_file.NP_VA_MAX / 1000
+
+    def step(self, v_pu: Union[np.ndarray, List], p_dc_pu: Union[np.ndarray, List, float],
+             theta: Union[np.ndarray, List] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Step the whole fleet by one time step (DER.t_s).
+
+        :param v_pu: DER RPA voltages in per unit. Shape (n, 3) for three-phase DERs or (n,) for single-phase DERs.
+        :param p_dc_pu: Available DC power in per unit, array of shape (n,) or a single value for all DERs
+        :param theta: DER RPA voltage angles in radian, same shape as v_pu. Default is balanced angles.
+        :return: DER output active and reactive power in per unit of NP_VA_MAX
+        """
+        f = self.der_file
+        self.time = self.time + DER.t_s
+
+        v_pu, theta, p_dc_pu = self.__condition_inputs(v_pu, p_dc_pu, theta)
+
+        # Input processing
+        if self.three_phase:
+            v_pos_pu = np.mean(v_pu * np.exp(1j * (theta + np.array([0, 2 / 3 * np.pi, -2 / 3 * np.pi]))), axis=1)
+            v_appl_pu = np.mean(v_pu, axis=1) if f.NP_V_MEAS_UNBALANCE == "AVG" else np.abs(v_pos_pu)
+        else:
+            v_pos_pu = v_pu * np.exp(1j * theta)
+            v_appl_pu = v_pu
+        self.v_meas_pu = self.__lpf('v_meas', v_appl_pu, f.NP_V_MEAS_DELAY)
+        p_avl_pu = np.maximum(p_dc_pu, 0) * f.NP_EFFICIENCY
+
+        # Desired active power
+        self.p_desired_pu = np.minimum(p_avl_pu, 1)
+        if f.AP_LIMIT_ENABLE:
+            self.p_desired_pu = np.minimum(self.p_desired_pu, self.__ap_limit())
+        if f.PV_MODE_ENABLE:
+            self.p_desired_pu = np.minimum(self.p_desired_pu, self.__volt_watt())
+
+        # Desired reactive power
+        if f.CONST_PF_MODE_ENABLE:
+            self.q_desired_pu = self.__const_pf()
+        elif f.QV_MODE_ENABLE:
+            self.q_desired_pu = self.__volt_var()
+        elif f.QP_MODE_ENABLE:
+            self.q_desired_pu = self.__watt_var()
+        elif f.CONST_Q_MODE_ENABLE:
+            self.q_desired_pu = self.__lpf('const_q', np.full(self.n, float(f.CONST_Q)), f.CONST_Q_RT - f.NP_REACT_TIME)
+        else:
+            self.q_desired_pu = np.zeros(self.n)
+
+        p_limited_w, q_limited_var = self.__capability_priority()
+        self.p_out_pu, self.q_out_pu = self.__current_output(p_limited_w / f.NP_VA_MAX, q_limited_var / f.NP_VA_MAX,
+                                                             v_pos_pu)
+
+        if self.validate:
+            self.__validate(v_pu, theta, p_dc_pu)
+
+        return self.p_out_pu, self.q_out_pu
+
+    def __condition_inputs(self, v_pu, p_dc_pu, theta) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Convert inputs to arrays of the fleet shape
+        """
+        shape = (self.n, 3) if self.three_phase else (self.n,)
+        v_pu = np.broadcast_to(np.asarray(v_pu, dtype=float).reshape(self.n, -1) if self.three_phase
+                               else np.asarray(v_pu, dtype=float).reshape(self.n), shape)
+        if theta is None:
+            theta = np.broadcast_to(np.array([0, -2 / 3 * np.pi, 2 / 3 * np.pi]) if self.three_phase else 0., shape)
+        else:
+            theta = np.broadcast_to(np.asarray(theta, dtype=float).reshape(v_pu.shape[0], -1) if self.three_phase
+                                    else np.asarray(theta, dtype=float).reshape(self.n), shape)
+        p_dc_pu = np.broadcast_to(np.asarray(p_dc_pu, dtype=float), (self.n,))
+        return v_pu, theta, p_dc_pu
+
+    def __lpf(self, key: str, lpf_in: np.ndarray, t_olrt: float) -> np.ndarray:
+        """
+        Vectorized low pass filter, same as OpenDER LowPassFilter
+        """
+        in_prev, out_prev = self.__lpf_states.get(key, (lpf_in, lpf_in))
+        if t_olrt < 1.15 * DER.t_s:
+            lpf_out = lpf_in
+        else:
+            t_olrt_t = t_olrt / 1.15
+            lpf_out = (DER.t_s / (DER.t_s + t_olrt_t)) * (lpf_in + in_prev) \
+                      + (t_olrt_t - DER.t_s) / (DER.t_s + t_olrt_t) * out_prev
+        self.__lpf_states[key] = (lpf_in, lpf_out)
+        return lpf_out
+
+    def __ramp(self, key: str, ramp_in: np.ndarray, ramp_up_time: float, ramp_down_time: float) -> np.ndarray:
+        """
+        Vectorized ramp rate limit, same as OpenDER Ramping
+        """
+        ramp_out_prev = self.__ramp_states.get(key, ramp_in)
+        ramp_out = ramp_in
+        if ramp_up_time != 0:
+            limit = ramp_out_prev + DER.t_s / ramp_up_time
+            ramp_out = np.where(limit < ramp_in, limit, ramp_out)
+        if ramp_down_time != 0:
+            limit = ramp_out_prev - DER.t_s / ramp_down_time
+            ramp_out = np.where(limit > ramp_in, limit, ramp_out)
+        self.__ramp_states[key] = ramp_out
+        return ramp_out
+
+    def __ap_limit(self) -> np.ndarray:
+        """
+        Active power limit function
+        """
+        f = self.der_file
+        ap_limit_pu = f.AP_LIMIT if f.AP_LIMIT > 0 else f.AP_LIMIT * f.NP_P_MAX_CHARGE / f.NP_P_MAX
+        return self.__ramp('ap_limit', np.full(self.n, float(ap_limit_pu)),
+                           f.AP_RT - f.NP_REACT_TIME, f.AP_RT - f.NP_REACT_TIME)
+
+    def __volt_watt(self) -> np.ndarray:
+        """
+        Volt-watt function, return active power limit in per unit
+        """
+        f = self.der_file
+        v = self.v_meas_pu
+        p1 = f.PV_CURVE_P1 * f.NP_P_MAX
+        p2 = f.PV_CURVE_P2 * (f.NP_P_MAX if f.PV_CURVE_P2 > 0 else f.NP_P_MAX_CHARGE)
+        p_ref_w = np.where(v <= f.PV_CURVE_V1, p1,
+                           np.where(v >= f.PV_CURVE_V2, p2,
+                                    p1 - (v - f.PV_CURVE_V1) / (f.PV_CURVE_V2 - f.PV_CURVE_V1) * (p1 - p2)))
+        return self.__lpf('volt_watt', p_ref_w / f.NP_P_MAX, f.PV_OLRT - f.NP_REACT_TIME)
+
+    def __const_pf(self) -> np.ndarray:
+        """
+        Constant power factor function
+        """
+        f = self.der_file
+        sign = 1 if f.CONST_PF_EXCITATION == "INJ" else -1
+        q_ref = sign * self.p_desired_pu * f.NP_P_MAX * (np.sqrt(1 - f.CONST_PF ** 2) / f.CONST_PF) / f.NP_VA_MAX
+        return self.__lpf('const_pf', q_ref, f.CONST_PF_RT - f.NP_REACT_TIME)
+
+    def __volt_var(self) -> np.ndarray:
+        """
+        Volt-var function
+        """
+        f = self.der_file
+        v = self.v_meas_pu
+        v1, v2, v3, v4 = [vk + f.QV_VREF - 1 for vk in [f.QV_CURVE_V1, f.QV_CURVE_V2, f.QV_CURVE_V3, f.QV_CURVE_V4]]
+        q1, q2, q3, q4 = f.QV_CURVE_Q1, f.QV_CURVE_Q2, f.QV_CURVE_Q3, f.QV_CURVE_Q4
+
+        # Same interval definition as OpenDER, later segments take precedence
+        with np.errstate(divide='ignore', invalid='ignore'):
+            q_ref = np.where(v < v1, q1, np.nan)
+            q_ref = np.where((v2 > v) & (v >= v1), q1 - (v - v1) / (v2 - v1) * (q1 - q2), q_ref)
+            q_ref = np.where((v3 > v) & (v >= v2), q2 - (v - v2) / (v3 - v2) * (q2 - q3), q_ref)
+            q_ref = np.where((v4 > v) & (v >= v3), q3 - (v - v3) / (v4 - v3) * (q3 - q4), q_ref)
+            q_ref = np.where(v >= v4, q4, q_ref)
+        return self.__lpf('volt_var', q_ref, f.QV_OLRT - f.NP_REACT_TIME)
+
+    def __watt_var(self) -> np.ndarray:
+        """
+        Watt-var function
+        """
+        f = self.der_file
+        p = self.p_desired_pu * np.where(self.p_desired_pu >= 0, 1, f.NP_P_MAX / f.NP_P_MAX_CHARGE)
+        p_curve = [f.QP_CURVE_P3_LOAD, f.QP_CURVE_P2_LOAD, f.QP_CURVE_P1_LOAD,
+                   f.QP_CURVE_P1_GEN, f.QP_CURVE_P2_GEN, f.QP_CURVE_P3_GEN]
+        q_curve = [f.QP_CURVE_Q3_LOAD, f.QP_CURVE_Q2_LOAD, f.QP_CURVE_Q1_LOAD,
+                   f.QP_CURVE_Q1_GEN, f.QP_CURVE_Q2_GEN, f.QP_CURVE_Q3_GEN]
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            q_ref = np.where(p <= p_curve[0], q_curve[0], np.nan)
+            for i in range(len(p_curve) - 1):
+                q_ref = np.where((p <= p_curve[i + 1]) & (p > p_curve[i]),
+                                 q_curve[i] - (p - p_curve[i]) / (p_curve[i + 1] - p_curve[i])
+                                 * (q_curve[i] - q_curve[i + 1]), q_ref)
+            q_ref = np.where(p > p_curve[-1], q_curve[-1], q_ref)
+        return self.__lpf('watt_var', q_ref, f.QP_RT - f.NP_REACT_TIME)
+
+    def __calculate_intercepts(self) -> dict:
+        """
+        Intercept points of the apparent power circle with the reactive power capability curves and the watt-var
+        curve, keyed by (curve, apparent power magnitude)
+        """
+        f = self.der_file
+        curves = {
+            'inj': ([x * f.NP_P_MAX for x in f.NP_Q_CAPABILITY_BY_P_CURVE['P_Q_INJ_PU']],
+                    [y * f.NP_VA_MAX for y in f.NP_Q_CAPABILITY_BY_P_CURVE['Q_MAX_INJ_PU']]),
+            'abs': ([x * f.NP_P_MAX for x in f.NP_Q_CAPABILITY_BY_P_CURVE['P_Q_ABS_PU']],
+                    [y * f.NP_VA_MAX for y in f.NP_Q_CAPABILITY_BY_P_CURVE['Q_MAX_ABS_PU']]),
+            'qp': ([-f.NP_P_MAX_CHARGE,
+                    f.QP_CURVE_P3_LOAD * f.NP_P_MAX_CHARGE,
+                    f.QP_CURVE_P2_LOAD * f.NP_P_MAX_CHARGE,
+                    f.QP_CURVE_P1_LOAD * f.NP_P_MAX_CHARGE,
+                    f.QP_CURVE_P1_GEN * f.NP_P_MAX,
+                    f.QP_CURVE_P2_GEN * f.NP_P_MAX,
+                    f.QP_CURVE_P3_GEN * f.NP_P_MAX,
+                    f.NP_P_MAX],
+                   [q * f.NP_VA_MAX for q in [f.QP_CURVE_Q3_LOAD, f.QP_CURVE_Q3_LOAD, f.QP_CURVE_Q2_LOAD,
+                                              f.QP_CURVE_Q1_LOAD, f.QP_CURVE_Q1_GEN, f.QP_CURVE_Q2_GEN,
+                                              f.QP_CURVE_Q3_GEN, f.QP_CURVE_Q3_GEN]]),
+        }
+        itcp = {}
+        for curve, (xp, yp) in curves.items():
+            for mag in [f.NP_VA_MAX, -f.NP_VA_MAX, -f.NP_APPARENT_POWER_CHARGE_MAX]:
+                itcp[(curve, mag)] = intercep_piecewise_circle(mag, xp, yp)
+        return itcp
+
+    def __intercept(self, curve: str, p_desired_w: np.ndarray, va_max_appl: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Look up the precomputed intercept points for each DER
+        """
+        p_itcp = np.zeros(self.n)
+        q_itcp = np.zeros(self.n)
+        mag = np.where(p_desired_w > 0, va_max_appl, -va_max_appl)
+        for value in np.unique(mag):
+            p_itcp[mag == value], q_itcp[mag == value] = self.__itcp[(curve, value)]
+        return p_itcp, q_itcp
+
+    def __capability_priority(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Limit desired active and reactive power by DER ratings and priority of responses, same as OpenDER
+        CapabilityPriority
+        """
+        f = self.der_file
+        curve = f.NP_Q_CAPABILITY_BY_P_CURVE
+        p_desired_w = self.p_desired_pu * f.NP_P_MAX
+        q_desired_var = self.q_desired_pu * f.NP_VA_MAX
+        va_max_appl = np.where(p_desired_w >= 0, f.NP_VA_MAX, f.NP_APPARENT_POWER_CHARGE_MAX)
+
+        def q_max(p_pu):
+            return (f.NP_VA_MAX * np.interp(p_pu, curve['P_Q_INJ_PU'], curve['Q_MAX_INJ_PU']),
+                    f.NP_VA_MAX * np.interp(p_pu, curve['P_Q_ABS_PU'], curve['Q_MAX_ABS_PU']))
+
+        if f.CONST_Q_MODE_ENABLE or f.QV_MODE_ENABLE:
+            q_max_inj, q_max_abs = q_max(self.p_desired_pu)
+            q_limited_by_p_var = np.minimum(q_max_inj, np.maximum(-q_max_abs, q_desired_var))
+            within = p_desired_w ** 2 + q_limited_by_p_var ** 2 < va_max_appl ** 2
+            if f.NP_PRIO_OUTSIDE_MIN_Q_REQ == 'ACTIVE':
+                q_requirement_abs = (0.25 if f.NP_NORMAL_OP_CAT == 'CAT_A' else 0.44) * f.NP_VA_MAX
+                q_requirement_inj = 0.44 * f.NP_VA_MAX
+                q_outside = np.minimum(q_requirement_inj, np.maximum(-q_requirement_abs, q_limited_by_p_var))
+            else:
+                q_outside = q_limited_by_p_var
+            q_limited_var = np.where(within, q_limited_by_p_var, q_outside)
+            p_limited_w = np.where(within, p_desired_w,
+                                   np.sqrt(np.maximum(va_max_appl ** 2 - q_outside ** 2, 0)) * np.sign(p_desired_w))
+
+        elif f.CONST_PF_MODE_ENABLE:
+            within = p_desired_w ** 2 + q_desired_var ** 2 < va_max_appl ** 2
+            k = np.minimum(1., va_max_appl / np.maximum(1.e-9, np.sqrt(p_desired_w ** 2 + q_desired_var ** 2)))
+            p_limited_pf_w = np.where(within, p_desired_w, p_desired_w * k)
+            q_limited_pf_var = np.where(within, q_desired_var, q_desired_var * k)
+
+            p_itcp_inj, q_itcp_inj = self.__intercept('inj', p_desired_w, va_max_appl)
+            p_itcp_abs, q_itcp_abs = self.__intercept('abs', p_desired_w, va_max_appl)
+            p_itcp_w = np.where(q_limited_pf_var > 0, p_itcp_inj, p_itcp_abs)
+            q_itcp_var = np.where(q_limited_pf_var > 0, q_itcp_inj, q_itcp_abs)
+
+            p_limited_w = np.where(np.abs(q_limited_pf_var) > q_itcp_var,
+                                   np.minimum(np.abs(p_itcp_w), np.abs(p_desired_w)) * np.sign(p_desired_w),
+                                   p_limited_pf_w)
+            q_max_inj, q_max_abs = q_max(p_limited_w / f.NP_P_MAX)
+            q_limited_var = np.minimum(q_max_inj, np.maximum(-q_max_abs, q_limited_pf_var))
+
+        elif f.QP_MODE_ENABLE:
+            within = p_desired_w ** 2 + q_desired_var ** 2 < va_max_appl ** 2
+            p_itcp_w, q_itcp_var = self.__intercept('qp', p_desired_w, va_max_appl)
+            p_limited_w = np.where(within, p_desired_w,
+                                   np.where(p_desired_w > 0, np.minimum(p_itcp_w, p_desired_w),
+                                            np.maximum(p_itcp_w, p_desired_w)))
+            q_limited_qp_var = np.where(within, q_desired_var,
+                                        np.minimum(np.abs(q_itcp_var), np.abs(q_desired_var)) * np.sign(q_desired_var))
+            q_max_inj, q_max_abs = q_max(p_desired_w / f.NP_P_MAX)
+            q_limited_var = np.minimum(q_max_inj, np.maximum(-q_max_abs, q_limited_qp_var))
+
+        else:
+            p_limited_w = p_desired_w
+            q_limited_var = np.zeros(self.n)
+
+        return p_limited_w, q_limited_var
+
+    def __current_output(self, p_limited_pu: np.ndarray, q_limited_pu: np.ndarray,
+                         v_pos_pu: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Normal operation output current with current limit, active current ramp and inverter delay, and the resulting
+        output active and reactive power in per unit
+        """
+        f = self.der_file
+        v_pos_mag = np.maximum(np.abs(v_pos_pu), 0.0001)
+        i_d = p_limited_pu / v_pos_mag
+        i_q = -q_limited_pu / v_pos_mag
+
+        # Current limit, only the active current is reduced if the reactive current is within the limit
+        i_mag = np.sqrt(i_d ** 2 + i_q ** 2)
+        over = i_mag > f.NP_CURRENT_PU
+        q_over = over & (np.abs(i_q) > f.NP_CURRENT_PU)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # OpenDER searches the active current scale with a 1e-4 resolution
+            scale = np.floor(np.sqrt(np.maximum(f.NP_CURRENT_PU ** 2 - i_q ** 2, 0)) / np.abs(i_d) * 1e4) / 1e4
+            i_d = np.where(q_over, 0, np.where(over, i_d * scale, i_d))
+            i_q = np.where(q_over, i_q / np.abs(i_q) * f.NP_CURRENT_PU, i_q)
+
+        # Active current ramp up limit
+        if f.NP_RT_RAMP_UP_TIME != 0:
+            ramp_out_prev = self.__ramp_states.get('i_pos_d', i_d)
+            limit = DER.t_s / f.NP_RT_RAMP_UP_TIME
+            up = self.__i_pos_d_rrl >= 0
+            i_d = np.where(up & (ramp_out_prev + limit < i_d), ramp_out_prev + limit,
+                           np.where(~up & (ramp_out_prev - limit > i_d), ramp_out_prev - limit, i_d))
+            self.__ramp_states['i_pos_d'] = i_d
+        self.__i_pos_d_rrl = i_d
+
+        i_pos_pu = self.__lpf('i_pos', (i_d + 1j * i_q) * np.exp(1j * np.angle(v_pos_pu)), f.NP_INV_DELAY)
+        s_out_pu = i_pos_pu * np.conjugate(v_pos_pu)
+        return s_out_pu.real, -s_out_pu.imag
+
+    def __validate(self, v_pu: np.ndarray, theta: np.ndarray, p_dc_pu: np.ndarray) -> None:
+        """
+        Step per-object OpenDER models with the same inputs and record the maximum deviation of outputs
+        """
+        p_ref = np.zeros(self.n)
+        q_ref = np.zeros(self.n)
+        for i, der_obj in enumerate(self.der_objs):
+            if self.three_phase:
+                der_obj.update_der_input(v_pu=list(v_pu[i]), theta=list(theta[i]), p_dc_pu=p_dc_pu[i], f=60)
+            else:
+                der_obj.update_der_input(v_pu=float(v_pu[i]), theta=float(theta[i]), p_dc_pu=p_dc_pu[i], f=60)
+            der_obj.run()
+            p_ref[i] = der_obj.p_out_pu
+            q_ref[i] = der_obj.q_out_pu
+
+        self.max_deviation['p_out_pu'] = max(self.max_deviation['p_out_pu'], float(np.max(np.abs(p_ref - self.p_out_pu))))
+        self.max_deviation['q_out_pu'] = max(self.max_deviation['q_out_pu'], float(np.max(np.abs(q_ref - self.q_out_pu))))
@@ -11,13 +11,18 @@
 #   to endorse or promote products derived from this software without specific
 #   prior written permission.
 
+import contextlib
+import math
+import numpy as np
 import pandas as pd
 from opender import DER, DER_PV, DER_BESS, DERCommonFileFormat, DERCommonFileFormatBESS
 from typing import Union, Tuple, List, Dict
 from copy import deepcopy
-from opender_interface.voltage_regulator import VR_Model
+from numbers import Number
+from opender_interface.voltage_regulator import VR_Model, VRBank
 from opender_interface.dx_tool_interface import DxToolInterfacesABC
 from opender_interface.opendss_interface import OpenDSSInterface
+from opender_interface.instrumentation import StageTimer, TraceWriter
 import os
 
 
@@ -31,6 +36,33 @@ class DERInterface:
     Q_TOLERANCE = 0.00001
     P_TOLERANCE = 0.01
 
+    # Methods timed by enable_timing(), as {method name: stage name}
+    TIMED_STAGES = {
+        'run': 'run',
+        'run_ders': 'der_step',
+        'run_vrs': 'vr_logic',
+        'der_convergence_process': 'convergence',
+        '_DERInterface__iterate_convergence': 'convergence_iteration',
+        '_DERInterface__convergence_iteration': 'convergence_check',
+    }
+
+    # Delay times of OpenDER conditional delayed enable timers (e.g. enter service delay), as {timer attribute name:
+    # (attribute, setting name) of the object owning the timer}. Refer to enable_event_driven().
+    CONDITIONAL_DELAYS = {
+        'vft_delay': ('exec_delay', 'es_delay_exec'),
+        'uv1_delay': ('exec_delay', 'uv1_trip_t_exec'),
+        'uv2_delay': ('exec_delay', 'uv2_trip_t_exec'),
+        'ov1_delay': ('exec_delay', 'ov1_trip_t_exec'),
+        'ov2_delay': ('exec_delay', 'ov2_trip_t_exec'),
+        'uf1_delay': ('exec_delay', 'uf1_trip_t_exec'),
+        'uf2_delay': ('exec_delay', 'uf2_trip_t_exec'),
+        'of1_delay': ('exec_delay', 'of1_trip_t_exec'),
+        'of2_delay': ('exec_delay', 'of2_trip_t_exec'),
+        'rt_return_from_mc_delay': ('der_file', 'MC_RETURN_T'),
+        'rt_cte_cond_delay': ('der_file', 'NP_CTE_RESP_T'),
+        'rt_mc_cond_delay': ('der_file', 'MC_RESP_T'),
+    }
+
     def __init__(self, simulator_ckt, t_s=DER.t_s, print_der=True):
         """
         Create the "DERInterface" object, assigning the provided simulator interface object to the "ckt" attribute.
@@ -50,9 +82,12 @@ class DERInterface:
             raise ValueError(f'Circuit simulation file path incorrect: {simulator_ckt}')
 
         self.der_objs = []
+        self.der_groups = {}
+        self.aggregation_factor = 1
         self.t_s = t_s
         DER.t_s = t_s
         self.vr_objs = []
+        self.vr_bank = None
 
         self.__der_objs_temp = []
 
@@ -85,6 +120,30 @@ class DERInterface:
 
         self.print_der = print_der
 
+        # Event-driven DER stepping, refer to enable_event_driven()
+        self.event_driven = False
+        self.v_deadband = 0
+        self.f_deadband = 0
+        self.p_deadband = 0
+        self.state_tolerance = 0
+        self.__quiescent = []
+        self.__ref_inputs = []
+        self.__last_state = []
+        self.__state_keys = []
+        self.__delays = []
+        self.__timers = []
+        self.__der_steps = 0
+        self.__der_skips = 0
+
+        # Per-stage timing, refer to enable_timing(), and trace, refer to enable_tracing()
+        self.timer = None
+        self.trace = None
+        self.__timing_for_trace = False
+
+        # Number of iterations of the latest and of all convergence processes
+        self.convergence_iterations = 0
+        self.total_convergence_iterations = 0
+
     def cmd(self, cmd_line: Union[str, List[str]]) -> Union[str, List[str]]:
         """
         Execute commands
@@ -103,53 +162,94 @@ class DERInterface:
 
         self.ckt.initialize(**kwargs)
 
-    def create_opender_objs(self, der_files: Union[Dict[str, DERCommonFileFormat], DERCommonFileFormat], p_pu=0) -> Union[List[DER_PV],List[DER_BESS]]:
+    def create_opender_objs(self, der_files: Union[Dict[str, DERCommonFileFormat], DERCommonFileFormat], p_pu=0,
+                            aggregate=False) -> Union[List[DER_PV],List[DER_BESS]]:
         """
         Create OpenDER object on the circuit based on the DER configuration files provided. If a single
         DERCommonFileFormat object is provided, it is assumed all DERs on the circuit have the same ratings and control
         settings. If a dictionary is provided, please use the format of {'DER_name':DERCommonFileFormat}. DER_name
         should match the ones in the circuit definition. The created OpenDER objects will be returned as a list.
 
+        If aggregate is True, DERs connected to the same bus and phases, with the same type and settings, are
+        represented by one equivalent OpenDER object with nameplate ratings scaled by the number of members. The
+        circuit element of the first member carries the equivalent output, and the elements of the other members are
+        disabled. The grouping is recorded in .der_groups, and the outputs of the members are available from
+        disaggregate_der_outputs().
+
         Input parameters:
 
         :param der_files: Either a single DERCommonFileFormat object or a dictionary of them, containing the OpenDER
                           ratings and control settings.
         :param p_pu: initializing DER available power for PV or demanded active power for BESS. Default value is 0
+        :param aggregate: If True, aggregate co-located DERs with identical settings into equivalent units
         """
 
         # If received a single configuration file, convert to a dictionary
         if isinstance(der_files, DERCommonFileFormat) or isinstance(der_files, DERCommonFileFormatBESS):
             der_files = {der_obj[1]['name']: der_files for der_obj in self.ckt.DERs.iterrows()}
 
+        # Group DERs by bus, phases, type and settings. Without aggregation, each DER is its own group.
+        groups = {}
         for (index, der_i), setting in zip(self.ckt.DERs.iterrows(), der_files):
             created = False
             for name, der_file in der_files.items():
                 if name.upper() == der_i['name'].upper():
-                    if 'PV' in der_i['name'].upper():
-                        der_obj = DER_PV(der_file)
-                    else:
-                        if not isinstance(der_file, DERCommonFileFormatBESS):
-                            der_file = DERCommonFileFormatBESS(convert=der_file)
-                        der_obj = DER_BESS(der_file)
-
-                    self.ckt.update_der_info(name, der_obj)
-
-                    der_obj.name = der_i['name']
-                    der_obj.bus = der_i['bus']
-                    der_obj.der_file.NP_V_DC = der_i['kV'] * 1500
-                    der_obj.der_file.NP_AC_V_NOM = der_i['kV'] * 1000
-
-                    DER.t_s = self.t_s
-                    if isinstance(der_obj, DER_BESS):
-                        der_obj.update_der_input(p_dem_pu=p_pu, f=60)
+                    is_pv = 'PV' in der_i['name'].upper()
+                    if aggregate:
+                        key = (der_i['bus'].upper(), der_i['kV'], is_pv, self.__settings_key(der_file))
                     else:
-                        der_obj.update_der_input(p_dc_pu=p_pu, f=60)
-
-                    self.der_objs.append(der_obj)
+                        key = (index, name)
+                    groups.setdefault(key, []).append((der_i, der_file, is_pv))
                     created = True
             if not created:
                 raise ValueError(f'DER named {der_i["name"]} does not have a configuration file specified')
 
+        # Disable the circuit elements of the aggregated members first, so that unsupported circuits fail before the
+        # circuit and the OpenDER objects are changed
+        disabled = [member_i['name'] for members in groups.values() for member_i, _, _ in members[1:]]
+        if disabled:
+            if not hasattr(self.ckt, 'disable_der'):
+                raise ValueError(f'{type(self.ckt).__name__} does not support disabling DERs, which is needed for DER '
+                                 f'aggregation. Use create_opender_objs() with aggregate=False')
+            for name in disabled:
+                self.ckt.disable_der(name)
+
+        for members in groups.values():
+            der_i, der_file, is_pv = members[0]
+            name = der_i['name']
+            if is_pv:
+                if len(members) > 1:
+                    der_file = self.__scale_der_file(der_file, len(members))
+                der_obj = DER_PV(der_file)
+            else:
+                if not isinstance(der_file, DERCommonFileFormatBESS):
+                    der_file = DERCommonFileFormatBESS(convert=der_file)
+                if len(members) > 1:
+                    der_file = self.__scale_der_file(der_file, len(members))
+                der_obj = DER_BESS(der_file)
+
+            self.ckt.update_der_info(name, der_obj)
+
+            der_obj.name = der_i['name']
+            der_obj.bus = der_i['bus']
+            der_obj.der_file.NP_V_DC = der_i['kV'] * 1500
+            der_obj.der_file.NP_AC_V_NOM = der_i['kV'] * 1000
+
+            DER.t_s = self.t_s
+            if isinstance(der_obj, DER_BESS):
+                der_obj.update_der_input(p_dem_pu=p_pu, f=60)
+            else:
+                der_obj.update_der_input(p_dc_pu=p_pu, f=60)
+
+            self.der_objs.append(der_obj)
+            self.der_groups[der_obj.name] = [member_i['name'] for member_i, _, _ in members]
+
+        n_members = sum(len(members) for members in self.der_groups.values())
+        self.aggregation_factor = n_members / len(self.der_objs) if self.der_objs else 1
+        if aggregate and self.print_der:
+            print(f'{n_members} DERs are represented by {len(self.der_objs)} equivalent units, '
+                  f'reduction factor {self.aggregation_factor:.2f}')
+
         self.__numberofders = len(self.der_objs)
 
         self.__der_files = [der_obj.der_file for der_obj in self.der_objs]
@@ -177,6 +277,68 @@ class DERInterface:
 
         return self.der_objs
 
+    @staticmethod
+    def __der_file_parameters(der_file: DERCommonFileFormat) -> List[Tuple[str, object]]:
+        """
+        Return the (name, value) of all ratings and settings in a DER configuration file.
+
+        :param der_file: DER configuration file
+        """
+        # The parameter names are only available from the parameters_list class attribute of the OpenDER
+        # configuration file classes, which is kept in this single place in case OpenDER changes it.
+        return [(param, getattr(der_file, param, None)) for param in type(der_file).parameters_list]
+
+    @staticmethod
+    def __settings_key(der_file: DERCommonFileFormat) -> Tuple:
+        """
+        Return a hashable key of all ratings and settings in a DER configuration file, used for aggregation.
+
+        :param der_file: DER configuration file
+        """
+        return (type(der_file).__name__,) + tuple((param, repr(value))
+                                                  for param, value in DERInterface.__der_file_parameters(der_file))
+
+    @staticmethod
+    def __scale_der_file(der_file: DERCommonFileFormat, n: int) -> DERCommonFileFormat:
+        """
+        Return a copy of a DER configuration file with nameplate ratings scaled for n identical DERs. Per unit
+        settings are unchanged.
+
+        :param der_file: DER configuration file of a single DER
+        :param n: Number of DERs represented by the equivalent unit
+        """
+        der_file = deepcopy(der_file)
+        # Reactive power ratings first, so that the rating checks are performed against the scaled NP_VA_MAX
+        for param in ['NP_Q_MAX_INJ', 'NP_Q_MAX_ABS', 'NP_VA_MAX', 'NP_P_MAX', 'NP_P_MAX_OVER_PF', 'NP_P_MAX_UNDER_PF',
+                      'NP_P_MAX_CHARGE', 'NP_APPARENT_POWER_CHARGE_MAX', 'NP_REACTIVE_SUSCEPTANCE', 'NP_BESS_CAPACITY']:
+            value = getattr(der_file, param, None)
+            if value is not None:
+                setattr(der_file, param, value * n)
+        return der_file
+
+    def disaggregate_der_outputs(self) -> pd.DataFrame:
+        """
+        Return the outputs of individual DERs. For equivalent units created by create_opender_objs(aggregate=True),
+        the output is shared equally among the members, which have identical ratings and settings.
+
+        :return: DER outputs in DataFrame, indexed by DER names, with columns of 'equivalent', 'p_out_kw',
+                 'q_out_kvar', 'p_out_pu', 'q_out_pu', 'v_meas_pu' and 'der_status'
+        """
+        outputs = {}
+        for der_obj in self.der_objs:
+            members = self.der_groups.get(der_obj.name, [der_obj.name])
+            for member in members:
+                outputs[member] = {
+                    'equivalent': der_obj.name,
+                    'p_out_kw': der_obj.p_out_kw / len(members),
+                    'q_out_kvar': der_obj.q_out_kvar / len(members),
+                    'p_out_pu': der_obj.p_out_pu,
+                    'q_out_pu': der_obj.q_out_pu,
+                    'v_meas_pu': der_obj.der_input.v_meas_pu,
+                    'der_status': der_obj.der_status,
+                }
+        return pd.DataFrame.from_dict(outputs, orient='index')
+
     def update_der_output_powers(self, der_list: List = None, p_list: List = None, q_list: List = None) -> None:
         """
         Update DER output information in terms of active and reactive power into the circuit simulation solver.
@@ -230,9 +392,14 @@ class DERInterface:
         """
         self.ckt.solve_power_flow()
 
-    def create_vr_objs(self):
+    def create_vr_objs(self, bank=False):
         """
         Create voltage regulator (VR_Model) object based on their definition in the circuit simulation tool
+
+        :param bank: If True, also create a VRBank object (.vr_bank), which calculates all the voltage regulators in
+                     one vectorized call in run(). The VR_Model objects remain the source of truth: they are loaded
+                     into the bank before each calculation and updated from it afterwards, so they can still be run
+                     or advanced individually, e.g. by MultirateScheduler or FastForwardDriver.
         """
         for fdr_vrname in self.ckt.VRs.keys():
             self.vr_objs.append(VR_Model(
@@ -248,6 +415,8 @@ class DERInterface:
                 CT_Primary=self.ckt.VRs[fdr_vrname]['CT_Primary'],
                 tap_ini=0,
                 ))
+        if bank:
+            self.vr_bank = VRBank(self.vr_objs)
 
     def enable_control(self) -> None:
         """
@@ -290,7 +459,7 @@ class DERInterface:
         the initial condition for a dynamic simulation.
         """
         for vr in self.vr_objs:
-            vr.tap = float(self.ckt.VRs[vr.name]['tapPos'])
+            vr.tap = int(self.ckt.VRs[vr.name]['tapPos'])
 
     def read_vr_v_i(self,vrname) -> Tuple[float, float]:
         """
@@ -303,30 +472,398 @@ class DERInterface:
     def run(self, der_objs=None):
         """
         Run OpenDER objects, utilizing circuit information such as DER bus voltages as input, and compute DER output.
+        If event-driven stepping is enabled, quiescent DERs are skipped, refer to enable_event_driven().
 
         :param der_objs: By default, calculate all DER objects. If provided, this function will exclusively run
                         for the designated DER
         """
 
-        if der_objs is None:
-            der_objs = self.der_objs
-
         # Read DER terminal voltages
         self.read_sys_voltage()
         v_der_list, theta_der_list = self.read_der_voltage()
-        for der, V, theta in zip(der_objs, v_der_list, theta_der_list):
+        self.run_ders(v_der_list, theta_der_list, der_objs)
+
+        # run voltage regulator logics
+        self.run_vrs()
+
+    def run_vrs(self) -> None:
+        """
+        Run voltage regulator logics, utilizing the VR voltages and currents from circuit simulators
+        """
+        if self.vr_bank is not None:
+            vr_v_i = [self.read_vr_v_i(vr.name) for vr in self.vr_objs]
+            self.vr_bank.load_vr_objs(self.vr_objs)
+            self.vr_bank.run(Vpri=[Vpri for Vpri, Ipri in vr_v_i], Ipri=[Ipri for Vpri, Ipri in vr_v_i])
+            self.vr_bank.update_vr_objs(self.vr_objs)
+        else:
+            for vr in self.vr_objs:
+                # read voltage regulator primary voltage
+                Vpri, Ipri = self.read_vr_v_i(vr.name)
+                # Voltage regulator operations
+                vr.run(Vpri=Vpri, Ipri=Ipri)
+
+    def run_ders(self, v_der_list: List, theta_der_list: List, der_objs=None) -> None:
+        """
+        Run OpenDER objects with the DER terminal voltages provided, e.g. obtained from read_der_voltage().
+
+        :param v_der_list: List of DER terminal voltage magnitudes (pu)
+        :param theta_der_list: List of DER terminal voltage angles (radian)
+        :param der_objs: By default, calculate all DER objects. If provided, this function will exclusively run
+                        for the designated DER
+        """
+
+        if der_objs is None:
+            der_objs = self.der_objs
+
+        # Quiescence is only tracked for the actual DER objects, not the temporary ones in convergence process
+        event_driven = self.event_driven and der_objs is self.der_objs
+        if event_driven and len(self.__quiescent) != len(der_objs):
+            self.__reset_quiescence()
+
+        for i, (der, V, theta) in enumerate(zip(der_objs, v_der_list, theta_der_list)):
+            V = tuple(V)
+            theta = tuple(theta)
+            if event_driven:
+                if self.__check_quiescent(i, der, V, theta):
+                    # A settled DER with unchanged inputs would produce the same state, only the time elapses
+                    der.time = der.time + DER.t_s
+                    self.__der_skips = self.__der_skips + 1
+                    continue
+                self.__der_steps = self.__der_steps + 1
+
             # Update the voltages to OpenDER objects, and Compute DER output power
             der.update_der_input(v_pu=list(V), theta=list(theta))
             der.run()
             # if self.print_der:
                 # print(der, list(theta)[0], der.der_input.freq_hz)
 
-        # run voltage regulator logics
-        for vr in self.vr_objs:
-            # read voltage regulator primary voltage
-            Vpri, Ipri = self.read_vr_v_i(vr.name)
-            # Voltage regulator operations
-            vr.run(Vpri=Vpri, Ipri=Ipri)
+            if event_driven:
+                self.__update_quiescence(i, der, V, theta)
+
+    def enable_timing(self, timer: StageTimer = None) -> StageTimer:
+        """
+        Enable per-stage timing of the simulation: OpenDER runs ('run' and stepping 'der_step'), voltage regulator
+        logics ('vr_logic'), convergence process ('convergence', 'convergence_iteration' and 'convergence_check'), and
+        the stages of the circuit simulation tool interface, e.g. voltage reads ('read_voltage'), DER writes
+        ('write_der'), power flow solution ('solve') and line flow reads ('read_line_flow'). Refer to StageTimer and
+        timing_report().
+
+        :param timer: StageTimer to accumulate the durations into. Default is a new one. If tracing is enabled, the
+                      trace is carried over to it, refer to enable_tracing()
+        :return: StageTimer object, also accessed by .timer
+        """
+        if self.timer is not None:
+            self.disable_timing()
+        self.timer = StageTimer() if timer is None else timer
+        self.timer.trace = self.trace
+        # timing enabled explicitly is kept when tracing is disabled
+        self.__timing_for_trace = False
+        self.timer.instrument(self, self.TIMED_STAGES)
+        if hasattr(self.ckt, 'enable_timing'):
+            self.ckt.enable_timing(self.timer)
+        return self.timer
+
+    def disable_timing(self) -> None:
+        """
+        Disable per-stage timing. The durations accumulated so far are kept in .timer
+        """
+        if self.timer is not None:
+            self.timer.restore(self)
+        if hasattr(self.ckt, 'disable_timing'):
+            self.ckt.disable_timing()
+
+    def timing_report(self) -> pd.DataFrame:
+        """
+        Return the summary of the per-stage timing, refer to StageTimer.report()
+        """
+        if self.timer is None:
+            raise ValueError('Timing is not enabled, call enable_timing() first')
+        return self.timer.report()
+
+    def enable_tracing(self, path: str, every: int = 1, slow: float = None, min_duration: float = 0,
+                       max_events: int = None) -> TraceWriter:
+        """
+        Stream the timed stages (refer to enable_timing()) as Chrome trace-event JSON spans to a file, which can be
+        opened in trace viewers such as Perfetto. In addition to the stages, each DERInterface.run() call is a 'run'
+        span and each iteration of the convergence process is a 'convergence_iteration' span. Per-stage timing is
+        enabled if it is not yet, and disabled again by disable_tracing(). If enable_timing() is called while tracing,
+        the trace is carried over to the new StageTimer.
+
+        Spans are sampled by top-level span (refer to TraceWriter). CoSimService, FastForwardDriver and
+        MultirateScheduler enclose each time step in a 'step' span, so that every n-th time step is written as a
+        whole. To sample a custom simulation loop by time step, enclose each step in step_span():
+
+            with ckt_int.step_span(t):
+                ckt_int.run()
+                ...
+
+        :param path: Trace file path, e.g. 'trace.json' or 'trace.json.gz' for a compressed file
+        :param every: Write every n-th top-level span (e.g. time step or convergence process)
+        :param slow: Always write top-level spans longer than this (s). Default is None, sampling only by every
+        :param min_duration: Drop nested spans shorter than this (s)
+        :param max_events: Maximum number of events written. Default is None, no limit
+        :return: TraceWriter object, also accessed by .trace
+        """
+        if self.trace is not None:
+            self.disable_tracing()
+        timing_for_trace = self.timer is None
+        if timing_for_trace:
+            self.enable_timing()
+        self.__timing_for_trace = timing_for_trace
+        self.trace = TraceWriter(path, origin=self.timer.clock(), every=every, slow=slow, min_duration=min_duration,
+                                 max_events=max_events)
+        self.timer.trace = self.trace
+        return self.trace
+
+    def step_span(self, t: float):
+        """
+        Return a context manager timing a simulation time step as a 'step' span (refer to StageTimer.span()), which
+        groups the stages of the step in the trace. Nothing is timed if timing is not enabled.
+
+        :param t: Simulation time (s) of the step
+        """
+        if self.timer is None:
+            return contextlib.nullcontext()
+        return self.timer.span('step', time=t)
+
+    def disable_tracing(self) -> None:
+        """
+        Stop tracing and close the trace file
+        """
+        if self.trace is None:
+            return
+        self.trace.close()
+        self.timer.trace = None
+        self.trace = None
+        if self.__timing_for_trace:
+            self.disable_timing()
+            self.timer = None
+            self.__timing_for_trace = False
+
+    def enable_event_driven(self, v_deadband: float = 0, f_deadband: float = 0, p_deadband: float = 0,
+                            state_tolerance: float = 0) -> None:
+        """
+        Enable event-driven DER stepping in run(). A DER is skipped if its internal states did not change in its
+        previous step, and its inputs remain within the deadbands of the inputs of that step. A skipped DER wakes
+        up immediately when its inputs or settings change. With the default deadbands and tolerance of 0, the
+        simulation results are identical to stepping every DER.
+
+        A DER whose only changing states are conditional delayed enable timers counting toward their delays (e.g. the
+        enter service delay after a trip, refer to CONDITIONAL_DELAYS) is also skipped, with the timers advanced as
+        OpenDER would, and wakes up in the time step its earliest timer expires.
+
+        :param v_deadband: Deadband of DER terminal voltage magnitudes (pu) and angles (radian)
+        :param f_deadband: Deadband of DER frequency (Hz)
+        :param p_deadband: Deadband of DER available DC power for PV or demanded power for BESS (pu)
+        :param state_tolerance: Tolerance of internal states (e.g. low pass filter outputs) considered as settled.
+                                Filters approaching their final values by floating point rounding may take long to
+                                settle exactly, so a small tolerance such as 1e-9 largely increases the skip ratio.
+        """
+        self.event_driven = True
+        self.v_deadband = v_deadband
+        self.f_deadband = f_deadband
+        self.p_deadband = p_deadband
+        self.state_tolerance = state_tolerance
+        self.__reset_quiescence()
+
+    def disable_event_driven(self) -> None:
+        """
+        Disable event-driven DER stepping, so that all DERs are calculated in every run()
+        """
+        self.event_driven = False
+
+    @property
+    def skip_ratio(self) -> float:
+        """
+        Ratio of DER steps skipped by event-driven stepping, since it was enabled
+        """
+        total = self.__der_steps + self.__der_skips
+        return self.__der_skips / total if total else 0
+
+    @property
+    def all_quiescent(self) -> bool:
+        """
+        True if event-driven stepping is enabled and all DERs are quiescent, i.e. their states will not change
+        until their inputs change
+        """
+        return (self.event_driven and len(self.__quiescent) == len(self.der_objs) and all(self.__quiescent)
+                and not any(self.__timers))
+
+    def steps_to_next_der_change(self) -> float:
+        """
+        Return the number of time steps until the next possible DER state change, if the DER inputs do not change:
+        infinity if all DERs are quiescent (refer to all_quiescent), 1 if any DER is not quiescent, otherwise the time
+        steps until the earliest timer of the DERs expires, e.g. the enter service delay.
+        """
+        if not self.event_driven or len(self.__quiescent) != len(self.der_objs) or not all(self.__quiescent):
+            return 1
+
+        steps = math.inf
+        for timers in self.__timers:
+            for delay, delay_time in timers:
+                # One step earlier than the exact quotient, as the timers are accumulated step by step in floating
+                # point and may expire one step earlier or later
+                steps = min(steps, max(math.ceil((delay_time - delay.con_del_enable_int) / DER.t_s) - 1, 1))
+        return steps
+
+    def skip_ders(self, n: int) -> None:
+        """
+        Advance all DERs by n time steps without calculating them, as run() would skip them with unchanged inputs:
+        the elapsed time and the timers counting toward their delays are advanced. Only call this with n less than
+        steps_to_next_der_change().
+
+        :param n: Number of time steps
+        """
+        if self.steps_to_next_der_change() <= n:
+            raise ValueError(f'DERs cannot be skipped by {n} time steps, as their states may change before')
+
+        for der, timers in zip(self.der_objs, self.__timers):
+            # The time is added step by step rather than n * DER.t_s at once, to reproduce the floating point
+            # accumulation of run(), so that the results are identical to stepping the DERs. This is negligible
+            # compared to calculating the DERs.
+            for _ in range(n):
+                der.time = der.time + DER.t_s
+                for delay, _ in timers:
+                    delay.con_del_enable_int = delay.con_del_enable_int + DER.t_s
+        self.__der_skips = self.__der_skips + n * len(self.der_objs)
+
+    def __reset_quiescence(self):
+        """
+        Reset quiescence detection, so that all DERs are calculated in the next run()
+        """
+        self.__quiescent = [False for der_obj in self.der_objs]
+        self.__ref_inputs = [None for der_obj in self.der_objs]
+        self.__last_state = [None for der_obj in self.der_objs]
+        self.__state_keys = [None for der_obj in self.der_objs]
+        self.__delays = [None for der_obj in self.der_objs]
+        self.__timers = [[] for der_obj in self.der_objs]
+        self.__der_steps = 0
+        self.__der_skips = 0
+
+    @staticmethod
+    def __der_inputs(der: Union[DER_PV, DER_BESS], V: Tuple, theta: Tuple) -> Tuple:
+        """
+        Collect the inputs of an OpenDER object: terminal voltages and angles, frequency, power (pu), settings and
+        simulation time step.
+        """
+        if isinstance(der, DER_BESS):
+            p_w = der.der_input.p_dem_w
+        else:
+            p_w = der.der_input.p_dc_w
+        p_pu = None if p_w is None else p_w / der.der_file.NP_P_MAX
+        settings = tuple(value for _, value in DERInterface.__der_file_parameters(der.der_file))
+        return V, theta, der.der_input.freq_hz, p_pu, settings, DER.t_s
+
+    @staticmethod
+    def __der_state_keys(obj, keys=None, seen=None) -> List[Tuple]:
+        """
+        Collect the (object, attribute name) pairs of internal states in an OpenDER object and its sub-modules. The
+        elapsed time and the settings are excluded.
+        """
+        if keys is None:
+            keys = []
+            seen = set()
+        seen.add(id(obj))
+        for key in (vars(obj).keys() if hasattr(obj, '__dict__') else obj.__slots__):
+            if key in ('time', 'der_file', 'der_file_exec', 'name', 'bus'):
+                continue
+            value = getattr(obj, key, None)
+            if isinstance(value, DERCommonFileFormat):
+                # Copies of settings in setting execution delay, changes of settings are checked separately
+                continue
+            if type(value).__module__.startswith('opender.'):
+                if id(value) not in seen:
+                    DERInterface.__der_state_keys(value, keys, seen)
+            else:
+                keys.append((obj, key))
+        return keys
+
+    @staticmethod
+    def __der_delays(obj, delays=None, seen=None) -> Dict[int, Tuple]:
+        """
+        Collect the conditional delayed enable timers in an OpenDER object and its sub-modules, as {id of timer:
+        (object owning the timer, attribute, setting name of the delay time)}, refer to CONDITIONAL_DELAYS.
+        """
+        if delays is None:
+            delays = {}
+            seen = set()
+        seen.add(id(obj))
+        for key in (vars(obj).keys() if hasattr(obj, '__dict__') else obj.__slots__):
+            value = getattr(obj, key, None)
+            if key in DERInterface.CONDITIONAL_DELAYS:
+                delays[id(value)] = (obj, *DERInterface.CONDITIONAL_DELAYS[key])
+            elif (type(value).__module__.startswith('opender.') and not isinstance(value, DERCommonFileFormat)
+                  and id(value) not in seen):
+                DERInterface.__der_delays(value, delays, seen)
+        return delays
+
+    def __counting_timer(self, i, obj, key, previous) -> Union[Tuple, None]:
+        """
+        If a changed internal state of a DER is a conditional delayed enable timer counting toward its delay, return
+        the timer and its delay time.
+        """
+        if key != 'con_del_enable_int' or id(obj) not in self.__delays[i]:
+            return None
+        owner, attribute, setting = self.__delays[i][id(obj)]
+        delay_time = getattr(getattr(owner, attribute), setting)
+        if (obj.con_del_enable_out == 0 and isinstance(previous, Number)
+                and obj.con_del_enable_int == previous + DER.t_s < delay_time):
+            return obj, delay_time
+        return None
+
+    def __check_quiescent(self, i, der, V, theta) -> bool:
+        """
+        Check whether a quiescent DER can be skipped, i.e. its inputs remain within the deadbands. Otherwise,
+        wake it up.
+        """
+        if not self.__quiescent[i]:
+            return False
+
+        V_ref, theta_ref, f_ref, p_ref, settings_ref, t_s_ref = self.__ref_inputs[i]
+        _, _, f, p, settings, t_s = self.__der_inputs(der, V, theta)
+        if (all(abs(v - v_ref) <= self.v_deadband for v, v_ref in zip(V, V_ref))
+                and all(abs(a - a_ref) <= self.v_deadband for a, a_ref in zip(theta, theta_ref))
+                and abs(f - f_ref) <= self.f_deadband
+                and (p == p_ref or (p is not None and p_ref is not None and abs(p - p_ref) <= self.p_deadband))
+                and settings == settings_ref and t_s == t_s_ref
+                and all(delay.con_del_enable_int + DER.t_s < delay_time for delay, delay_time in self.__timers[i])):
+            # Timers counting toward their delays are advanced as in ConditionalDelay.con_del_enable(), the DER is
+            # calculated in the step they expire
+            for delay, _ in self.__timers[i]:
+                delay.con_del_enable_int = delay.con_del_enable_int + DER.t_s
+            return True
+
+        self.__quiescent[i] = False
+        return False
+
+    def __update_quiescence(self, i, der, V, theta):
+        """
+        After a DER is calculated, it is quiescent if neither its inputs nor its internal states changed in this step,
+        except for timers counting toward their delays.
+        """
+        inputs = self.__der_inputs(der, V, theta)
+        if self.__state_keys[i] is None:
+            self.__state_keys[i] = self.__der_state_keys(der)
+            self.__delays[i] = self.__der_delays(der)
+        state = [getattr(obj, key, None) for obj, key in self.__state_keys[i]]
+        state = [tuple(x) if isinstance(x, list) else x for x in state]
+        last_state = self.__last_state[i]
+
+        quiescent = inputs == self.__ref_inputs[i] and last_state is not None
+        timers = []
+        if quiescent:
+            for (obj, key), x, y in zip(self.__state_keys[i], state, last_state):
+                if x == y or (isinstance(x, Number) and isinstance(y, Number) and abs(x - y) <= self.state_tolerance):
+                    continue
+                timer = self.__counting_timer(i, obj, key, y)
+                if timer is None:
+                    quiescent = False
+                    break
+                timers.append(timer)
+        self.__quiescent[i] = quiescent
+        self.__timers[i] = timers if quiescent else []
+        self.__ref_inputs[i] = inputs
+        self.__last_state[i] = state
 
     def __check_q(self):
         """
@@ -449,6 +986,19 @@ class DERInterface:
         else:
             self.__q_out = self.__q_inv
 
+    def __iterate_convergence(self):
+        """
+        One iteration of the convergence process, on temporary copies of the OpenDER objects
+        """
+        # Copy temporary OpenDER objects so any calculation does not impact their time responses.
+        self.__der_objs_temp = deepcopy(self.der_objs)
+
+        # Run the temporary OpenDER objects and update the outputs to circuit simulation
+        self.run(self.__der_objs_temp)
+        self.__convergence_iteration()
+        self.update_der_output_powers(self.__der_objs_temp, self.__p_out, self.__q_out)
+        self.solve_power_flow()
+
     def der_convergence_process(self):
         """
         Convergence process. This is done by repetitively running power flow solutions and updating OpenDER outputs,
@@ -458,15 +1008,10 @@ class DERInterface:
         self.__initialize_convergence()
 
         while not self.__converged and i < 300:
-            # Copy temporary OpenDER objects so any calculation does not impact their time responses.
-            self.__der_objs_temp = deepcopy(self.der_objs)
-
-            # Run the temporary OpenDER objects and update the outputs to circuit simulation
-            self.run(self.__der_objs_temp)
-            self.__convergence_iteration()
-            self.update_der_output_powers(self.__der_objs_temp, self.__p_out, self.__q_out)
-            self.solve_power_flow()
+            self.__iterate_convergence()
             i = i+1
+        self.convergence_iterations = i
+        self.total_convergence_iterations = self.total_convergence_iterations + i
 
         # After iteration, the simulation should be converged. Run the actual DER objects and solve power flow.
         self.run()
@@ -0,0 +1,109 @@
+# Copyright © 2023 Electric Power Research Institute, Inc. All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+# · Redistributions of source code must retain the above copyright notice,
+#   this list of conditions and the following disclaimer.
+# · Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+# · Neither the name of the EPRI nor the names of its contributors may be used
+#   to endorse or promote products derived from this software without specific
+#   prior written permission.
+
+
+import numpy as np
+from typing import Tuple
+
+DOWNSAMPLE_METHODS = ['minmax', 'lttb']
+
+
+def minmax_downsample(x: np.ndarray, y: np.ndarray, max_points: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Downsample a trace by keeping the minimum and maximum samples of each bucket, in their original order. With one
+    bucket for each horizontal pixel, the plotted envelope is identical to the plot of all samples.
+
+    :param x: X values of the samples, increasing
+    :param y: Y values of the samples
+    :param max_points: Maximum number of samples kept
+    :return: Downsampled x and y values
+    """
+    x = np.asarray(x)
+    y = np.asarray(y)
+    n = len(y)
+    # first and last samples are kept in addition to the two samples of each bucket
+    buckets = (max_points - 2) // 2
+    if n <= max_points or buckets < 1:
+        return x, y
+
+    # Buckets are reshaped into rows, the remaining samples are merged into the last bucket
+    size = n // buckets
+    body = y[:size * (buckets - 1)].reshape(buckets - 1, size)
+    last = y[size * (buckets - 1):]
+    offset = np.arange(buckets) * size
+    i_min = np.append(np.argmin(np.where(np.isnan(body), np.inf, body), axis=1),
+                      np.argmin(np.where(np.isnan(last), np.inf, last))) + offset
+    i_max = np.append(np.argmax(np.where(np.isnan(body), -np.inf, body), axis=1),
+                      np.argmax(np.where(np.isnan(last), -np.inf, last))) + offset
+
+    # samples are kept in their original order, and duplicated indices (e.g. flat buckets) are removed
+    index = np.unique(np.concatenate([[0], i_min, i_max, [n - 1]]))
+    return x[index], y[index]
+
+
+def lttb_downsample(x: np.ndarray, y: np.ndarray, max_points: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Downsample a trace by the Largest-Triangle-Three-Buckets (LTTB) algorithm, which keeps the samples forming the
+    largest triangles with their neighbouring buckets, i.e. the visually significant ones.
+
+    :param x: X values of the samples, increasing
+    :param y: Y values of the samples
+    :param max_points: Maximum number of samples kept, at least 3
+    :return: Downsampled x and y values
+    """
+    x = np.asarray(x)
+    y = np.asarray(y)
+    n = len(y)
+    if n <= max_points or max_points < 3:
+        return x, y
+
+    xf = x.astype(float)
+    yf = y.astype(float)
+    # Bucket edges of the n - 2 samples between the first and the last ones
+    edges = np.linspace(1, n - 1, max_points - 1).astype(int)
+    sum_x = np.add.reduceat(xf[1:n - 1], edges[:-1] - 1)
+    sum_y = np.add.reduceat(np.nan_to_num(yf[1:n - 1]), edges[:-1] - 1)
+    counts = np.diff(edges)
+    avg_x = np.append(sum_x / counts, xf[-1])
+    avg_y = np.append(sum_y / counts, yf[-1])
+
+    index = np.empty(max_points, dtype=int)
+    index[0] = 0
+    index[-1] = n - 1
+    a = 0
+    for i in range(max_points - 2):
+        start, end = edges[i], edges[i + 1]
+        # area of triangles between the selected sample a, the samples of this bucket and the next bucket average
+        area = np.abs((xf[a] - avg_x[i + 1]) * (yf[start:end] - yf[a])
+                      - (xf[a] - xf[start:end]) * (avg_y[i + 1] - yf[a]))
+        a = start + int(np.argmax(np.nan_to_num(area, nan=-1)))
+        index[i + 1] = a
+    return x[index], y[index]
+
+
+def downsample(x: np.ndarray, y: np.ndarray, max_points: int, method: str = 'minmax') -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Downsample a trace for plotting
+
+    :param x: X values of the samples, increasing
+    :param y: Y values of the samples
+    :param max_points: Maximum number of samples kept
+    :param method: 'minmax' for the min/max envelope of each bucket, or 'lttb' for Largest-Triangle-Three-Buckets
+    :return: Downsampled x and y values
+    """
+    if method == 'minmax':
+        return minmax_downsample(x, y, max_points)
+    elif method == 'lttb':
+        return lttb_downsample(x, y, max_points)
+    else:
+        raise ValueError(f'Downsampling method should be one of {DOWNSAMPLE_METHODS}, but "{method}" is provided')
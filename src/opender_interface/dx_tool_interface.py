@@ -17,6 +17,9 @@ from abc import ABC, abstractmethod
 class DxToolInterfacesABC(ABC):
     """
     This abstract class serves as a template for the application program interface for the distribution analysis tools.
+
+    Interfaces supporting DER aggregation (refer to DERInterface.create_opender_objs()) also implement
+    disable_der(name), disabling the circuit element of a DER represented by an equivalent unit.
     """
 
     @property
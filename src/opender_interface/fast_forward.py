@@ -0,0 +1,198 @@
+# Copyright © 2023 Electric Power Research Institute, Inc. All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+# · Redistributions of source code must retain the above copyright notice,
+#   this list of conditions and the following disclaimer.
+# · Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+# · Neither the name of the EPRI nor the names of its contributors may be used
+#   to endorse or promote products derived from this software without specific
+#   prior written permission.
+
+import math
+from typing import Callable, List, Tuple
+from opender_interface.der_interface import DERInterface
+
+
+class FastForwardDriver:
+    """
+    This is a dynamic simulation driver that fast-forwards DERInterface simulations across quiescent intervals.
+
+    In each time step, the circuit is only read and solved when needed: the DER terminal voltages and voltage
+    regulator (VR) voltages are held as long as no DER output, VR tap or scheduled event changed the circuit and the
+    circuit solution has settled, so stepping DER timers (e.g. enter service delays) and VR timers does not involve
+    the circuit simulation tool.
+    When all DERs are quiescent (refer to DERInterface.enable_event_driven()), the driver asks the DERs for the time
+    steps until their next possible state change, e.g. the expiry of an enter service delay
+    (DERInterface.steps_to_next_der_change()), and each VR for the time of its next possible tap change
+    (VR_Model.time_to_next_tap()). It jumps to the earliest of them and the next scheduled event, advancing the DER
+    timers as stepping would and the VR timers in one shot.
+
+    The simulation results are identical to stepping run(), update_der_output_powers(), write_vr() and
+    solve_power_flow() at every time step, except for the rounding of the VR timers advanced in one shot, if the time
+    step is not an integer number of seconds.
+    """
+
+    def __init__(self, der_interface: DERInterface, state_tolerance: float = 0):
+        """
+        :param der_interface: DERInterface object, with the OpenDER objects (and VR_Model objects) created and initial
+                              condition established
+        :param state_tolerance: Tolerance of DER internal states considered as settled, refer to
+                                DERInterface.enable_event_driven()
+        """
+        self.der_interface = der_interface
+        self.t_s = der_interface.t_s
+        der_interface.enable_event_driven(state_tolerance=state_tolerance)
+
+        self.time = 0
+        self.steps = 0
+        self.solves = 0
+        self.jumped_steps = 0
+
+        self.__k = 0
+        self.__events: List[Tuple[int, int, Callable]] = []
+        self.__readings = None
+        self.__read_pending = True
+        self.__settled = False
+
+    def add_event(self, t: float, func: Callable) -> None:
+        """
+        Schedule an event which changes the circuit, e.g. a fault or a load change. The event function is called
+        with the driver as argument at the beginning of the time step at time t, and the circuit is solved in that
+        time step.
+
+        :param t: Event time in seconds
+        :param func: Event function
+        """
+        k = math.ceil(t / self.t_s - 1e-9)
+        self.__events.append((k, len(self.__events), func))
+        self.__events.sort()
+
+    def __read_circuit(self):
+        """
+        Read and hold DER terminal voltages and VR voltages and currents from the latest circuit solution. The circuit
+        is settled if they are identical to the previous readings, i.e. solving the circuit again would not change
+        the solution.
+        """
+        ckt_int = self.der_interface
+        ckt_int.read_sys_voltage()
+        v_der_list, theta_der_list = ckt_int.read_der_voltage()
+        readings = ([tuple(V) for V in v_der_list], [tuple(theta) for theta in theta_der_list],
+                    [ckt_int.read_vr_v_i(vr.name) for vr in ckt_int.vr_objs])
+        self.__settled = readings == self.__readings
+        self.__readings = readings
+        self.__read_pending = False
+
+    def step(self) -> bool:
+        """
+        Simulate one time step.
+
+        :return: True if the circuit is solved in this step
+        """
+        ckt_int = self.der_interface
+        with ckt_int.step_span(self.time):
+            events = False
+            while self.__events and self.__events[0][0] <= self.__k:
+                _, _, func = self.__events.pop(0)
+                func(self)
+                events = True
+
+            if self.__read_pending:
+                self.__read_circuit()
+            v_der_list, theta_der_list, vr_v_i = self.__readings
+
+            p_previous = [(der.p_out_kw, der.q_out_kvar) for der in ckt_int.der_objs]
+            ckt_int.run_ders(v_der_list, theta_der_list)
+            changed_ders = [der for der, (p, q) in zip(ckt_int.der_objs, p_previous)
+                            if p is None or q is None or der.p_out_kw != p or der.q_out_kvar != q]
+
+            taps = False
+            for vr, (Vpri, Ipri) in zip(ckt_int.vr_objs, vr_v_i):
+                tap_previous = vr.tap
+                vr.run(Vpri=Vpri, Ipri=Ipri)
+                taps = taps or vr.tap != tap_previous
+
+            # The circuit is also solved until its solution settles, as the circuit simulation tool may need more than
+            # one solution to converge after a change
+            solved = events or taps or bool(changed_ders) or not self.__settled
+            if solved:
+                if changed_ders:
+                    ckt_int.update_der_output_powers(changed_ders)
+                if ckt_int.vr_objs:
+                    ckt_int.write_vr()
+                ckt_int.solve_power_flow()
+                self.solves = self.solves + 1
+                self.__read_pending = True
+
+            self.__k = self.__k + 1
+            self.steps = self.steps + 1
+            self.time = self.__k * self.t_s
+            return solved
+
+    def steps_to_next_change(self) -> float:
+        """
+        Return the number of time steps until the next possible change of the simulation: a DER state change,
+        a VR tap change or a scheduled event.
+        """
+        ckt_int = self.der_interface
+        if self.__read_pending or not self.__settled:
+            return 1
+        steps = ckt_int.steps_to_next_der_change()
+        if steps == 1:
+            return 1
+
+        vr_steps = min([vr.time_to_next_tap() for vr in ckt_int.vr_objs], default=math.inf) / self.t_s
+        if vr_steps != math.inf:
+            steps = min(steps, round(vr_steps))
+        if self.__events:
+            steps = min(steps, self.__events[0][0] - self.__k)
+        return steps
+
+    def jump(self, n: int) -> None:
+        """
+        Advance n time steps without any state change: DER elapsed time and timers and VR timers are advanced, and
+        the circuit is untouched. Only call this with n less than steps_to_next_change().
+
+        :param n: Number of time steps
+        """
+        ckt_int = self.der_interface
+        ckt_int.skip_ders(n)
+        for vr in ckt_int.vr_objs:
+            # Regulating voltage is held, the timers are advanced in one shot
+            vr.advance(n * self.t_s)
+
+        self.__k = self.__k + n
+        self.jumped_steps = self.jumped_steps + n
+        self.steps = self.steps + n
+        self.time = self.__k * self.t_s
+
+    def run(self, t_end: float, plot_obj=None, record: Callable = None) -> int:
+        """
+        Simulate until the end time.
+
+        :param t_end: Simulation end time in seconds
+        :param plot_obj: Optional TimePlots object to record traces into
+        :param record: Function called with the driver as argument after each simulated time step, returning a tuple
+                       of dictionaries to be added to plot_obj traces. For jumped time steps, the latest record is
+                       repeated, as the recorded outputs do not change.
+        :return: Number of circuit solutions
+        """
+        if (plot_obj is None) != (record is None):
+            raise ValueError('plot_obj and record should be provided together')
+
+        k_end = math.ceil(t_end / self.t_s - 1e-9)
+        solves = self.solves
+        while self.__k < k_end:
+            self.step()
+            if record is not None:
+                plot_obj.add_to_traces(*record(self))
+
+            # Jump to 2 steps before the next change, the step with a change and the one before it are simulated
+            n = min(self.steps_to_next_change(), k_end - self.__k + 1) - 2
+            if n > 0:
+                self.jump(int(n))
+                if record is not None:
+                    plot_obj.recorder.repeat(int(n))
+        return self.solves - solves
@@ -0,0 +1,204 @@
+# Copyright © 2023 Electric Power Research Institute, Inc. All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+# · Redistributions of source code must retain the above copyright notice,
+#   this list of conditions and the following disclaimer.
+# · Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+# · Neither the name of the EPRI nor the names of its contributors may be used
+#   to endorse or promote products derived from this software without specific
+#   prior written permission.
+
+
+import os
+import numpy as np
+from typing import List, Tuple
+
+# DER element types supported by the generator, refer to OpenDSSInterface.initialize()
+DER_TYPES = ['pvsystem', 'generator', 'isource']
+
+
+class FeederGenerator:
+    """
+    This is a generator of synthetic radial distribution feeders in OpenDSS format, for performance testing and
+    profiling at a chosen scale. The feeder has a three-phase trunk with laterals (three-phase or single-phase),
+    loads, DERs (PVSystems, generators or isources) on three-phase buses, and voltage regulator banks (three
+    single-phase regulators with regcontrols) along the trunk. An energy meter at the head of the feeder provides the
+    bus distances.
+
+    The generation is deterministic: the same parameters and seed always produce the same circuit. Element names are
+    zero-padded, e.g. bus 'b0012', line 'l0012', load 'ld0012', DER 'der0003', regulator 'reg01a'.
+    """
+
+    def __init__(self, n_buses: int = 100, n_laterals: int = None, n_loads: int = None, n_ders: int = None,
+                 der_type: str = 'pvsystem', n_regulators: int = 0, single_phase_share: float = 0.5,
+                 kv: float = 12.47, load_kw: Tuple[float, float] = (20, 80), der_kva: float = 300,
+                 line_length: Tuple[float, float] = (0.05, 0.3), seed: int = 0):
+        """
+        :param n_buses: Number of buses, excluding the source bus and the regulator output buses
+        :param n_laterals: Number of laterals branching from the trunk. Default is a tenth of n_buses
+        :param n_loads: Number of loads, at distinct random buses. Default is one load at each bus
+        :param n_ders: Number of DERs, at distinct random three-phase buses. Default is a fifth of n_buses
+        :param der_type: Circuit element which represents DERs, 'pvsystem', 'generator' or 'isource'
+        :param n_regulators: Number of voltage regulator banks, evenly spaced along the trunk
+        :param single_phase_share: Share of the laterals which are single-phase
+        :param kv: Line-to-line nominal voltage (kV)
+        :param load_kw: Range of the load active power (kW)
+        :param der_kva: DER apparent power rating (kVA)
+        :param line_length: Range of the line length (miles)
+        :param seed: Random seed
+        """
+        if n_laterals is None:
+            n_laterals = n_buses // 10
+        if n_loads is None:
+            n_loads = n_buses
+        if n_ders is None:
+            n_ders = n_buses // 5
+
+        if n_buses < 1:
+            raise ValueError('Number of buses should be at least 1')
+        if not 0 <= n_laterals < n_buses:
+            raise ValueError(f'Number of laterals should be between 0 and {n_buses - 1}')
+        if not 0 <= n_loads <= n_buses:
+            raise ValueError(f'Number of loads should be between 0 and {n_buses}')
+        if der_type.lower() not in DER_TYPES:
+            raise ValueError(f'der_type should be one of {DER_TYPES}. Now it is {der_type}')
+
+        self.n_buses = n_buses
+        self.n_laterals = n_laterals
+        self.n_loads = n_loads
+        self.n_ders = n_ders
+        self.der_type = der_type.lower()
+        self.n_regulators = n_regulators
+        self.single_phase_share = single_phase_share
+        self.kv = kv
+        self.load_kw = load_kw
+        self.der_kva = der_kva
+        self.line_length = line_length
+        self.seed = seed
+
+    @property
+    def name(self) -> str:
+        """
+        Circuit name, also used as the default file name
+        """
+        return f'synthetic_{self.n_buses}_{self.seed}'
+
+    def __topology(self, rng: np.random.Generator) -> Tuple[List[int], List[List[int]], int]:
+        """
+        Return the parent bus and the phases of each bus, and the number of trunk buses. Bus 0 is the source bus,
+        followed by the trunk buses and the lateral buses.
+        """
+        # split the buses into the trunk and the laterals, each with at least one bus
+        sizes = np.ones(self.n_laterals + 1, dtype=int)
+        sizes += rng.multinomial(self.n_buses - len(sizes), np.ones(len(sizes)) / len(sizes))
+        n_trunk = int(sizes[0])
+
+        parents = [-1] + list(range(n_trunk))
+        phases = [[1, 2, 3] for _ in range(n_trunk + 1)]
+        for size in sizes[1:]:
+            # laterals branch from the trunk, excluding the source bus
+            parent = int(rng.integers(1, n_trunk + 1))
+            lateral_phases = [int(rng.integers(1, 4))] if rng.random() < self.single_phase_share else [1, 2, 3]
+            for _ in range(size):
+                parents.append(parent)
+                phases.append(lateral_phases)
+                parent = len(parents) - 1
+        return parents, phases, n_trunk
+
+    def generate(self) -> List[str]:
+        """
+        Generate the circuit
+
+        :return: List of OpenDSS commands
+        """
+        rng = np.random.default_rng(self.seed)
+        parents, phases, n_trunk = self.__topology(rng)
+        kv_ln = self.kv / np.sqrt(3)
+
+        # regulators at the inputs of evenly spaced trunk buses, the downstream buses are fed by the output bus
+        if self.n_regulators > n_trunk:
+            raise ValueError(f'Number of regulators should be at most {n_trunk}, the number of trunk buses')
+        regulated = {1 + i * n_trunk // (self.n_regulators + 1) for i in range(1, self.n_regulators + 1)}
+
+        def bus_name(bus: int) -> str:
+            return f'b{bus:04d}'
+
+        def source_name(bus: int) -> str:
+            return bus_name(bus) + ('r' if bus in regulated else '')
+
+        def nodes(bus_phases: List[int]) -> str:
+            return ''.join(f'.{phase}' for phase in bus_phases)
+
+        commands = [
+            'Clear',
+            f'New Circuit.{self.name} basekv={self.kv} pu=1.03 phases=3 bus1={bus_name(0)} mvasc3=200000 '
+            f'mvasc1=200000',
+            'New Linecode.lc3 nphases=3 r1=0.3 x1=0.6 r0=0.6 x0=1.8 c1=0 c0=0 units=mi',
+            'New Linecode.lc1 nphases=1 r1=0.5 x1=0.8 r0=0.5 x0=0.8 c1=0 c0=0 units=mi',
+        ]
+
+        # lines
+        for bus in range(1, len(parents)):
+            length = rng.uniform(*self.line_length)
+            bus_phases = phases[bus]
+            commands.append(f'New Line.l{bus:04d} phases={len(bus_phases)} bus1={source_name(parents[bus])}'
+                            f'{nodes(bus_phases)} bus2={bus_name(bus)}{nodes(bus_phases)} '
+                            f'linecode=lc{len(bus_phases)} length={length:.4f} units=mi')
+
+        # voltage regulator banks
+        for i, bus in enumerate(sorted(regulated)):
+            for phase, suffix in zip([1, 2, 3], 'abc'):
+                name = f'reg{i + 1:02d}{suffix}'
+                commands.append(f'New Transformer.{name} phases=1 windings=2 buses=[{bus_name(bus)}.{phase} '
+                                f'{bus_name(bus)}r.{phase}] conns=[wye wye] kvs=[{kv_ln:.4f} {kv_ln:.4f}] '
+                                f'kvas=[10000 10000] XHL=0.01 %loadloss=0.0001 ppm=0')
+                commands.append(f'New Regcontrol.c{name} transformer={name} winding=2 vreg=122 band=2 '
+                                f'ptratio={kv_ln * 1000 / 120:.2f} ctprim=100 R=2 X=1 delay=30 tapdelay=2')
+
+        # loads
+        for bus in sorted(rng.choice(np.arange(1, len(parents)), size=self.n_loads, replace=False)):
+            bus_phases = phases[bus]
+            kv = self.kv if len(bus_phases) == 3 else kv_ln
+            commands.append(f'New Load.ld{bus:04d} bus1={source_name(bus)}{nodes(bus_phases)} '
+                            f'phases={len(bus_phases)} kV={kv:.4f} kW={rng.uniform(*self.load_kw):.1f} pf=0.95')
+
+        # DERs
+        three_phase = [bus for bus in range(1, len(parents)) if len(phases[bus]) == 3]
+        if self.n_ders > len(three_phase):
+            raise ValueError(f'Number of DERs should be at most {len(three_phase)}, the number of three-phase buses')
+        for i, bus in enumerate(sorted(rng.choice(three_phase, size=self.n_ders, replace=False))):
+            name = f'der{i + 1:04d}'
+            bus = source_name(bus)
+            if self.der_type == 'pvsystem':
+                commands.append(f'New PVSystem.{name} bus1={bus}.1.2.3 phases=3 kV={self.kv} Pmpp={self.der_kva} '
+                                f'kVA={self.der_kva} irradiance=1')
+            elif self.der_type == 'generator':
+                commands.append(f'New Generator.{name} bus1={bus}.1.2.3 phases=3 kV={self.kv} kW={self.der_kva} '
+                                f'kVA={self.der_kva}')
+            else:
+                for phase, suffix in zip([1, 2, 3], 'abc'):
+                    commands.append(f'New Isource.{name}_{suffix} bus1={bus}.{phase} phases=1 amps=0')
+
+        commands.extend([
+            'New EnergyMeter.feeder element=Line.l0001 terminal=1',
+            f'Set VoltageBases=[{self.kv}]',
+            'Calcvoltagebases',
+            'solve',
+        ])
+        return commands
+
+    def write(self, path: str) -> str:
+        """
+        Write the circuit as a DSS file
+
+        :param path: DSS file path, or a directory to write '{name}.dss' into
+        :return: Path of the DSS file
+        """
+        if os.path.isdir(path):
+            path = os.path.join(path, f'{self.name}.dss')
+        with open(path, 'w') as f:
+            f.write('\n'.join(self.generate()) + '\n')
+        return path
@@ -0,0 +1,166 @@
+# Copyright © 2023 Electric Power Research Institute, Inc. All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+# · Redistributions of source code must retain the above copyright notice,
+#   this list of conditions and the following disclaimer.
+# · Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+# · Neither the name of the EPRI nor the names of its contributors may be used
+#   to endorse or promote products derived from this software without specific
+#   prior written permission.
+
+
+import numpy as np
+from typing import List, Tuple
+
+# Quantities supported by the profile plot, as {quantity: (column prefix, y-axis label)}
+PROFILE_QUANTITIES = {
+    'voltage': ('Vpu_', 'Voltage (pu)'),
+    'power': ('flowS_', 'Power (kW)'),
+}
+
+
+class FeederProfilePlot:
+    """
+    This class plots the voltage or power flow profile of a feeder along the distance from the substation, based on
+    the bus and line information of the circuit simulation interface (e.g. OpenDSSInterface.buses, .lines and
+    .transformers).
+
+    The topology is resolved once at creation: the coordinates of the segments are kept as index arrays into the bus
+    (or line) table, and all segments of a phase are drawn as a single LineCollection. update() only gathers the
+    latest values through these index arrays, so that the plot can be refreshed in each simulation step.
+        - Voltage profile: bus voltages, connected along lines and transformers
+        - Power profile: active power flow at the middle of lines, connected to the upstream line. Lines with flow
+          below the threshold (e.g. missing phases) are not plotted
+    """
+
+    def __init__(self, ckt, quantity: str = 'voltage', phases: str = 'ABC', ax=None, colors: List[str] = None,
+                 threshold: float = 0.1):
+        """
+        :param ckt: Circuit simulation interface, e.g. OpenDSSInterface, initialized
+        :param quantity: 'voltage' or 'power'
+        :param phases: Phases to plot
+        :param ax: Subplot (axes) object to plot in. Default is a new figure
+        :param colors: Color of each phase. Default is blue, orange and green
+        :param threshold: Power flow (kW) below which a line is not plotted in power profile
+        """
+        import matplotlib.pyplot as plt
+        from matplotlib.collections import LineCollection
+
+        if quantity not in PROFILE_QUANTITIES:
+            raise ValueError(f'Quantity should be one of {list(PROFILE_QUANTITIES)}. Now it is {quantity}')
+
+        self.ckt = ckt
+        self.quantity = quantity
+        self.phases = list(phases)
+        self.threshold = threshold
+        if colors is None:
+            colors = ['blue', 'orange', 'green']
+
+        if ax is None:
+            self.fig, self.ax = plt.subplots(nrows=1, ncols=1)
+        else:
+            self.fig, self.ax = ax.figure, ax
+
+        if quantity == 'voltage':
+            self.__x, self.__seg_from, self.__seg_to = self.__bus_topology()
+        else:
+            self.__x, self.__seg_from, self.__seg_to = self.__line_topology()
+
+        self.collections = {}
+        self.markers = {}
+        for phase, color in zip(self.phases, colors):
+            self.collections[phase] = self.ax.add_collection(LineCollection([], colors=color))
+            self.markers[phase], = self.ax.plot(self.__x, np.full(len(self.__x), np.nan), marker='o', linestyle='',
+                                                color=color, label=f'{PROFILE_QUANTITIES[quantity][0]}{phase}')
+
+        self.ax.set_xlabel('Distance (miles)')
+        self.ax.set_ylabel(PROFILE_QUANTITIES[quantity][1])
+        self.ax.grid(visible=True)
+        self.ax.legend(loc=2)
+        self.update()
+
+    @staticmethod
+    def __bus(name: str) -> str:
+        """
+        Return the bus name without node numbers, e.g. '814' for '814.1.2.3'
+        """
+        return str(name).split('.')[0].lower()
+
+    def __segments(self) -> List[Tuple[str, str]]:
+        """
+        Return the (bus1, bus2) pairs of lines and transformers, in bus names without node numbers
+        """
+        segments = [(self.__bus(bus1), self.__bus(bus2))
+                    for bus1, bus2 in zip(self.ckt.lines['bus1'], self.ckt.lines['bus2'])]
+        transformers = getattr(self.ckt, 'transformers', None)
+        if transformers is not None:
+            for buses in transformers['buses']:
+                segments.extend((self.__bus(buses[0]), self.__bus(bus)) for bus in buses[1:])
+        return segments
+
+    def __bus_topology(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Return the bus distances, and the bus indices at both ends of the segments
+        """
+        index = {self.__bus(name): i for i, name in enumerate(self.ckt.buses.index)}
+        pairs = sorted({(index[bus1], index[bus2]) for bus1, bus2 in self.__segments()
+                        if bus1 in index and bus2 in index and bus1 != bus2})
+        pairs = np.array(pairs, dtype=int).reshape(-1, 2)
+        return self.ckt.buses['distance'].to_numpy(dtype=float), pairs[:, 0], pairs[:, 1]
+
+    def __line_topology(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Return the distances of the line middle points, and the line indices at both ends of the segments, connecting
+        each line to its upstream line. Transformers are passed through, so that the lines on both sides of them are
+        connected.
+        """
+        distance = {self.__bus(name): d for name, d in self.ckt.buses['distance'].items()}
+        lines = [(self.__bus(bus1), self.__bus(bus2))
+                 for bus1, bus2 in zip(self.ckt.lines['bus1'], self.ckt.lines['bus2'])]
+        x = np.array([(distance[bus1] + distance[bus2]) / 2 for bus1, bus2 in lines], dtype=float)
+
+        # the line feeding each bus
+        feeding = {bus2: i for i, (bus1, bus2) in enumerate(lines)}
+        transformers = [segment for segment in self.__segments()[len(lines):] if segment[0] != segment[1]]
+        changed = True
+        while changed:
+            changed = False
+            for bus1, bus2 in transformers:
+                if bus1 in feeding and bus2 not in feeding:
+                    feeding[bus2] = feeding[bus1]
+                    changed = True
+
+        pairs = [(feeding[bus1], i) for i, (bus1, bus2) in enumerate(lines) if bus1 in feeding and feeding[bus1] != i]
+        pairs = np.array(pairs, dtype=int).reshape(-1, 2)
+        return x, pairs[:, 0], pairs[:, 1]
+
+    def values(self, phase: str) -> np.ndarray:
+        """
+        Return the latest values of a phase at the plotted points (buses or line middle points), NaN if not plotted
+
+        :param phase: 'A', 'B' or 'C'
+        """
+        if self.quantity == 'voltage':
+            return self.ckt.buses[f'Vpu_{phase}'].to_numpy(dtype=float)
+        values = np.real(self.ckt.lines[f'flowS_{phase}'].to_numpy(dtype=complex))
+        return np.where(np.abs(values) > self.threshold, values, np.nan)
+
+    def update(self) -> None:
+        """
+        Refresh the plot with the latest bus voltages (or line flows) of the circuit simulation interface
+        """
+        for phase in self.phases:
+            y = self.values(phase)
+            segments = np.empty((len(self.__seg_from), 2, 2))
+            segments[:, 0, 0] = self.__x[self.__seg_from]
+            segments[:, 0, 1] = y[self.__seg_from]
+            segments[:, 1, 0] = self.__x[self.__seg_to]
+            segments[:, 1, 1] = y[self.__seg_to]
+            self.collections[phase].set_segments(segments)
+            self.markers[phase].set_ydata(y)
+
+        self.ax.relim()
+        self.ax.autoscale_view()
@@ -0,0 +1,165 @@
+# Copyright © 2023 Electric Power Research Institute, Inc. All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+# · Redistributions of source code must retain the above copyright notice,
+#   this list of conditions and the following disclaimer.
+# · Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+# · Neither the name of the EPRI nor the names of its contributors may be used
+#   to endorse or promote products derived from this software without specific
+#   prior written permission.
+
+
+import contextlib
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Union, Sequence
+import numpy as np
+from opender import DER
+from opender_interface.xy_plot import XYPlots
+
+# Figures supported by the exporter, refer to XYPlots.prepare_*_plot()
+FIGURE_TYPES = ['pq', 'vq', 'vp', 'fp', 'v3']
+
+
+def _render(job: tuple) -> List[str]:
+    """
+    Render and save the figures of one DER, and close them. This is executed in the worker processes.
+
+    :param job: Tuple of (OpenDER object, pu, operating point records, measured points, path without extension,
+                figure types, file format, dpi, p_pre_list)
+    :return: List of the saved files
+    """
+    der_obj, pu, points, meas_points_dict, path, figures, fmt, dpi, p_pre_list = job
+
+    xyplot = XYPlots(der_obj, pu=pu)
+    if points is not None:
+        xyplot.points = points
+    else:
+        xyplot.add_point_to_plot()
+    xyplot.meas_points_dict = meas_points_dict
+
+    try:
+        for figure in figures:
+            if figure == 'fp':
+                if p_pre_list is None:
+                    p_out_pu = xyplot.point_values('p_out_pu')
+                    p_pre_list = [p_out_pu[-1] if len(p_out_pu) else 1]
+                xyplot.prepare_fp_plot(p_pre_list)
+            else:
+                getattr(xyplot, f'prepare_{figure}_plot')()
+        return xyplot.save_fig(path, fmt=fmt, dpi=dpi)
+    finally:
+        xyplot.close()
+
+
+def _init_worker() -> None:
+    """
+    Select the non-interactive backend in the worker processes
+    """
+    import matplotlib.pyplot as plt
+    plt.switch_backend('Agg')
+
+
+@contextlib.contextmanager
+def _agg_backend():
+    """
+    Select the non-interactive backend in the current process, and restore the previous backend on exit
+    """
+    import matplotlib.pyplot as plt
+    backend = plt.get_backend()
+    plt.switch_backend('Agg')
+    try:
+        yield
+    finally:
+        plt.switch_backend(backend)
+
+
+class FigureExporter:
+    """
+    This is a headless exporter of XYPlots figures (PQ, VQ, VP, FP and three-phase phasor) for whole DER fleets.
+    The figures of each DER are rendered with the non-interactive Agg backend in a pool of worker processes, saved
+    as files in parallel, and closed right after saving, so that no figure is left open.
+
+    The DERs can be provided as OpenDER objects (the current operating point is plotted) or as XYPlots objects with
+    recorded operating points and measured points.
+    """
+
+    def __init__(self, figures: Sequence[str] = ('pq', 'vq', 'vp'), fmt: str = 'png', dpi: int = 150,
+                 processes: int = None, pu: bool = True):
+        """
+        :param figures: Figure types to export for each DER, out of FIGURE_TYPES
+        :param fmt: File format, e.g. 'png' or 'svg'. Default is 'png'
+        :param dpi: Resolution of the saved figures. Default is 150
+        :param processes: Number of worker processes. Default is the number of CPUs. If 1, the figures are rendered
+                          serially in the current process, also with the Agg backend
+        :param pu: Plot in pu (True) or in kW/kvar (False), for DERs provided as OpenDER objects
+        """
+        for figure in figures:
+            if figure not in FIGURE_TYPES:
+                raise ValueError(f'Figure type {figure} is not supported, use one of {FIGURE_TYPES}')
+        if processes is not None and processes < 1:
+            raise ValueError('Number of processes should be at least 1')
+
+        self.figures = list(figures)
+        self.fmt = fmt
+        self.dpi = dpi
+        self.processes = processes
+        self.pu = pu
+
+        self.report = None
+
+    def export(self, ders: List[Union[DER, XYPlots]], path: str, names: List[str] = None,
+               p_pre_list: List[float] = None) -> List[str]:
+        """
+        Export the figures of all DERs. The figures of each DER are saved as '{path}/{name}_{figure type}.{fmt}'.
+        The throughput is reported in self.report, as a dictionary of
+        {'ders', 'figures', 'processes', 'seconds', 'figures_per_second'}
+
+        :param ders: List of OpenDER objects or XYPlots objects
+        :param path: Directory of the saved figures, created if it does not exist
+        :param names: File name of each DER. Default is the name of the OpenDER objects
+        :param p_pre_list: Pre-disturbance active power values for the frequency-droop curves of 'fp' figures.
+                           Default is the latest recorded active power output of each DER
+        :return: List of the saved files
+        """
+        if names is None:
+            names = [(der.der_obj if isinstance(der, XYPlots) else der).name for der in ders]
+        if len(names) != len(ders):
+            raise ValueError(f'{len(names)} names are provided for {len(ders)} DERs')
+        if len(set(names)) != len(names):
+            raise ValueError('File names of the DERs should be unique, provide names to export them')
+
+        os.makedirs(path, exist_ok=True)
+        jobs = []
+        for der, name in zip(ders, names):
+            if isinstance(der, XYPlots):
+                job = (der.der_obj, der.pu, der.points, der.meas_points_dict)
+            else:
+                job = (der, self.pu, None, [])
+            jobs.append(job + (os.path.join(path, name), self.figures, self.fmt, self.dpi, p_pre_list))
+
+        start = time.perf_counter()
+        if self.processes == 1:
+            with _agg_backend():
+                files = [_render(job) for job in jobs]
+            processes = 1
+        else:
+            processes = min(self.processes or os.cpu_count() or 1, max(len(jobs), 1))
+            chunksize = max(1, int(np.ceil(len(jobs) / (processes * 4))))
+            with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker) as executor:
+                files = list(executor.map(_render, jobs, chunksize=chunksize))
+        seconds = time.perf_counter() - start
+
+        files = [file for der_files in files for file in der_files]
+        self.report = {
+            'ders': len(jobs),
+            'figures': len(files),
+            'processes': processes,
+            'seconds': seconds,
+            'figures_per_second': len(files) / seconds if seconds > 0 else float('inf'),
+        }
+        return files
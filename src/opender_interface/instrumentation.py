@@ -0,0 +1,359 @@
+# Copyright © 2023 Electric Power Research Institute, Inc. All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+# · Redistributions of source code must retain the above copyright notice,
+#   this list of conditions and the following disclaimer.
+# · Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+# · Neither the name of the EPRI nor the names of its contributors may be used
+#   to endorse or promote products derived from this software without specific
+#   prior written permission.
+
+
+import contextlib
+import functools
+import gzip
+import json
+import math
+import os
+import threading
+import time
+import zlib
+import numpy as np
+import pandas as pd
+from typing import Callable, Dict, List, Tuple, Union
+
+# Upper edges of the duration histogram bins, in seconds: 1 us, 2 us, 4 us, ... about 18 minutes
+HISTOGRAM_EDGES = [2.0 ** k * 1e-6 for k in range(31)]
+
+
+class _StageStats:
+    """
+    Accumulated durations of one stage
+    """
+    __slots__ = ['calls', 'total', 'self_total', 'min', 'max', 'histogram']
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self) -> None:
+        self.calls = 0
+        self.total = 0.0
+        self.self_total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+        self.histogram = [0] * (len(HISTOGRAM_EDGES) + 1)
+
+    def add(self, elapsed: float, self_elapsed: float) -> None:
+        self.calls += 1
+        self.total += elapsed
+        self.self_total += self_elapsed
+        if elapsed < self.min:
+            self.min = elapsed
+        if elapsed > self.max:
+            self.max = elapsed
+        # bin k holds durations in (2^(k-1), 2^k] us, frexp returns the exponent without a log
+        k = math.frexp(elapsed * 1e6)[1] if elapsed > 1e-6 else 0
+        self.histogram[min(k, len(HISTOGRAM_EDGES))] += 1
+
+
+class TraceWriter:
+    """
+    This is a streaming writer of timed stages as Chrome trace-event JSON (complete 'X' events), which can be opened
+    in trace viewers such as Perfetto (ui.perfetto.dev) or chrome://tracing to see the simulation on a timeline, e.g.
+    iteration storms of the convergence process, slow power flow solutions and bursts of DER writes.
+
+    Spans are passed by a StageTimer (refer to StageTimer.trace) when they end. The spans nested in a top-level span
+    (e.g. a time step, refer to StageTimer.span(), or a convergence process) are buffered until it ends, and written
+    to disk together if it is sampled, so that long simulations produce bounded traces:
+        - every: only every n-th top-level span is written
+        - slow: top-level spans longer than this (s) are always written, e.g. to keep all slow steps
+        - min_duration: nested spans shorter than this (s) are dropped
+        - max_events: writing stops after this number of events
+
+    The file is written in the JSON array format, which viewers accept without the closing bracket, and flushed after
+    each written top-level span, so that traces of interrupted simulations can still be opened. Paths ending with
+    '.gz' are gzip-compressed, and sync-flushed so that the written spans can be decompressed without the gzip
+    trailer. The writer can be used as a context manager, closing the file on exit.
+    """
+
+    def __init__(self, path: Union[str, os.PathLike], origin: float = 0, every: int = 1, slow: float = None,
+                 min_duration: float = 0, max_events: int = None):
+        """
+        :param path: Trace file path, e.g. 'trace.json' or 'trace.json.gz'
+        :param origin: Clock time (s) of the beginning of the trace
+        :param every: Write every n-th top-level span
+        :param slow: Always write top-level spans longer than this (s). Default is None, sampling only by every
+        :param min_duration: Drop nested spans shorter than this (s)
+        :param max_events: Maximum number of events written. Default is None, no limit
+        """
+        if every < 1:
+            raise ValueError(f'every should be a positive integer, not {every}')
+        self.path = str(path)
+        self.origin = origin
+        self.every = every
+        self.slow = slow
+        self.min_duration = min_duration
+        self.max_events = max_events
+
+        self.roots = 0
+        self.events = 0
+        self.dropped = 0
+
+        self.__buffer = []
+        self.__gzip = self.path.endswith('.gz')
+        self.__file = gzip.open(self.path, 'wb') if self.__gzip else open(self.path, 'wb')
+        self.__file.write(b'[')
+        self.__pid = os.getpid()
+        self.__write([{'name': 'process_name', 'ph': 'M', 'pid': self.__pid,
+                       'args': {'name': 'opender_interface'}}])
+        self.__flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __flush(self) -> None:
+        if self.__gzip:
+            self.__file.flush(zlib.Z_SYNC_FLUSH)
+        else:
+            self.__file.flush()
+
+    def __write(self, events: List[dict]) -> None:
+        if self.max_events is not None:
+            available = max(self.max_events - self.events, 0)
+            self.dropped += max(len(events) - available, 0)
+            events = events[:available]
+        for event in events:
+            self.__file.write((('\n' if self.events == 0 else ',\n') + json.dumps(event)).encode())
+        self.events += len(events)
+
+    def add(self, stage: str, start: float, elapsed: float, depth: int, args: dict = None) -> None:
+        """
+        Add an ended span
+
+        :param stage: Stage name
+        :param start: Clock time (s) of the beginning of the span
+        :param elapsed: Duration (s)
+        :param depth: Number of enclosing spans, 0 for a top-level span
+        :param args: Optional dictionary of arguments shown with the span, e.g. {'time': t}
+        """
+        if self.__file is None:
+            return
+        if depth > 0 and elapsed < self.min_duration:
+            self.dropped += 1
+            return
+
+        event = {'name': stage, 'ph': 'X', 'ts': (start - self.origin) * 1e6, 'dur': elapsed * 1e6,
+                 'pid': self.__pid, 'tid': threading.get_ident()}
+        if args:
+            event['args'] = args
+        self.__buffer.append(event)
+
+        if depth == 0:
+            if self.roots % self.every == 0 or (self.slow is not None and elapsed >= self.slow):
+                self.__write(self.__buffer)
+                self.__flush()
+            else:
+                self.dropped += len(self.__buffer)
+            self.roots += 1
+            self.__buffer = []
+
+    def close(self) -> None:
+        """
+        Write the buffered spans and close the trace file
+        """
+        if self.__file is None:
+            return
+        self.__write(self.__buffer)
+        self.__buffer = []
+        self.__file.write(b'\n]\n')
+        self.__file.close()
+        self.__file = None
+
+
+class StageTimer:
+    """
+    This is an opt-in timing instrumentation for the stages of a simulation step, e.g. OpenDER stepping, voltage
+    reads, DER writes, voltage regulator logics, power flow solution and line flow reads.
+
+    Methods of an object are instrumented by shadowing them with timed wrappers on the instance (refer to
+    instrument()), so that the class methods are untouched: nothing is added to the calls when timing is disabled, and
+    instrumented objects are restored by removing the wrappers. Durations are measured with the monotonic
+    time.perf_counter() clock, and accumulated per stage as call counts, total and self time (excluding nested
+    stages), extremes, and a histogram of log2-spaced bins. If a TraceWriter is assigned to .trace, each timed call
+    is also passed to it as a span.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.perf_counter):
+        """
+        :param clock: Monotonic clock returning seconds. Default is time.perf_counter
+        """
+        self.clock = clock
+        self.trace = None
+        self.__stats: Dict[str, _StageStats] = {}
+        self.__stack: List[float] = []
+        self.__instrumented: List[Tuple[object, List[str]]] = []
+
+    def __stage(self, stage: str) -> _StageStats:
+        if stage not in self.__stats:
+            self.__stats[stage] = _StageStats()
+        return self.__stats[stage]
+
+    def timed(self, func: Callable, stage: str) -> Callable:
+        """
+        Return a timed wrapper of a function, accumulating its durations into a stage
+
+        :param func: Function or bound method
+        :param stage: Stage name
+        """
+        stats = self.__stage(stage)
+        stack = self.__stack
+        clock = self.clock
+        end = self.__end
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            # time of nested stages is accumulated in the stack, to calculate the self time
+            stack.append(0.0)
+            start = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                end(stats, stage, start)
+        return wrapper
+
+    def __end(self, stats: _StageStats, stage: str, start: float, args: dict = None) -> None:
+        """
+        Accumulate the duration of an ended call, and pass it to the trace if any
+        """
+        elapsed = self.clock() - start
+        children = self.__stack.pop()
+        if self.__stack:
+            self.__stack[-1] += elapsed
+        stats.add(elapsed, elapsed - children)
+        if self.trace is not None:
+            self.trace.add(stage, start, elapsed, len(self.__stack), args)
+
+    @contextlib.contextmanager
+    def span(self, stage: str, **args):
+        """
+        Time a block of code as a stage, e.g. a simulation time step enclosing the timed calls, so that they are
+        grouped (and sampled together) in the trace:
+
+            with timer.span('step', time=t):
+                ckt_int.run()
+                ...
+
+        :param stage: Stage name
+        :param args: Arguments shown with the span in the trace, e.g. time=t
+        """
+        stats = self.__stage(stage)
+        self.__stack.append(0.0)
+        start = self.clock()
+        try:
+            yield
+        finally:
+            self.__end(stats, stage, start, args)
+
+    def instrument(self, obj, stages: Dict[str, str]) -> None:
+        """
+        Instrument methods of an object
+
+        :param obj: Object to be instrumented
+        :param stages: Dictionary of {method name: stage name}. Private methods are given by their mangled names,
+                       e.g. '_DERInterface__convergence_iteration'
+        """
+        names = []
+        for name, stage in stages.items():
+            if name in vars(obj):
+                # already instrumented
+                continue
+            setattr(obj, name, self.timed(getattr(obj, name), stage))
+            names.append(name)
+        self.__instrumented.append((obj, names))
+
+    def restore(self, obj=None) -> None:
+        """
+        Remove the timed wrappers from the instrumented objects. The accumulated durations are kept.
+
+        :param obj: Object to be restored. Default is all instrumented objects
+        """
+        instrumented = []
+        for instrumented_obj, names in self.__instrumented:
+            if obj is None or instrumented_obj is obj:
+                for name in names:
+                    vars(instrumented_obj).pop(name, None)
+            else:
+                instrumented.append((instrumented_obj, names))
+        self.__instrumented = instrumented
+
+    def reset(self) -> None:
+        """
+        Clear the accumulated durations
+        """
+        for stats in self.__stats.values():
+            stats.clear()
+        self.__stack.clear()
+
+    @property
+    def stages(self) -> List[str]:
+        """
+        Names of the stages timed so far
+        """
+        return [stage for stage, stats in self.__stats.items() if stats.calls > 0]
+
+    def histogram(self, stage: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Return the duration histogram of a stage
+
+        :param stage: Stage name
+        :return: Upper edges of the bins (s, the last one is inf) and the number of calls in each bin
+        """
+        return np.array(HISTOGRAM_EDGES + [math.inf]), np.array(self.__stats[stage].histogram)
+
+    @staticmethod
+    def __percentile(histogram: List[int], q: float) -> float:
+        """
+        Return the upper edge of the histogram bin containing the q-th percentile
+        """
+        rank = q / 100 * sum(histogram)
+        for edge, count in zip(HISTOGRAM_EDGES + [math.inf], np.cumsum(histogram)):
+            if count >= rank:
+                return edge
+        return math.inf
+
+    def report(self) -> pd.DataFrame:
+        """
+        Summarize the timed stages, in descending order of self time. Columns:
+            - calls: number of calls
+            - total_s: total time (s), including nested stages
+            - self_s: self time (s), excluding nested stages
+            - self_share: share of the self time among all stages
+            - mean_ms, min_ms, max_ms: duration of the calls (ms)
+            - p50_ms, p90_ms, p99_ms: percentiles of the duration (ms), as the upper edge of the histogram bins
+        """
+        rows = []
+        for stage in self.stages:
+            stats = self.__stats[stage]
+            rows.append({
+                'stage': stage,
+                'calls': stats.calls,
+                'total_s': stats.total,
+                'self_s': stats.self_total,
+                'mean_ms': stats.total / stats.calls * 1e3,
+                'min_ms': stats.min * 1e3,
+                'max_ms': stats.max * 1e3,
+                'p50_ms': self.__percentile(stats.histogram, 50) * 1e3,
+                'p90_ms': self.__percentile(stats.histogram, 90) * 1e3,
+                'p99_ms': self.__percentile(stats.histogram, 99) * 1e3,
+            })
+        report = pd.DataFrame(rows, columns=['stage', 'calls', 'total_s', 'self_s', 'mean_ms', 'min_ms', 'max_ms',
+                                             'p50_ms', 'p90_ms', 'p99_ms']).set_index('stage')
+        total = report['self_s'].sum()
+        report.insert(3, 'self_share', report['self_s'] / total if total > 0 else 0.0)
+        return report.sort_values('self_s', ascending=False)
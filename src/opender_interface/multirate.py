@@ -0,0 +1,176 @@
+# Copyright © 2023 Electric Power Research Institute, Inc. All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+# · Redistributions of source code must retain the above copyright notice,
+#   this list of conditions and the following disclaimer.
+# · Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+# · Neither the name of the EPRI nor the names of its contributors may be used
+#   to endorse or promote products derived from this software without specific
+#   prior written permission.
+
+from typing import Union, Dict
+from opender import DER
+from opender_interface.der_interface import DERInterface
+
+
+class MultirateScheduler:
+    """
+    This is a multirate scheduler for dynamic simulations with DERInterface. Each model class (e.g. DER_PV, DER_BESS,
+    VR_Model) or individual object can declare its own time step, as an integer multiple of the base time step t_s
+    of the DERInterface. In each base step, only the participants that are due are calculated, and the circuit is
+    only re-solved when a due participant changed its outputs.
+
+    The time step of the circuit solution can also be declared, so that output changes are accumulated and solved
+    at most once per solve step.
+    """
+
+    def __init__(self, der_interface: DERInterface, solve_t_s: float = None, output_tolerance: float = 0):
+        """
+        :param der_interface: DERInterface object, with the OpenDER objects (and VR_Model objects) created and initial
+                              condition established
+        :param solve_t_s: time step of the circuit solution. Default is the base time step t_s of der_interface
+        :param output_tolerance: DER output change (kW or kvar) below which the circuit is not re-solved
+        """
+        self.der_interface = der_interface
+        self.t_s = der_interface.t_s
+        self.output_tolerance = output_tolerance
+
+        self.time = 0
+        self.steps = 0
+        self.solves = 0
+
+        self.__k = 0
+        self.__steps: Dict[Union[type, int], float] = {}
+        self.__solve_ratio = 1 if solve_t_s is None else self.__ratio(solve_t_s)
+        self.__solve_pending = False
+
+    def __ratio(self, t_s: float) -> int:
+        """
+        Return the number of base time steps in a declared time step
+        """
+        ratio = round(t_s / self.t_s)
+        if ratio < 1 or abs(ratio * self.t_s - t_s) > 1e-9 * t_s:
+            raise ValueError(f'Time step {t_s} should be an integer multiple of the base time step {self.t_s}')
+        return ratio
+
+    def set_step(self, target, t_s: float) -> None:
+        """
+        Declare the time step of a model class or an individual object. The time step of an object overrides the
+        one of its class.
+
+        :param target: model class (e.g. DER_PV, DER_BESS, VR_Model) or individual OpenDER / VR_Model object
+        :param t_s: time step in seconds, should be an integer multiple of the base time step
+        """
+        self.__ratio(t_s)
+        self.__steps[target if isinstance(target, type) else id(target)] = t_s
+
+    def get_step(self, obj) -> float:
+        """
+        Return the time step of an OpenDER or VR_Model object
+
+        :param obj: OpenDER or VR_Model object
+        """
+        if id(obj) in self.__steps:
+            return self.__steps[id(obj)]
+        for cls in type(obj).__mro__:
+            if cls in self.__steps:
+                return self.__steps[cls]
+        return self.t_s
+
+    def is_due(self, obj) -> bool:
+        """
+        Check whether an OpenDER or VR_Model object is due to be calculated in the current base step
+
+        :param obj: OpenDER or VR_Model object
+        """
+        return self.__k % self.__ratio(self.get_step(obj)) == 0
+
+    def request_solve(self) -> None:
+        """
+        Request a circuit solution in the next solve step, e.g. after changing loads or source voltage externally.
+        """
+        self.__solve_pending = True
+
+    def step(self) -> bool:
+        """
+        Simulate one base time step: calculate the due DER and VR models, update the changed outputs into circuit
+        simulation and solve the power flow if needed.
+
+        :return: True if the circuit is solved in this step
+        """
+        ckt_int = self.der_interface
+        with ckt_int.step_span(self.time):
+            due_ders = [self.is_due(der) for der in ckt_int.der_objs]
+            due_vrs = [vr for vr in ckt_int.vr_objs if self.is_due(vr)]
+
+            if any(due_ders):
+                ckt_int.read_sys_voltage()
+                v_der_list, theta_der_list = ckt_int.read_der_voltage()
+                changed_ders = []
+                try:
+                    for der, due, V, theta in zip(ckt_int.der_objs, due_ders, v_der_list, theta_der_list):
+                        if not due:
+                            continue
+                        p_previous, q_previous = der.p_out_kw, der.q_out_kvar
+
+                        # OpenDER time step is a class attribute, so it is assigned before running each object
+                        DER.t_s = self.get_step(der)
+                        der.update_der_input(v_pu=list(V), theta=list(theta))
+                        der.run()
+
+                        if (p_previous is None or q_previous is None
+                                or abs(der.p_out_kw - p_previous) > self.output_tolerance
+                                or abs(der.q_out_kvar - q_previous) > self.output_tolerance):
+                            changed_ders.append(der)
+                finally:
+                    DER.t_s = self.t_s
+
+                if changed_ders:
+                    ckt_int.update_der_output_powers(changed_ders)
+                    self.__solve_pending = True
+
+            for vr in due_vrs:
+                tap_previous = vr.tap
+                Vpri, Ipri = ckt_int.read_vr_v_i(vr.name)
+                # VR_Model timers advance by its time step Ts, so it is assigned for this run only
+                Ts = vr.Ts
+                vr.Ts = self.get_step(vr)
+                try:
+                    vr.run(Vpri=Vpri, Ipri=Ipri)
+                finally:
+                    vr.Ts = Ts
+                if vr.tap != tap_previous:
+                    self.__solve_pending = True
+
+            solved = False
+            if self.__solve_pending and self.__k % self.__solve_ratio == 0:
+                if ckt_int.vr_objs:
+                    ckt_int.write_vr()
+                ckt_int.solve_power_flow()
+                self.__solve_pending = False
+                self.solves = self.solves + 1
+                solved = True
+
+            self.__k = self.__k + 1
+            self.steps = self.steps + 1
+            self.time = self.__k * self.t_s
+            return solved
+
+    def run(self, t_end: float, callback=None) -> int:
+        """
+        Simulate until the end time.
+
+        :param t_end: simulation end time in seconds
+        :param callback: optional function called after each base step with the scheduler as argument, e.g. to
+                         change inputs or record traces
+        :return: number of circuit solutions
+        """
+        solves = self.solves
+        while self.time < t_end - self.t_s / 2:
+            self.step()
+            if callback is not None:
+                callback(self)
+        return self.solves - solves
@@ -18,6 +18,8 @@ import pandas as pd
 import cmath
 from typing import Union, List
 from opender_interface.dx_tool_interface import DxToolInterfacesABC
+from opender_interface.feeder_profile import FeederProfilePlot
+from opender_interface.instrumentation import StageTimer
 
 
 class OpenDSSInterface(DxToolInterfacesABC):
@@ -25,6 +27,19 @@ class OpenDSSInterface(DxToolInterfacesABC):
     This is the OpenDSS interface, which is an inheritance class of DxToolInterfacesABC
     """
 
+    # Methods timed by enable_timing(), as {method name: stage name}
+    TIMED_STAGES = {
+        'read_sys_voltage': 'read_voltage',
+        'read_der_voltage': 'read_voltage',
+        'read_der_voltage_angle': 'read_voltage',
+        'update_der_output_powers': 'write_der',
+        'solve_power_flow': 'solve',
+        'read_line_flow': 'read_line_flow',
+        'read_vr': 'read_vr',
+        'read_vr_v_i': 'read_vr',
+        'write_vr': 'write_vr',
+    }
+
     @property
     def DERs(self):
         """
@@ -49,6 +64,7 @@ class OpenDSSInterface(DxToolInterfacesABC):
         self.dss_file = dss_file
         self.dss = py_dss_interface.DSS()
         self.der_bus_list = []
+        self.disabled_ders = []
 
         if dss_file is not None:
             self.dss.text(f"Compile [{self.dss_file}]")
@@ -57,6 +73,30 @@ class OpenDSSInterface(DxToolInterfacesABC):
         self._VRs = {}
         self.DER_sim_type = None
 
+        # Per-stage timing, refer to enable_timing()
+        self.timer = None
+
+    def enable_timing(self, timer: StageTimer = None) -> StageTimer:
+        """
+        Enable per-stage timing of the voltage reads, DER writes, power flow solution, line flow reads and voltage
+        regulator reads and writes, refer to TIMED_STAGES and StageTimer.
+
+        :param timer: StageTimer to accumulate the durations into. Default is a new one
+        :return: StageTimer object, also accessed by .timer
+        """
+        if self.timer is not None:
+            self.disable_timing()
+        self.timer = StageTimer() if timer is None else timer
+        self.timer.instrument(self, self.TIMED_STAGES)
+        return self.timer
+
+    def disable_timing(self) -> None:
+        """
+        Disable per-stage timing. The durations accumulated so far are kept in .timer
+        """
+        if self.timer is not None:
+            self.timer.restore(self)
+
     def cmd(self, cmd_line: Union[str, List[str]]) -> Union[str, List[str]]:
         """
         Compile dss command from user
@@ -88,6 +128,7 @@ class OpenDSSInterface(DxToolInterfacesABC):
 
         self.__init_buses()
         self.__init_lines()
+        self.__init_transformers()
         self.__init_loads()
         self.__init_generators()
         self.__init_vr()
@@ -184,6 +225,38 @@ class OpenDSSInterface(DxToolInterfacesABC):
         })
 
 
+    def __init_transformers(self):
+        """
+        Read the buses of all the transformers (including voltage regulators) into this class, stored in
+        self.transformers
+        """
+        transformers = []
+        for xfmrname in self.dss.transformers.names:
+            self.dss.circuit.set_active_element(f'transformer.{xfmrname}')
+            buses = list(self.dss.cktelement.bus_names)
+            transformers.append({
+                'name': xfmrname,
+                'bus1': buses[0],
+                'bus2': buses[1] if len(buses) > 1 else buses[0],
+                'buses': buses,
+            })
+        self.transformers = pd.DataFrame(transformers, columns=['name', 'bus1', 'bus2', 'buses'])
+        self.transformers.set_index('name', inplace=True)
+
+    def plot_profile(self, quantity: str = 'voltage', phases: str = 'ABC', ax=None, **kwargs):
+        """
+        Plot the voltage or power flow profile of the feeder along the distance from the substation, refer to
+        FeederProfilePlot. Call update() of the returned object to refresh the plot after the bus voltages (and line
+        flows) are read in each step.
+
+        :param quantity: 'voltage' for bus voltages (from read_sys_voltage()), or 'power' for active power flow of
+                         lines (from read_line_flow())
+        :param phases: Phases to plot
+        :param ax: Subplot (axes) object to plot in. Default is a new figure
+        :return: FeederProfilePlot object
+        """
+        return FeederProfilePlot(self, quantity=quantity, phases=phases, ax=ax, **kwargs)
+
     def __init_loads(self):
         """
         Read the information of all the loads into this class, stored in self.loads
@@ -400,6 +473,22 @@ class OpenDSSInterface(DxToolInterfacesABC):
             self.dss.text(f'generator.{name}.maxkvar = {der_obj.der_file.NP_Q_MAX_ABS / 1000}')
             self.dss.text(f'generator.{name}.minkvar = {-der_obj.der_file.NP_Q_MAX_INJ / 1000}')
 
+    def disable_der(self, name):
+        """
+        Disable a DER circuit element in dss circuit, which is represented by an equivalent unit. The DER is excluded
+        from the DER voltage readings afterwards.
+
+        :param name: name of the specific DER to be disabled
+        """
+        if self.DER_sim_type not in ['pvsystem', 'generator']:
+            raise ValueError(f'Disabling DERs is not supported for DER_sim_type {self.DER_sim_type}')
+
+        self.dss.text(f'{self.DER_sim_type}.{name}.enabled = false')
+
+        self.disabled_ders.append(name.upper())
+        self.der_bus_list = [der_i['bus'] for _, der_i in self.DERs.iterrows()
+                             if der_i['name'].upper() not in self.disabled_ders]
+
     def load_scaling(self, mult=1.0):
         """
         Scaling all loads in the circuit simulation tool
@@ -12,31 +12,47 @@
 #   prior written permission.
 
 
+import os
 import sys
 
 import matplotlib.pyplot as plt
 import numpy as np
 import opender.der
 import pandas as pd
-import pickle
 import matplotlib
 import time
 from typing import Union, List, Tuple
+from opender_interface.trace_recorder import TraceRecorder
+from opender_interface.trace_store import TraceStore
+from opender_interface.trace_file import TraceFile
+from opender_interface.aligned_runs import AlignedRuns
+from opender_interface.downsample import downsample, DOWNSAMPLE_METHODS
 
 
 class TimePlots:
     """
     This class generates a time-series figure for dynamic or quasi-static time series (QSTS) simulation.
-    Every time step, the datapoints should be added to the class by self.add_to_traces() method.
+    Every time step, the datapoints should be added to the class by self.add_to_traces() method, or by self.record()
+    if the traces are declared by channels.
     After simulation, the plot is prepared by self.prepare(), ready to be saved or shown.
+
+    The datapoints are stored in a TraceRecorder (self.recorder), with one channel group for each subplot. self.traces
+    provides them as a list of DataFrames, one for each subplot. A StreamingTraceRecorder can be provided as the
+    recorder, to stream the datapoints to disk during long simulations, or to plot a run streamed before, and a
+    TraceStore to plot straight from a memory-mapped store.
     """
 
-    def __init__(self, rows: int, cols: int = 1, title: list = None, ylabel: list = None):
+    def __init__(self, rows: int, cols: int = 1, title: list = None, ylabel: list = None,
+                 channels: List[List[str]] = None, dtype: Union[type, str] = np.float64, recorder=None):
         """
         :param rows: Rows of the plots
         :param cols: Columns of the plots
         :param title: Titles of the plots
         :param ylabel: Y-axis labels of the plots
+        :param channels: Optional trace names declared for each subplot, required to use self.record()
+        :param dtype: Data type of the recorded datapoints, e.g. np.float32 to halve the memory usage
+        :param recorder: Optional recorder of the datapoints (TraceRecorder, StreamingTraceRecorder or TraceStore),
+                         with one channel group for each subplot. If provided, channels and dtype are ignored
         """
         self.num_of_subplots = rows * cols
         self.rows = rows
@@ -44,9 +60,47 @@ class TimePlots:
 
         self.title = title
         self.ylabel = ylabel
-        self.traces = [[]]
-        for i in range(self.num_of_subplots - 1):
-            self.traces.append([])
+        if recorder is None:
+            recorder = TraceRecorder(self.num_of_subplots, channels, dtype=dtype)
+        elif recorder.groups != self.num_of_subplots:
+            raise ValueError(f'Recorder has {recorder.groups} channel groups, but there are {self.num_of_subplots} '
+                             f'subplots')
+        self.recorder = recorder
+        self.__traces = None
+
+    @property
+    def traces(self) -> List[pd.DataFrame]:
+        """
+        Recorded datapoints, as a list of DataFrames, one for each subplot
+        """
+        if self.__traces is None:
+            self.__traces = [self.recorder.to_frame(i) for i in range(self.num_of_subplots)]
+        return self.__traces
+
+    @traces.setter
+    def traces(self, traces: List[pd.DataFrame]):
+        # None reads the traces from the recorder again
+        self.__traces = None if traces is None else list(traces)
+
+    def __trace_items(self, i: int) -> List[Tuple[str, np.ndarray, np.ndarray]]:
+        """
+        Return (trace name, time, values) of a subplot, read directly from the recorder unless the traces were
+        replaced. Time is the time index of the recorder (e.g. TraceStore or TraceFile) or of the replaced DataFrame
+        if available, otherwise it is calculated from the OpenDER time step.
+        """
+        if self.__traces is None:
+            if hasattr(self.recorder, 'group_time'):
+                time = self.recorder.group_time(i)
+            else:
+                time = np.arange(len(self.recorder)) * opender.der.DER.t_s
+            return [(name, time, self.recorder.column(i, name)) for name in self.recorder.channels[i]]
+
+        traces = self.__traces[i]
+        if isinstance(traces.index, pd.RangeIndex):
+            time = np.arange(len(traces)) * opender.der.DER.t_s
+        else:
+            time = traces.index.values
+        return [(name, time, traces.iloc[:, j].values) for j, name in enumerate(traces.columns)]
 
     def add_to_traces(self, *args):
         """
@@ -64,14 +118,31 @@ class TimePlots:
 
         :param args: Dictionaries containing the datapoints to be plotted
         """
-        for i,arg in enumerate(args):
-            self.traces[i].append(arg)
+        self.recorder.append_dicts(*args)
+        self.__traces = None
 
+    def record(self, *args):
+        """
+        Add datapoints to the plots, without name lookup. Each subplot should have one sequence containing its plotted
+        values, in the order of the channels declared at initialization.
 
-    def prepare(self):
+        :param args: Sequences containing the datapoints to be plotted
         """
-        Prepare the time plot
+        self.recorder.append(*args)
+        self.__traces = None
+
+    def prepare(self, max_points: int = None, method: str = 'minmax'):
         """
+        Prepare the time plot. Long traces can be downsampled before plotting, which is much faster and produces
+        smaller figure files, refer to opender_interface.downsample.
+
+        :param max_points: Maximum number of points plotted for each trace. If not provided, all points are plotted
+        :param method: Downsampling method, 'minmax' for the min/max envelope of each bucket (e.g. max_points of twice
+                       the figure width in pixels), or 'lttb' for Largest-Triangle-Three-Buckets
+        """
+        if method not in DOWNSAMPLE_METHODS:
+            raise ValueError(f'Downsampling method should be one of {DOWNSAMPLE_METHODS}, but "{method}" is provided')
+
         self.fig, self.axes = plt.subplots(nrows=self.rows, ncols=self.cols, sharex=True)
 
         if self.num_of_subplots ==1:
@@ -80,11 +151,10 @@ class TimePlots:
             self.axes=self.axes.flatten()
 
         for i in range(self.num_of_subplots):
-            self.traces[i]=pd.DataFrame(self.traces[i])
-
-        for i in range(self.num_of_subplots):
-            for j,trace in enumerate(self.traces[i]):
-                self.axes[i].plot(np.array(range(len(self.traces[i][trace])))*opender.der.DER.t_s, self.traces[i][trace], label=trace)
+            for trace, time, values in self.__trace_items(i):
+                if max_points is not None:
+                    time, values = downsample(time, values, max_points, method)
+                self.axes[i].plot(time, values, label=trace)
 
             try:
                 self.axes[i].set_title(self.title[i])
@@ -108,24 +178,97 @@ class TimePlots:
         """
         plt.show()
 
-    def save(self, path='fig.svg', datapath=None):
+    def save(self, path='fig.svg', datapath=None, run_id: str = None, units: Union[List[str], dict] = None):
         """
-        Save figure. The file extension has to be provided. If datapath is provided, the plot figure will be saved as
-        pickle file.
+        Save figure. The file extension has to be provided. If datapath is provided, the plot data will be saved as
+        a compressed columnar trace file (refer to TraceFile), which can be loaded by TimePlots.load().
 
         :param path: Saved figure path. If not provided. a 'fig.svg' file will be saved locally in the same folder
-        :param datapath: Saved figure data path
+        :param datapath: Saved figure data path, conventionally with .npz extension
+        :param run_id: Identifier of the simulation run saved in the trace file
+        :param units: Units of the traces saved in the trace file, either one for each subplot, or a dictionary of
+                      {trace name: units}. Default is the Y-axis labels of the subplots
         """
 
         if datapath is not None:
-            with open(datapath, 'wb') as f:  # should be 'wb' rather than 'w'
-                pickle.dump(self.traces, f)
+            self.save_data(datapath, run_id, units)
 
         plt.savefig(path)
 
-    def prepare_ani(self):
+    def save_data(self, datapath, run_id: str = None, units: Union[List[str], dict] = None):
+        """
+        Save the plot data as a compressed columnar trace file, refer to TimePlots.save()
         """
-        Prepare animation.
+        TraceFile.save(datapath,
+                       [self.__trace_items(i) for i in range(self.num_of_subplots)],
+                       units=self.ylabel if units is None else units,
+                       run_id=run_id,
+                       layout={'rows': self.rows, 'cols': self.cols, 'title': self.title, 'ylabel': self.ylabel})
+
+    @staticmethod
+    def load(datapath) -> 'TimePlots':
+        """
+        Load a TimePlots object from a trace file saved by TimePlots.save(). The traces are loaded lazily, when they
+        are plotted or accessed, so the file is kept open until close() is called, or the end of a with block:
+
+            with TimePlots.load(datapath) as tplot:
+                tplot.prepare()
+
+        Pickle files saved by opender_interface 1.0.1 and earlier can be loaded by TimePlots.load_pickle().
+
+        :param datapath: Trace file path
+        """
+        trace_file = TraceFile(datapath)
+        layout = trace_file.layout
+        return TimePlots(layout.get('rows', trace_file.groups), layout.get('cols', 1), layout.get('title'),
+                         layout.get('ylabel'), recorder=trace_file)
+
+    @staticmethod
+    def load_pickle(datapath) -> 'TimePlots':
+        """
+        Load a TimePlots object from a pickle file saved by TimePlots.save() of opender_interface 1.0.1 and earlier,
+        which contains the list of DataFrames of the subplots. Save it again with save_data() to convert it to a
+        trace file. Only load pickle files from trusted sources.
+
+        :param datapath: Pickle file path
+        """
+        import pickle
+        with open(datapath, 'rb') as f:
+            traces = pickle.load(f)
+        tplot = TimePlots(len(traces))
+        tplot.traces = traces
+        return tplot
+
+    def close(self) -> None:
+        """
+        Close the prepared figure and release the recorder, e.g. the trace file opened by TimePlots.load() or the
+        file of a StreamingTraceRecorder. Traces already accessed by self.traces are kept.
+        """
+        if getattr(self, 'fig', None) is not None:
+            plt.close(self.fig)
+            self.fig = None
+        if hasattr(self.recorder, 'close'):
+            self.recorder.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def prepare_ani(self, frames: int = 500, max_points: int = 2000, ffmpeg_path: str = None):
+        """
+        Prepare animation. The time and value arrays of each trace are prepared once, downsampled to max_points, and
+        each frame only updates the line data with views of them, so the rendering time is proportional to the number
+        of frames rather than the length of the traces.
+
+        :param frames: Maximum number of animation frames. Runs with more time steps are decimated to this number of
+                       frames, evenly spaced in time
+        :param max_points: Maximum number of points of each trace, refer to prepare(). If None, all points are
+                           animated
+        :param ffmpeg_path: Path of the ffmpeg executable used by save_ani() for video files. If not provided, the
+                            OPENDER_FFMPEG_PATH environment variable is used if set, otherwise the matplotlib
+                            configuration (rcParams['animation.ffmpeg_path'], default 'ffmpeg' in PATH)
         """
         print('preparing animations')
 
@@ -137,16 +280,34 @@ class TimePlots:
             self.axes=self.axes.flatten()
 
         from matplotlib.animation import FuncAnimation
-        matplotlib.rcParams['animation.ffmpeg_path'] = r'C:\Users\pyma001\Box\_Documents\ffmpeg.exe' # Please install ffmpeg and reference it here.
+        if ffmpeg_path is None:
+            ffmpeg_path = os.environ.get('OPENDER_FFMPEG_PATH')
+        if ffmpeg_path is not None:
+            matplotlib.rcParams['animation.ffmpeg_path'] = ffmpeg_path
 
-        for i in range(self.num_of_subplots):
-            self.traces[i] = pd.DataFrame(self.traces[i])
+        items = [self.__trace_items(i) for i in range(self.num_of_subplots)]
+        n_steps = max([len(values) for subplot in items for _, _, values in subplot], default=0)
+        t_end = max([t[-1] for subplot in items for _, t, _ in subplot if len(t) > 0], default=0)
+        n_frames = max(min(n_steps, frames), 1)
+        frame_times = np.linspace(0, t_end, n_frames) if n_steps > 1 else np.zeros(n_frames)
 
         self.lines = [[]]
+        self.__ani_data = []
         for i in range(self.num_of_subplots):
             self.lines.append([])
-            for j, trace in enumerate(self.traces[i]):
+            ymin_tmp = np.inf
+            ymax_tmp = -np.inf
+            for trace, t, values in items[i]:
+                t, values = np.asarray(t), np.asarray(values)
+                if max_points is not None:
+                    t, values = downsample(t, values, max_points)
+                # Number of points shown in each frame
+                ends = np.searchsorted(t, frame_times, side='right')
+                self.__ani_data.append((t, values, ends))
                 self.lines[i].append(self.axes[i].plot([],[], label=trace)[0])
+                if np.any(~np.isnan(values)):
+                    ymin_tmp = min(ymin_tmp, np.nanmin(values))
+                    ymax_tmp = max(ymax_tmp, np.nanmax(values))
             try:
                 self.axes[i].set_title(self.title[i])
             except:
@@ -157,20 +318,17 @@ class TimePlots:
             except:
                 pass
 
-            try:
-                ymin_tmp = np.min(self.traces[i].values)
-                ymax_tmp = np.max(self.traces[i].values)
+            if np.isfinite(ymin_tmp):
                 ymin = ymin_tmp - (ymax_tmp-ymin_tmp)*0.1
                 ymax = ymax_tmp + (ymax_tmp-ymin_tmp)*0.1
                 if ymin==ymax:
                     ymin=ymin-0.1
                     ymax=ymax+0.1
-
-            except ValueError:
+            else:
                 ymin = -0.1
                 ymax = 1.1
             self.axes[i].set_ylim(ymin,ymax)
-            self.axes[i].set_xlim(0,len(self.traces[i][trace]) * opender.der.DER.t_s)
+            self.axes[i].set_xlim(0, max(t_end, opender.der.DER.t_s))
             print(f'ylim={ymax},{ymin}')
 
             self.axes[i].grid(visible=True)
@@ -179,37 +337,56 @@ class TimePlots:
 
         self.axes[-1].set_xlabel('Time (s)')
         # plt.tight_layout()
-        self.ani = FuncAnimation(self.fig, self.animate, interval=100, blit=True,save_count=int(len(self.traces[0])*1.1))
+        self.ani = FuncAnimation(self.fig, self.animate, frames=n_frames, interval=100, blit=True)
 
     def animate(self,ii):
         """
         Animation function to be executed every animation frame
         """
-        for i in range(self.num_of_subplots):
-            for j, trace in enumerate(self.traces[i]):
-                x=np.array(range(len(self.traces[i][trace])))[0:ii] * opender.der.DER.t_s
-                y=self.traces[i][trace].values[0:ii]
-
-                self.lines[i][j].set_data(x,y)
+        lines = [item for sublist in self.lines for item in sublist]
+        for line, (t, values, ends) in zip(lines, self.__ani_data):
+            line.set_data(t[:ends[ii]], values[:ends[ii]])
 
-        # plt.gcf().text(0.1, 0, 'asdfasdf', fontsize=14)
-        return [item for sublist in self.lines for item in sublist]
+        return lines
 
-    def save_ani(self,path='fig.mp4'):
+    def save_ani(self, path='fig.mp4', fps=25, writer=None):
         """
-        Save animation to a mp4 file.
+        Save animation to a file. Video files (e.g. mp4) are written by ffmpeg, refer to prepare_ani() for its path.
+        GIF files, or any file if ffmpeg is not available (e.g. on headless servers), are written by Pillow as GIF.
 
-        :param path: Saved mp4 animation path. If not provided, default as 'fig.mp4' in the same folder
+        :param path: Saved animation path. If not provided, default as 'fig.mp4' in the same folder
+        :param fps: Frames per second
+        :param writer: Optional matplotlib animation writer name, e.g. 'ffmpeg' or 'pillow'
+        :return: Saved animation path
         """
+        from matplotlib.animation import writers
+
+        if writer is None:
+            if path.lower().endswith('.gif'):
+                writer = 'pillow'
+            elif writers.is_available('ffmpeg'):
+                writer = 'ffmpeg'
+            else:
+                writer = 'pillow'
+                path = os.path.splitext(path)[0] + '.gif'
+                print('ffmpeg is not available, saving as GIF')
+
         print(f'Saving animations to {path}', end=' ')
         start = time.perf_counter()
-        self.ani.save(path, fps=25, extra_args=['-vcodec', 'libx264'])
+        if writer == 'ffmpeg':
+            self.ani.save(path, writer=writer, fps=fps, extra_args=['-vcodec', 'libx264'])
+        else:
+            self.ani.save(path, writer=writer, fps=fps)
         print(f"... Completed in {time.perf_counter()-start:.1f}s")
+        return path
 
 
 class CombinedTimePlots(TimePlots):
     """
     This class is used to create a time-series figure to contain multiple simulation results.
+
+    combine_runs() merges the runs lazily, aligned on a shared time axis (refer to AlignedRuns), which scales to many
+    runs. combine_time_plots() merges them in memory.
     """
     def __init__(self, rows: int, cols: int = 1, title: list = None, ylabel: list = None):
         """
@@ -220,21 +397,55 @@ class CombinedTimePlots(TimePlots):
         """
         super().__init__(rows, cols, title, ylabel)
 
-    def combine_time_plots(self, tplot_list: List[TimePlots] = None, traces_list: List[pd.DataFrame] = None):
+    def combine_time_plots(self, tplot_list: List[TimePlots] = None, traces_list: List[pd.DataFrame] = None,
+                           store_list: List[TraceStore] = None, t_start: float = None, t_end: float = None,
+                           file_list: list = None, trace_names: List[List[str]] = None):
         """
         :param tplot_list: List of TimePlots objects
+        :param traces_list: List of traces, each a list of DataFrames for each subplot
+        :param store_list: List of TraceStore objects, read within the time range from t_start to t_end and aligned
+                           by their time index
+        :param t_start: Start time (s) read from store_list, inclusive
+        :param t_end: End time (s) read from store_list, inclusive
+        :param file_list: List of trace file paths saved by TimePlots.save(). Files are opened one at a time and only
+                          the traces in trace_names are loaded. Traces are labelled with the run id of their file,
+                          if saved
+        :param trace_names: Trace names loaded from file_list, for each subplot. Default is all traces
         """
         if tplot_list is not None:
-            for tplot in tplot_list:
-                for i in range(self.num_of_subplots):
-                    tplot.traces[i] = pd.DataFrame(tplot.traces[i])
-
-            for i in range(self.num_of_subplots):
-                self.traces[i] = pd.concat([tplot.traces[i] for tplot in tplot_list], axis=1)
+            self.traces = [pd.concat([tplot.traces[i] for tplot in tplot_list], axis=1)
+                           for i in range(self.num_of_subplots)]
 
         if traces_list is not None:
-            # for i in range(self.num_of_subplots):
-            #     self.traces[i] = traces_list[i]
+            self.traces = [pd.concat([traces[i] for traces in traces_list], axis=1)
+                           for i in range(self.num_of_subplots)]
+
+        if store_list is not None:
+            self.traces = [pd.concat([store.read(i, t_start=t_start, t_end=t_end) for store in store_list], axis=1)
+                           for i in range(self.num_of_subplots)]
+
+        if file_list is not None:
+            frames = [[] for _ in range(self.num_of_subplots)]
+            for file in file_list:
+                with TraceFile(file) as trace_file:
+                    for i in range(self.num_of_subplots):
+                        names = trace_file.channels[i] if trace_names is None else \
+                            [name for name in trace_names[i] if name in trace_file.channels[i]]
+                        frame = trace_file.read(i, names)
+                        if trace_file.run_id is not None:
+                            frame.columns = [f'{name} ({trace_file.run_id})' for name in frame.columns]
+                        frames[i].append(frame)
+            self.traces = [pd.concat(frames[i], axis=1) for i in range(self.num_of_subplots)]
+
+    def combine_runs(self, runs: list, labels: List[str] = None, run_t_s: List[float] = None, t_s: float = None,
+                     t_start: float = None, t_end: float = None, method: str = 'linear',
+                     trace_names: List[List[str]] = None):
+        """
+        Merge runs lazily, aligned on a shared time axis. Traces are only read and resampled when they are plotted,
+        so prepare(max_points=...) is recommended for many runs. Refer to AlignedRuns for the parameters.
 
-            for i in range(self.num_of_subplots):
-                self.traces[i] = pd.concat([traces[i] for traces in traces_list], axis=1)
\ No newline at end of file
+        :param runs: List of runs, TimePlots objects, recorders or trace file paths
+        """
+        self.recorder = AlignedRuns(runs, self.num_of_subplots, labels=labels, run_t_s=run_t_s, t_s=t_s,
+                                    t_start=t_start, t_end=t_end, method=method, trace_names=trace_names)
+        self.traces = None
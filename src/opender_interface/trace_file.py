@@ -0,0 +1,180 @@
+# Copyright © 2023 Electric Power Research Institute, Inc. All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+# · Redistributions of source code must retain the above copyright notice,
+#   this list of conditions and the following disclaimer.
+# · Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+# · Neither the name of the EPRI nor the names of its contributors may be used
+#   to endorse or promote products derived from this software without specific
+#   prior written permission.
+
+
+import json
+import pathlib
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Tuple, Union
+
+
+class TraceFile:
+    """
+    This is a compact columnar trace file, used by TimePlots.save() and TimePlots.load(). Each trace and the time
+    index of each group (subplot) are stored as separate compressed arrays of a .npz file, with JSON metadata of the
+    figure layout and of each trace (name, subplot, units and run id).
+
+    Opening a file only reads the metadata. Traces are loaded when requested, so that only the plotted or analyzed
+    traces are materialized. It provides the reading interface of TraceRecorder, so it can be used as the recorder
+    of TimePlots.
+    """
+
+    META_KEY = 'meta'
+    VERSION = 1
+
+    def __init__(self, path: Union[str, pathlib.Path]):
+        """
+        Open a trace file
+
+        :param path: Trace file path
+        """
+        self.path = pathlib.Path(path)
+        self.__npz = np.load(self.path, allow_pickle=False)
+        meta = json.loads(str(self.__npz[self.META_KEY]))
+        if meta.get('version') != self.VERSION:
+            raise ValueError(f'{self.path} is not a trace file of version {self.VERSION}')
+
+        self.run_id = meta['run_id']
+        self.layout: dict = meta['layout']
+        self.traces: List[dict] = meta['traces']
+        self.groups = meta['groups']
+        self.channels: List[List[str]] = [[] for _ in range(self.groups)]
+        self.__keys: List[Dict[str, str]] = [{} for _ in range(self.groups)]
+        for trace in self.traces:
+            self.channels[trace['subplot']].append(trace['name'])
+            self.__keys[trace['subplot']][trace['name']] = trace['key']
+        self.__len = meta['length']
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __len__(self):
+        return self.__len
+
+    def close(self) -> None:
+        if self.__npz is not None:
+            self.__npz.close()
+            self.__npz = None
+
+    def __arrays(self):
+        if self.__npz is None:
+            raise ValueError(f'Trace file {self.path} is closed')
+        return self.__npz
+
+    @staticmethod
+    def save(path: Union[str, pathlib.Path], traces: List[List[Tuple[str, np.ndarray, np.ndarray]]],
+             units: Union[List[str], Dict[str, str]] = None, run_id: str = None, layout: dict = None) -> None:
+        """
+        Save traces to a trace file
+
+        :param path: Trace file path, conventionally with .npz extension
+        :param traces: (trace name, time, values) of each trace, for each group (subplot). Traces of a group share
+                       the time index of the first one
+        :param units: Units of the traces, either one for each group, or a dictionary of {trace name: units}
+        :param run_id: Identifier of the simulation run
+        :param layout: Dictionary of figure layout, e.g. rows, cols, title and ylabel of TimePlots
+        """
+        arrays = {}
+        meta_traces = []
+        length = 0
+        for group, items in enumerate(traces):
+            if items:
+                arrays[f'time_{group}'] = np.asarray(items[0][1], dtype=np.float64)
+            for index, (name, _, values) in enumerate(items):
+                key = f'g{group}_c{index}'
+                arrays[key] = np.asarray(values)
+                length = max(length, len(values))
+                if isinstance(units, dict):
+                    trace_units = units.get(name)
+                elif units is not None and group < len(units):
+                    trace_units = units[group]
+                else:
+                    trace_units = None
+                meta_traces.append({'name': name, 'key': key, 'subplot': group, 'units': trace_units,
+                                    'run_id': run_id})
+
+        meta = {'version': TraceFile.VERSION,
+                'run_id': run_id,
+                'groups': len(traces),
+                'length': length,
+                'layout': layout if layout is not None else {},
+                'traces': meta_traces}
+        arrays[TraceFile.META_KEY] = np.array(json.dumps(meta))
+        with open(path, 'wb') as f:
+            np.savez_compressed(f, **arrays)
+
+    def group_time(self, group: int) -> np.ndarray:
+        """
+        Return the time index (s) of a group
+
+        :param group: Group index
+        """
+        key = f'time_{group}'
+        npz = self.__arrays()
+        if key not in npz.files:
+            # group without traces
+            return np.zeros(0)
+        return npz[key]
+
+    @property
+    def time(self) -> np.ndarray:
+        """
+        Time index (s) of the first group
+        """
+        return self.group_time(0)
+
+    def column(self, group: int, name: str) -> np.ndarray:
+        """
+        Load the values of a trace
+
+        :param group: Group index
+        :param name: Trace name
+        """
+        npz = self.__arrays()
+        try:
+            return npz[self.__keys[group][name]]
+        except KeyError:
+            raise ValueError(f'Trace {name} does not exist in group {group} of {self.path}')
+
+    def read(self, group: int, names: List[str] = None) -> pd.DataFrame:
+        """
+        Load traces of a group into a DataFrame indexed by time
+
+        :param group: Group index
+        :param names: Trace names. Default is all traces of the group
+        """
+        if names is None:
+            names = self.channels[group]
+        if not self.channels[group]:
+            return pd.DataFrame()
+        index = pd.Index(self.group_time(group), name='time')
+        return pd.DataFrame({name: self.column(group, name) for name in names}, index=index)
+
+    def to_frame(self, group: int) -> pd.DataFrame:
+        """
+        Load the traces of a group as a DataFrame, refer to TraceRecorder.to_frame()
+        """
+        return pd.DataFrame({name: self.column(group, name) for name in self.channels[group]})
+
+    def records(self, group: int) -> List[dict]:
+        """
+        Load the traces of a group as a list of dictionaries, refer to TraceRecorder.records()
+        """
+        columns = [self.column(group, name).tolist() for name in self.channels[group]]
+        if not columns:
+            return [{} for _ in range(len(self))]
+        return [dict(zip(self.channels[group], row)) for row in zip(*columns)]
@@ -0,0 +1,184 @@
+# Copyright © 2023 Electric Power Research Institute, Inc. All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+# · Redistributions of source code must retain the above copyright notice,
+#   this list of conditions and the following disclaimer.
+# · Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+# · Neither the name of the EPRI nor the names of its contributors may be used
+#   to endorse or promote products derived from this software without specific
+#   prior written permission.
+
+
+import numpy as np
+import pandas as pd
+from typing import List, Sequence, Union
+
+
+class TraceRecorder:
+    """
+    This is a columnar recorder of simulation traces. Channels are declared in groups (e.g. one group for each subplot
+    of TimePlots), and the datapoints of each time step are written into preallocated NumPy columns. The columns grow
+    by doubling their capacity, so that appending a time step is O(1) amortized and no Python object is kept per
+    datapoint.
+
+    Values are recorded as floats, missing values as NaN.
+    """
+
+    def __init__(self, groups: int = 1, channels: List[List[str]] = None, capacity: int = 1024,
+                 dtype: Union[type, str] = np.float64):
+        """
+        :param groups: Number of channel groups
+        :param channels: Optional channel names declared for each group. Channels can also be declared later by
+                         declare() or append_dicts()
+        :param capacity: Initial number of time steps preallocated
+        :param dtype: Data type of the columns, e.g. np.float32 to halve the memory usage
+        """
+        if capacity < 1:
+            raise ValueError('Capacity of the recorder should be at least 1')
+
+        self.groups = groups
+        self.dtype = np.dtype(dtype)
+        self.channels: List[List[str]] = [[] for _ in range(groups)]
+
+        self.__capacity = capacity
+        self.__len = 0
+        self.__index = [{} for _ in range(groups)]
+        self.__data = [np.empty((0, capacity), dtype=self.dtype) for _ in range(groups)]
+
+        if channels is not None:
+            if len(channels) > groups:
+                raise ValueError(f'Channels are declared for {len(channels)} groups, but recorder has {groups} groups')
+            for group, names in enumerate(channels):
+                for name in names:
+                    self.declare(group, name)
+
+    def __len__(self):
+        return self.__len
+
+    @property
+    def capacity(self) -> int:
+        """
+        Number of time steps preallocated
+        """
+        return self.__capacity
+
+    def declare(self, group: int, name: str) -> int:
+        """
+        Declare a channel in a group. Time steps recorded before the declaration are NaN.
+
+        :param group: Group index
+        :param name: Channel name
+        :return: Row index of the channel in the group
+        """
+        index = self.__index[group]
+        if name not in index:
+            index[name] = len(self.channels[group])
+            self.channels[group].append(name)
+            column = np.full((1, self.__capacity), np.nan, dtype=self.dtype)
+            self.__data[group] = np.vstack([self.__data[group], column])
+        return index[name]
+
+    def __reserve(self, n: int) -> None:
+        """
+        Make sure n more time steps can be recorded, by doubling the capacity if needed
+        """
+        if self.__len + n <= self.__capacity:
+            return
+        capacity = self.__capacity
+        while self.__len + n > capacity:
+            capacity = capacity * 2
+        for group, data in enumerate(self.__data):
+            grown = np.empty((data.shape[0], capacity), dtype=self.dtype)
+            grown[:, :self.__len] = data[:, :self.__len]
+            self.__data[group] = grown
+        self.__capacity = capacity
+
+    def append(self, *values: Sequence[float]) -> None:
+        """
+        Record one time step from value sequences, one for each group, in the order of the declared channels. This is
+        the fast path without name lookup.
+
+        :param values: Sequences of values for each group
+        """
+        if len(values) != self.groups:
+            raise ValueError(f'Values of {len(values)} groups provided, but recorder has {self.groups} groups')
+        self.__reserve(1)
+        for data, value in zip(self.__data, values):
+            data[:, self.__len] = value
+        self.__len = self.__len + 1
+
+    def append_dicts(self, *dicts: dict) -> None:
+        """
+        Record one time step from dictionaries of {channel name: value}, one for each group. New channel names are
+        declared, and channels missing in a dictionary are recorded as NaN.
+
+        :param dicts: Dictionaries for each group
+        """
+        if len(dicts) > self.groups:
+            raise ValueError(f'Values of {len(dicts)} groups provided, but recorder has {self.groups} groups')
+        for group, values in enumerate(dicts):
+            for name in values:
+                if name not in self.__index[group]:
+                    self.declare(group, name)
+
+        self.__reserve(1)
+        for group, data in enumerate(self.__data):
+            column = data[:, self.__len]
+            column[:] = np.nan
+            if group < len(dicts):
+                index = self.__index[group]
+                for name, value in dicts[group].items():
+                    column[index[name]] = np.nan if value is None else value
+        self.__len = self.__len + 1
+
+    def repeat(self, n: int) -> None:
+        """
+        Record the latest time step n more times, e.g. for time steps in which the outputs do not change
+
+        :param n: Number of repeated time steps
+        """
+        if self.__len == 0:
+            raise ValueError('No time step is recorded to be repeated')
+        if n <= 0:
+            return
+        self.__reserve(n)
+        for data in self.__data:
+            data[:, self.__len:self.__len + n] = data[:, self.__len - 1:self.__len]
+        self.__len = self.__len + n
+
+    def clear(self) -> None:
+        """
+        Discard the recorded time steps, keeping the declared channels and the preallocated capacity
+        """
+        self.__len = 0
+
+    def column(self, group: int, name: str) -> np.ndarray:
+        """
+        Return the recorded values of a channel. The returned array is a view of the recorder storage, and it should
+        not be modified.
+
+        :param group: Group index
+        :param name: Channel name
+        """
+        return self.__data[group][self.__index[group][name], :self.__len]
+
+    def to_frame(self, group: int) -> pd.DataFrame:
+        """
+        Return the recorded values of a group as a DataFrame, with one column for each channel
+
+        :param group: Group index
+        """
+        return pd.DataFrame({name: self.column(group, name) for name in self.channels[group]})
+
+    def records(self, group: int) -> List[dict]:
+        """
+        Return the recorded values of a group as a list of dictionaries, one for each time step, in the format
+        accepted by append_dicts()
+
+        :param group: Group index
+        """
+        rows = self.__data[group][:, :self.__len].T.tolist()
+        return [dict(zip(self.channels[group], row)) for row in rows]
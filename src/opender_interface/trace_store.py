@@ -0,0 +1,315 @@
+# Copyright © 2023 Electric Power Research Institute, Inc. All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+# · Redistributions of source code must retain the above copyright notice,
+#   this list of conditions and the following disclaimer.
+# · Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+# · Neither the name of the EPRI nor the names of its contributors may be used
+#   to endorse or promote products derived from this software without specific
+#   prior written permission.
+
+
+import json
+import os
+import pathlib
+import numpy as np
+import pandas as pd
+from typing import List, Sequence, Tuple, Union
+
+
+class TraceStore:
+    """
+    This is a memory-mapped trace store for out-of-core plotting and analysis of long simulations. The channels are
+    declared when the store is created (fixed schema), and a store is a directory with:
+        - schema.json: channel groups, channel names, data type and number of recorded time steps
+        - time.npy: time index (s) of the time steps, float64
+        - data.npy: one contiguous row for each channel, in the order of the groups and their channels
+
+    The .npy files are memory-mapped, so reading a time range of a channel only loads that part of the file. Time
+    steps are appended in increasing time, and the files grow by doubling their capacity.
+
+    It provides the same interface as TraceRecorder, so it can be used as the recorder of TimePlots.
+    """
+
+    SCHEMA_FILE = 'schema.json'
+    TIME_FILE = 'time.npy'
+    DATA_FILE = 'data.npy'
+
+    def __init__(self, path: Union[str, pathlib.Path], mode: str = 'r'):
+        """
+        Open an existing store, refer to TraceStore.create() to create a new one.
+
+        :param path: Directory of the store
+        :param mode: 'r' to read only, 'r+' to read and append time steps
+        """
+        if mode not in ['r', 'r+']:
+            raise ValueError(f'Mode of trace store should be "r" or "r+", but "{mode}" is provided')
+        self.path = pathlib.Path(path)
+        self.mode = mode
+
+        with open(self.path.joinpath(self.SCHEMA_FILE)) as f:
+            schema = json.load(f)
+        self.groups = schema['groups']
+        self.channels: List[List[str]] = schema['channels']
+        self.dtype = np.dtype(schema['dtype'])
+        self.t_s = schema['t_s']
+        self.__len = schema['length']
+
+        self.__rows = []
+        row = 0
+        for names in self.channels:
+            self.__rows.append({name: row + index for index, name in enumerate(names)})
+            row = row + len(names)
+
+        self.__open()
+
+    @classmethod
+    def create(cls, path: Union[str, pathlib.Path], channels: List[List[str]], dtype: Union[type, str] = np.float64,
+               capacity: int = 1024, t_s: float = 1) -> 'TraceStore':
+        """
+        Create a new store and open it in 'r+' mode.
+
+        :param path: Directory of the store, should not contain a store yet
+        :param channels: Channel names declared for each group
+        :param dtype: Data type of the channels, e.g. np.float32 to halve the file size
+        :param capacity: Initial number of time steps preallocated
+        :param t_s: Time step (s), used for the time index when time steps are appended without time
+        """
+        path = pathlib.Path(path)
+        if path.joinpath(cls.SCHEMA_FILE).exists():
+            raise ValueError(f'{path} already contains a trace store')
+        if capacity < 1:
+            raise ValueError('Capacity of the trace store should be at least 1')
+        path.mkdir(parents=True, exist_ok=True)
+
+        n_rows = sum(len(names) for names in channels)
+        np.lib.format.open_memmap(path.joinpath(cls.TIME_FILE), mode='w+', dtype=np.float64, shape=(capacity,))
+        np.lib.format.open_memmap(path.joinpath(cls.DATA_FILE), mode='w+', dtype=dtype, shape=(n_rows, capacity))
+        cls.__write_schema(path, {'groups': len(channels),
+                                  'channels': [list(names) for names in channels],
+                                  'dtype': np.dtype(dtype).str,
+                                  't_s': t_s,
+                                  'length': 0})
+        return cls(path, mode='r+')
+
+    @classmethod
+    def __write_schema(cls, path: pathlib.Path, schema: dict) -> None:
+        tmp_path = path.joinpath(cls.SCHEMA_FILE + '.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(schema, f)
+        os.replace(tmp_path, path.joinpath(cls.SCHEMA_FILE))
+
+    def __open(self) -> None:
+        """
+        Memory-map the time and data files
+        """
+        self.__time = np.load(self.path.joinpath(self.TIME_FILE), mmap_mode=self.mode)
+        self.__data = np.load(self.path.joinpath(self.DATA_FILE), mmap_mode=self.mode)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __len__(self):
+        return self.__len
+
+    @property
+    def capacity(self) -> int:
+        """
+        Number of time steps preallocated in the files
+        """
+        return self.__time.shape[0]
+
+    @property
+    def time(self) -> np.ndarray:
+        """
+        Time index (s) of the recorded time steps, memory-mapped
+        """
+        return self.__time[:self.__len]
+
+    def group_time(self, group: int) -> np.ndarray:
+        """
+        Time index (s) of a group, identical for all groups of a store
+        """
+        return self.time
+
+    def flush(self) -> None:
+        """
+        Write the recorded time steps to disk and update the schema file
+        """
+        if self.mode == 'r':
+            return
+        self.__time.flush()
+        self.__data.flush()
+        self.__write_schema(self.path, {'groups': self.groups,
+                                        'channels': self.channels,
+                                        'dtype': self.dtype.str,
+                                        't_s': self.t_s,
+                                        'length': self.__len})
+
+    def close(self) -> None:
+        """
+        Flush the recorded time steps. The store can be opened again.
+        """
+        self.flush()
+
+    def __reserve(self, n: int) -> None:
+        """
+        Make sure n more time steps can be recorded, by doubling the capacity of the files if needed
+        """
+        if self.mode == 'r':
+            raise ValueError('Trace store is opened in read-only mode')
+        if self.__len + n <= self.capacity:
+            return
+        capacity = self.capacity
+        while self.__len + n > capacity:
+            capacity = capacity * 2
+
+        for file, old in [(self.TIME_FILE, self.__time), (self.DATA_FILE, self.__data)]:
+            tmp_path = self.path.joinpath(file + '.tmp')
+            grown = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=old.dtype, shape=old.shape[:-1] + (capacity,))
+            grown[..., :self.__len] = old[..., :self.__len]
+            grown.flush()
+            del grown
+        # memory maps are released before the files are replaced
+        self.__time = self.__data = None
+        for file in [self.TIME_FILE, self.DATA_FILE]:
+            os.replace(self.path.joinpath(file + '.tmp'), self.path.joinpath(file))
+        self.__open()
+        self.flush()
+
+    def __next_time(self, t: Union[float, None]) -> float:
+        if t is None:
+            return self.__time[self.__len - 1] + self.t_s if self.__len > 0 else 0
+        if self.__len > 0 and t < self.__time[self.__len - 1]:
+            raise ValueError(f'Time {t} is earlier than the latest recorded time {self.__time[self.__len - 1]}')
+        return t
+
+    def declare(self, group: int, name: str) -> int:
+        """
+        Return the index of a declared channel in its group. The schema is fixed, so new channels cannot be declared.
+
+        :param group: Group index
+        :param name: Channel name
+        """
+        if name not in self.__rows[group]:
+            raise ValueError(f'Channel {name} is not declared in group {group} of the trace store')
+        return self.channels[group].index(name)
+
+    def append(self, *values: Sequence[float], t: float = None) -> None:
+        """
+        Record one time step from value sequences, one for each group, in the order of the declared channels
+
+        :param values: Sequences of values for each group
+        :param t: Time (s) of the time step. Default is one time step t_s after the latest recorded time
+        """
+        if len(values) != self.groups:
+            raise ValueError(f'Values of {len(values)} groups provided, but trace store has {self.groups} groups')
+        t = self.__next_time(t)
+        self.__reserve(1)
+        row = 0
+        for names, value in zip(self.channels, values):
+            self.__data[row:row + len(names), self.__len] = value
+            row = row + len(names)
+        self.__time[self.__len] = t
+        self.__len = self.__len + 1
+
+    def append_dicts(self, *dicts: dict, t: float = None) -> None:
+        """
+        Record one time step from dictionaries of {channel name: value}, one for each group. Channels missing in a
+        dictionary are recorded as NaN.
+
+        :param dicts: Dictionaries for each group
+        :param t: Time (s) of the time step. Default is one time step t_s after the latest recorded time
+        """
+        if len(dicts) > self.groups:
+            raise ValueError(f'Values of {len(dicts)} groups provided, but trace store has {self.groups} groups')
+        for group, values in enumerate(dicts):
+            for name in values:
+                self.declare(group, name)
+
+        t = self.__next_time(t)
+        self.__reserve(1)
+        column = np.full(self.__data.shape[0], np.nan, dtype=self.dtype)
+        for group, values in enumerate(dicts):
+            for name, value in values.items():
+                column[self.__rows[group][name]] = np.nan if value is None else value
+        self.__data[:, self.__len] = column
+        self.__time[self.__len] = t
+        self.__len = self.__len + 1
+
+    def repeat(self, n: int) -> None:
+        """
+        Record the latest time step n more times, with time steps of t_s
+
+        :param n: Number of repeated time steps
+        """
+        if self.__len == 0:
+            raise ValueError('No time step is recorded to be repeated')
+        if n <= 0:
+            return
+        self.__reserve(n)
+        self.__data[:, self.__len:self.__len + n] = self.__data[:, self.__len - 1:self.__len]
+        self.__time[self.__len:self.__len + n] = self.__time[self.__len - 1] + self.t_s * np.arange(1, n + 1)
+        self.__len = self.__len + n
+
+    def index_range(self, t_start: float = None, t_end: float = None) -> Tuple[int, int]:
+        """
+        Return the range of time step indices within a time range, found by binary search in the time index
+
+        :param t_start: Start time (s), inclusive. Default is the first time step
+        :param t_end: End time (s), inclusive. Default is the latest time step
+        """
+        start = 0 if t_start is None else int(np.searchsorted(self.time, t_start, side='left'))
+        end = self.__len if t_end is None else int(np.searchsorted(self.time, t_end, side='right'))
+        return start, end
+
+    def column(self, group: int, name: str, t_start: float = None, t_end: float = None) -> np.ndarray:
+        """
+        Return the recorded values of a channel, optionally within a time range. The returned array is memory-mapped,
+        only the parts accessed are loaded.
+
+        :param group: Group index
+        :param name: Channel name
+        :param t_start: Start time (s), inclusive
+        :param t_end: End time (s), inclusive
+        """
+        self.declare(group, name)
+        start, end = self.index_range(t_start, t_end)
+        return self.__data[self.__rows[group][name], start:end]
+
+    def read(self, group: int, names: List[str] = None, t_start: float = None, t_end: float = None) -> pd.DataFrame:
+        """
+        Read channels of a group within a time range into a DataFrame indexed by time
+
+        :param group: Group index
+        :param names: Channel names. Default is all channels of the group
+        :param t_start: Start time (s), inclusive
+        :param t_end: End time (s), inclusive
+        """
+        if names is None:
+            names = self.channels[group]
+        start, end = self.index_range(t_start, t_end)
+        for name in names:
+            self.declare(group, name)
+        index = pd.Index(np.array(self.__time[start:end]), name='time')
+        return pd.DataFrame({name: np.array(self.__data[self.__rows[group][name], start:end]) for name in names},
+                            index=index)
+
+    def to_frame(self, group: int) -> pd.DataFrame:
+        """
+        Return the recorded values of a group as a DataFrame, refer to TraceRecorder.to_frame()
+        """
+        return pd.DataFrame({name: np.array(self.column(group, name)) for name in self.channels[group]})
+
+    def records(self, group: int) -> List[dict]:
+        """
+        Return the recorded values of a group as a list of dictionaries, refer to TraceRecorder.records()
+        """
+        rows = [self.__rows[group][name] for name in self.channels[group]]
+        return [dict(zip(self.channels[group], row)) for row in self.__data[rows, :self.__len].T.tolist()]
@@ -0,0 +1,214 @@
+# Copyright © 2023 Electric Power Research Institute, Inc. All rights reserved.
+
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+# · Redistributions of source code must retain the above copyright notice,
+#   this list of conditions and the following disclaimer.
+# · Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+# · Neither the name of the EPRI nor the names of its contributors may be used
+#   to endorse or promote products derived from this software without specific
+#   prior written permission.
+
+
+import json
+import os
+import pathlib
+import numpy as np
+import pandas as pd
+from typing import List, Sequence, Union
+from opender_interface.trace_recorder import TraceRecorder
+
+
+class StreamingTraceRecorder:
+    """
+    This is a trace recorder streaming the recorded channels to disk during long simulations. Time steps are buffered
+    in a TraceRecorder of chunk_size time steps, and each full buffer is flushed as one chunk (an uncompressed .npz
+    file) into a directory, with a meta.json file listing the channels and chunks. Memory usage is therefore bounded
+    by the buffer, and a crash loses at most the time steps not yet flushed.
+
+    Chunk and meta files are written to temporary files and then renamed, so that the directory is always consistent
+    and a partially written run can be resumed.
+
+    It provides the same interface as TraceRecorder, so it can be used as the recorder of TimePlots.
+    """
+
+    META_FILE = 'meta.json'
+
+    def __init__(self, path: Union[str, pathlib.Path], groups: int = 1, channels: List[List[str]] = None,
+                 chunk_size: int = 10000, dtype: Union[type, str] = np.float64, resume: bool = False):
+        """
+        :param path: Directory of the chunks
+        :param groups: Number of channel groups. Ignored when resuming
+        :param channels: Optional channel names declared for each group
+        :param chunk_size: Number of time steps in each chunk, i.e. the number of time steps buffered in memory
+        :param dtype: Data type of the columns. Ignored when resuming
+        :param resume: If True, continue a run already written in the directory. If False, the directory should not
+                       contain a run yet
+        """
+        self.path = pathlib.Path(path)
+        self.chunk_size = chunk_size
+        self.chunks: List[dict] = []
+
+        meta_path = self.path.joinpath(self.META_FILE)
+        if meta_path.exists():
+            if not resume:
+                raise ValueError(f'{self.path} already contains a trace stream, set resume=True to continue it')
+            with open(meta_path) as f:
+                meta = json.load(f)
+            groups = meta['groups']
+            dtype = meta['dtype']
+            self.chunks = meta['chunks']
+            declared = meta['channels']
+        else:
+            self.path.mkdir(parents=True, exist_ok=True)
+            declared = []
+
+        self.__buffer = TraceRecorder(groups, declared, capacity=chunk_size, dtype=dtype)
+        if channels is not None:
+            for group, names in enumerate(channels):
+                for name in names:
+                    self.__buffer.declare(group, name)
+        self.__write_meta()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @property
+    def groups(self) -> int:
+        return self.__buffer.groups
+
+    @property
+    def dtype(self) -> np.dtype:
+        return self.__buffer.dtype
+
+    @property
+    def channels(self) -> List[List[str]]:
+        return self.__buffer.channels
+
+    def __len__(self):
+        return sum(chunk['length'] for chunk in self.chunks) + len(self.__buffer)
+
+    def __write_meta(self) -> None:
+        """
+        Write the meta file, replacing the previous one
+        """
+        meta = {'groups': self.groups,
+                'dtype': self.dtype.str,
+                'channels': self.channels,
+                'chunks': self.chunks}
+        tmp_path = self.path.joinpath(self.META_FILE + '.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, self.path.joinpath(self.META_FILE))
+
+    def flush(self) -> None:
+        """
+        Write the buffered time steps as a new chunk
+        """
+        if len(self.__buffer) == 0:
+            return
+
+        file = f'chunk_{len(self.chunks):06d}.npz'
+        arrays = {f'g{group}_c{index}': self.__buffer.column(group, name)
+                  for group in range(self.groups) for index, name in enumerate(self.channels[group])}
+        tmp_path = self.path.joinpath(file + '.tmp')
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, self.path.joinpath(file))
+
+        self.chunks.append({'file': file, 'length': len(self.__buffer)})
+        self.__write_meta()
+        self.__buffer.clear()
+
+    def close(self) -> None:
+        """
+        Flush the buffered time steps. The run can be resumed later.
+        """
+        self.flush()
+
+    def declare(self, group: int, name: str) -> int:
+        """
+        Declare a channel in a group, refer to TraceRecorder.declare()
+        """
+        return self.__buffer.declare(group, name)
+
+    def append(self, *values: Sequence[float]) -> None:
+        """
+        Record one time step from value sequences, refer to TraceRecorder.append()
+        """
+        self.__buffer.append(*values)
+        if len(self.__buffer) >= self.chunk_size:
+            self.flush()
+
+    def append_dicts(self, *dicts: dict) -> None:
+        """
+        Record one time step from dictionaries, refer to TraceRecorder.append_dicts()
+        """
+        self.__buffer.append_dicts(*dicts)
+        if len(self.__buffer) >= self.chunk_size:
+            self.flush()
+
+    def repeat(self, n: int) -> None:
+        """
+        Record the latest time step n more times, refer to TraceRecorder.repeat()
+        """
+        while n > 0:
+            if len(self.__buffer) == 0:
+                self.__buffer.append(*self.__last_values())
+                n = n - 1
+            else:
+                m = min(n, self.chunk_size - len(self.__buffer))
+                self.__buffer.repeat(m)
+                n = n - m
+            if len(self.__buffer) >= self.chunk_size:
+                self.flush()
+
+    def __last_values(self) -> List[List[float]]:
+        """
+        Return the values of the latest flushed time step, for each group in the order of the declared channels
+        """
+        if not self.chunks:
+            raise ValueError('No time step is recorded to be repeated')
+        with np.load(self.path.joinpath(self.chunks[-1]['file'])) as chunk:
+            return [[chunk[key][-1] if key in chunk else np.nan
+                     for key in (f'g{group}_c{index}' for index in range(len(self.channels[group])))]
+                    for group in range(self.groups)]
+
+    def column(self, group: int, name: str) -> np.ndarray:
+        """
+        Return the recorded values of a channel, read from all chunks and the buffer
+
+        :param group: Group index
+        :param name: Channel name
+        """
+        key = f'g{group}_c{self.channels[group].index(name)}'
+        parts = []
+        for chunk_info in self.chunks:
+            with np.load(self.path.joinpath(chunk_info['file'])) as chunk:
+                if key in chunk:
+                    parts.append(chunk[key])
+                else:
+                    # channel declared after this chunk was written
+                    parts.append(np.full(chunk_info['length'], np.nan, dtype=self.dtype))
+        parts.append(self.__buffer.column(group, name))
+        return np.concatenate(parts)
+
+    def to_frame(self, group: int) -> pd.DataFrame:
+        """
+        Return the recorded values of a group as a DataFrame, refer to TraceRecorder.to_frame()
+        """
+        return pd.DataFrame({name: self.column(group, name) for name in self.channels[group]})
+
+    def records(self, group: int) -> List[dict]:
+        """
+        Return the recorded values of a group as a list of dictionaries, refer to TraceRecorder.records()
+        """
+        if not self.channels[group]:
+            return [{} for _ in range(len(self))]
+        columns = [self.column(group, name).tolist() for name in self.channels[group]]
+        return [dict(zip(self.channels[group], row)) for row in zip(*columns)]
@@ -16,7 +16,9 @@ Created on Fri Feb  4 13:07:24 2022
 
 @author: pwre002
 """
+import math
 import numpy as np
+from typing import List, Union
 
 
 class VR_Model(object):
@@ -117,5 +119,259 @@ class VR_Model(object):
         self.Vreg = Vreg
         return self.tap
 
+    def __hysteresis_state(self, Vreg):
+        """
+        Return the hysteresis state for a regulating voltage
+        """
+        if Vreg > self.Vref + self.db / 2:
+            return 'OV'
+        elif Vreg < self.Vref - self.db / 2:
+            return 'UV'
+        else:
+            return 'Idle'
 
+    def __steps_to_tap(self, Vreg):
+        """
+        Return the number of run() calls until the next tap change, if the regulating voltage stays at Vreg
+        """
+        state = self.__hysteresis_state(Vreg)
+        if state == 'Idle' or (state == 'OV' and self.tap <= self.tap_min) \
+                or (state == 'UV' and self.tap >= self.tap_max):
+            return math.inf
+
+        if state == self.state:
+            steps_ctrl = math.floor((self.Td_ctrl - self.Ti_ctrl) / self.Ts) + 1
+        else:
+            # control timer is reset in the first call, when the hysteresis state changes
+            steps_ctrl = math.floor(self.Td_ctrl / self.Ts) + 2
+        steps_tap = math.ceil((self.Td_tap - self.Ti_tap) / self.Ts)
+        return max(steps_ctrl, steps_tap, 1)
+
+    def time_to_next_tap(self, Vreg=None):
+        """
+        Return the time (s) until the next possible tap change, if the regulating voltage stays at Vreg. This is the
+        time at the end of the run() call which changes the tap, or math.inf if the tap does not change.
 
+        :param Vreg: regulating voltage (magnitude on 120V base). Default is the latest regulating voltage
+        """
+        if Vreg is None:
+            Vreg = self.Vreg
+        return self.__steps_to_tap(Vreg) * self.Ts
+
+    def advance(self, dt, Vreg=None):
+        """
+        Advance the timers by dt in one shot, equivalent to calling run() every Ts with the regulating voltage held at
+        Vreg. dt should be an integer multiple of Ts and less than time_to_next_tap(Vreg).
+
+        :param dt: time (s) to advance
+        :param Vreg: regulating voltage (magnitude on 120V base). Default is the latest regulating voltage
+        """
+        if Vreg is None:
+            Vreg = self.Vreg
+
+        n = round(dt / self.Ts)
+        if n < 0 or abs(n * self.Ts - dt) > 1e-9 * max(abs(dt), self.Ts):
+            raise ValueError(f'Time {dt} should be a non-negative integer multiple of the time step {self.Ts}')
+        if n >= self.__steps_to_tap(Vreg):
+            raise ValueError(f'Tap of voltage regulator {self.name} changes within {dt}s, it cannot be advanced')
+        if n == 0:
+            return
+
+        state = self.__hysteresis_state(Vreg)
+        if state == 'Idle':
+            self.Ti_ctrl = 0
+        elif state == self.state:
+            self.Ti_ctrl = self.Ti_ctrl + n * self.Ts
+        else:
+            self.Ti_ctrl = (n - 1) * self.Ts
+        self.state = state
+        self.Ti_tap = self.Ti_tap + n * self.Ts
+        self.Vreg = Vreg
+
+
+class VRBank(object):
+    """
+    This is the array-backed voltage regulator (VR) control model for a bank of regulators. The parameters and
+    states of all regulators are held in NumPy arrays, and the line drop compensation, hysteresis and tap logic of all
+    regulators are calculated in one vectorized call, with identical results to VR_Model.
+
+    The hysteresis state is held as an integer array, with the codes of VRBank.STATES.
+    """
+
+    STATES = ['Idle', 'OV', 'UV']
+
+    def __init__(self, vr_objs: List[VR_Model]):
+        """
+        Initialize the bank from VR_Model objects, including their current states.
+
+        :param vr_objs: List of VR_Model objects
+        """
+        self.names = [vr.name for vr in vr_objs]
+        self.load_vr_objs(vr_objs)
+
+    def __len__(self):
+        return len(self.names)
+
+    def calculate_vreg(self, Vpri: List[List[complex]], Ipri: List[List[complex]] = None) -> np.ndarray:
+        """
+        Calculate the regulating voltages (magnitude on 120V base) from primary voltages and currents, with line drop
+        compensation. Regulators can have different number of phases.
+
+        :param Vpri: primary voltages (complex numbers in V) of each regulator
+        :param Ipri: primary currents (complex numbers in A) of each regulator. If not provided, no line drop
+                     compensation is applied.
+        """
+        n_phases = max(len(v) for v in Vpri)
+        vpri = np.full((len(self), n_phases), np.nan, dtype=complex)
+        ipri = np.zeros((len(self), n_phases), dtype=complex)
+        for i, v in enumerate(Vpri):
+            vpri[i, :len(v)] = v
+            if Ipri is not None and len(Ipri[i]) > 0:
+                ipri[i, :len(Ipri[i])] = Ipri[i]
+
+        Vsec = vpri / self.PT_Ratio[:, None]
+        # Complex product is expanded, so that the rounding is identical to the scalar calculation in VR_Model
+        Iset = ipri / self.CT_Primary[:, None]
+        R, X = self.LDC_R[:, None], self.LDC_X[:, None]
+        Vldc = (Iset.real * R - Iset.imag * X) + 1j * (Iset.real * X + Iset.imag * R)
+        Vmag = np.abs(Vsec - Vldc)
+        if np.isnan(Vmag).any():
+            return np.nanmean(Vmag, axis=1)
+        return np.mean(Vmag, axis=1)
+
+    def run(self,
+            Vreg: Union[np.ndarray, List[float]] = None,
+            Vpri: List[List[complex]] = None,
+            Ipri: List[List[complex]] = None,
+            ) -> np.ndarray:
+        """
+        Determine tap positions of all voltage regulators. If Vreg is not provided, Vreg will be calculated based on
+        Vpri and Ipri and line drop compensation parameters.
+
+        :param Vreg: regulating voltages (magnitude on 120V base)
+        :param Vpri: primary voltages (complex numbers in V) of each regulator
+        :param Ipri: primary currents (complex numbers in A) of each regulator
+        :return: tap positions
+        """
+
+        # input conditioning
+        if Vreg is None:
+            Vreg = self.calculate_vreg(Vpri, Ipri)
+        Vreg = np.asarray(Vreg, dtype=float)
+
+        # Hysteresis logic
+        state = self.__hysteresis_state(Vreg)
+        self.Ti_ctrl = np.where((state != 0) & (state == self.state), self.Ti_ctrl + self.Ts, 0)
+        self.state = state
+
+        # Tap operation
+        self.Ti_tap = self.Ti_tap + self.Ts
+        ready = (self.Ti_ctrl > self.Td_ctrl) & (self.Ti_tap >= self.Td_tap)
+        tap_down = ready & (self.state == 1) & (self.tap > self.tap_min)
+        tap_up = ready & (self.state == 2) & (self.tap < self.tap_max)
+        self.tap = self.tap - tap_down + tap_up
+        self.Ti_tap = np.where(tap_down | tap_up, 0, self.Ti_tap)
+        self.total_sw = self.total_sw + (tap_down | tap_up)
+
+        # save internal variable and return tap numbers
+        self.Vreg = Vreg
+        return self.tap
+
+    def __hysteresis_state(self, Vreg: np.ndarray) -> np.ndarray:
+        """
+        Return the hysteresis state codes for regulating voltages
+        """
+        ov = Vreg > self.Vref + self.db / 2
+        uv = ~ov & (Vreg < self.Vref - self.db / 2)
+        return np.where(ov, 1, np.where(uv, 2, 0))
+
+    def __steps_to_tap(self, Vreg: np.ndarray) -> np.ndarray:
+        """
+        Return the number of run() calls until the next tap change of each regulator, if the regulating voltages stay
+        at Vreg
+        """
+        state = self.__hysteresis_state(Vreg)
+        steps_ctrl = np.where(state == self.state,
+                              np.floor((self.Td_ctrl - self.Ti_ctrl) / self.Ts) + 1,
+                              np.floor(self.Td_ctrl / self.Ts) + 2)
+        steps_tap = np.ceil((self.Td_tap - self.Ti_tap) / self.Ts)
+        steps = np.maximum(np.maximum(steps_ctrl, steps_tap), 1)
+        no_tap = (state == 0) | ((state == 1) & (self.tap <= self.tap_min)) \
+            | ((state == 2) & (self.tap >= self.tap_max))
+        return np.where(no_tap, np.inf, steps)
+
+    def time_to_next_tap(self, Vreg: Union[np.ndarray, List[float]] = None) -> np.ndarray:
+        """
+        Return the time (s) until the next possible tap change of each regulator, if the regulating voltages stay at
+        Vreg, refer to VR_Model.time_to_next_tap()
+
+        :param Vreg: regulating voltages (magnitude on 120V base). Default is the latest regulating voltages
+        """
+        Vreg = self.Vreg if Vreg is None else np.asarray(Vreg, dtype=float)
+        return self.__steps_to_tap(Vreg) * self.Ts
+
+    def advance(self, dt: float, Vreg: Union[np.ndarray, List[float]] = None) -> None:
+        """
+        Advance the timers of all regulators by dt in one shot, refer to VR_Model.advance()
+
+        :param dt: time (s) to advance
+        :param Vreg: regulating voltages (magnitude on 120V base). Default is the latest regulating voltages
+        """
+        Vreg = self.Vreg if Vreg is None else np.asarray(Vreg, dtype=float)
+
+        n = np.round(dt / self.Ts)
+        if (n < 0).any() or (np.abs(n * self.Ts - dt) > 1e-9 * np.maximum(abs(dt), self.Ts)).any():
+            raise ValueError(f'Time {dt} should be a non-negative integer multiple of the time steps')
+        if (n >= self.__steps_to_tap(Vreg)).any():
+            raise ValueError(f'Tap of voltage regulators changes within {dt}s, they cannot be advanced')
+        if dt == 0:
+            return
+
+        state = self.__hysteresis_state(Vreg)
+        self.Ti_ctrl = np.where(state == 0, 0, np.where(state == self.state, self.Ti_ctrl + n * self.Ts,
+                                                        (n - 1) * self.Ts))
+        self.state = state
+        self.Ti_tap = self.Ti_tap + n * self.Ts
+        self.Vreg = Vreg
+
+    def load_vr_objs(self, vr_objs: List[VR_Model]) -> None:
+        """
+        Load the parameters, tap positions and states of VR_Model objects into the bank, in the same order as the
+        bank was created. VR_Model objects may be run or advanced individually between bank calculations, so they are
+        loaded before each one to keep them as the only source of truth.
+
+        :param vr_objs: List of VR_Model objects
+        """
+        self.Ts = np.array([vr.Ts for vr in vr_objs], dtype=float)
+        self.Td_ctrl = np.array([vr.Td_ctrl for vr in vr_objs], dtype=float)
+        self.Td_tap = np.array([vr.Td_tap for vr in vr_objs], dtype=float)
+        self.Vref = np.array([vr.Vref for vr in vr_objs], dtype=float)
+        self.db = np.array([vr.db for vr in vr_objs], dtype=float)
+        self.LDC_R = np.array([vr.LDC_R for vr in vr_objs], dtype=float)
+        self.LDC_X = np.array([vr.LDC_X for vr in vr_objs], dtype=float)
+        self.PT_Ratio = np.array([vr.PT_Ratio for vr in vr_objs], dtype=float)
+        self.CT_Primary = np.array([vr.CT_Primary for vr in vr_objs], dtype=float)
+        self.tap_max = np.array([vr.tap_max for vr in vr_objs], dtype=int)
+        self.tap_min = np.array([vr.tap_min for vr in vr_objs], dtype=int)
+        self.tap = np.array([vr.tap for vr in vr_objs], dtype=int)
+        # internal state variables
+        self.Ti_ctrl = np.array([vr.Ti_ctrl for vr in vr_objs], dtype=float)
+        self.Ti_tap = np.array([vr.Ti_tap for vr in vr_objs], dtype=float)
+        self.state = np.array([self.STATES.index(vr.state) for vr in vr_objs], dtype=int)
+        self.total_sw = np.array([vr.total_sw for vr in vr_objs], dtype=int)
+        self.Vreg = np.array([vr.Vreg for vr in vr_objs], dtype=float)
+
+    def update_vr_objs(self, vr_objs: List[VR_Model]) -> None:
+        """
+        Write the tap positions and states of the bank back into VR_Model objects, in the same order as the bank
+        was created.
+
+        :param vr_objs: List of VR_Model objects
+        """
+        for i, vr in enumerate(vr_objs):
+            vr.tap = int(self.tap[i])
+            vr.Ti_ctrl = float(self.Ti_ctrl[i])
+            vr.Ti_tap = float(self.Ti_tap[i])
+            vr.state = self.STATES[self.state[i]]
+            vr.total_sw = int(self.total_sw[i])
+            vr.Vreg = float(self.Vreg[i])
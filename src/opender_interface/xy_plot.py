@@ -22,12 +22,29 @@ import pandas as pd
 import pickle
 import matplotlib
 import time
-from copy import deepcopy
+from typing import Callable
+from opender_interface.trace_recorder import TraceRecorder
 
 # set plot style
 script_path = pathlib.Path(os.path.dirname(__file__))
 plt.style.use(str(script_path)+'/xyplot.mplstyle')
 
+# Fields of the operating point records, and the functions reading them from an OpenDER object
+POINT_FIELDS = {
+    'p_out_pu': lambda der_obj: der_obj.p_out_pu,
+    'q_out_pu': lambda der_obj: der_obj.q_out_pu,
+    'v_meas_pu': lambda der_obj: der_obj.der_input.v_meas_pu,
+    'freq_hz': lambda der_obj: der_obj.der_input.freq_hz,
+    'p_desired_pu': lambda der_obj: der_obj.p_desired_pu,
+    'q_desired_pu': lambda der_obj: der_obj.q_desired_pu,
+    'CONST_PF_MODE_ENABLE': lambda der_obj: der_obj.exec_delay.const_pf_mode_enable_exec,
+    'QV_MODE_ENABLE': lambda der_obj: der_obj.exec_delay.qv_mode_enable_exec,
+    'QP_MODE_ENABLE': lambda der_obj: der_obj.exec_delay.qp_mode_enable_exec,
+    'CONST_Q_MODE_ENABLE': lambda der_obj: der_obj.exec_delay.const_q_mode_enable_exec,
+    'PV_MODE_ENABLE': lambda der_obj: der_obj.exec_delay.pv_mode_enable_exec,
+    'AP_LIMIT_ENABLE': lambda der_obj: der_obj.exec_delay.ap_limit_enable_exec,
+}
+
 
 class XYPlots:
     """
@@ -39,11 +56,13 @@ class XYPlots:
         - Three phase voltage phasor for unbalanced voltage
     """
 
-    def __init__(self, der_obj, pu=True):
+    def __init__(self, der_obj, pu=True, point_fields: dict = None):
         """
         The plots directly reads the rating and control setting information in the OpenDER object.
 
         :param der_obj: OpenDER object that the figure is based on.
+        :param point_fields: Optional additional fields of the operating point records, as a dictionary of
+                             {field name: function reading the value from an OpenDER object}, refer to POINT_FIELDS
         """
 
         self.der_obj = der_obj
@@ -65,7 +84,11 @@ class XYPlots:
         self.meas_points_dict = []
         self.plot_element = None
 
-        self.plot_points = []
+        # Operating points are recorded as compact records, refer to add_point_to_plot()
+        self.point_fields = dict(POINT_FIELDS)
+        if point_fields is not None:
+            self.point_fields.update(point_fields)
+        self.points = TraceRecorder(1, [list(self.point_fields)])
         self.meas_points = None
         self.fig_vp = None
         self.fig_v3 = None
@@ -85,7 +108,7 @@ class XYPlots:
 
         self.pu = pu
 
-    def save_fig(self, path: str):
+    def save_fig(self, path: str, fmt: str = 'svg', dpi: int = 1200):
         """
         Save prepared figures as svg files in given path. No file extension is needed. For example, if provided with
         'Figure':
@@ -96,17 +119,31 @@ class XYPlots:
             - Three phase phasor pot will be saved as 'Figure_v3.svg'
 
         :param path: Path for the saved figures. No file extension.
+        :param fmt: File format, e.g. 'svg' or 'png'. Default is 'svg'
+        :param dpi: Resolution of the saved figures. Default is 1200
+        :return: List of the saved files
         """
-        if self.fig_pq is not None:
-            self.fig_pq.savefig(path+'_pq.svg', format='svg', dpi=1200)
-        if self.fig_vp is not None:
-            self.fig_vp.savefig(path + '_vp.svg', format='svg', dpi=1200)
-        if self.fig_vq is not None:
-            self.fig_vq.savefig(path + '_vq.svg', format='svg', dpi=1200)
-        if self.fig_v3 is not None:
-            self.fig_v3.savefig(path + '_v3.svg', format='svg', dpi=1200)
-        if self.fig_fp is not None:
-            self.fig_fp.savefig(path + '_fp.svg', format='svg', dpi=1200)
+        files = []
+        for name, fig in self.figures().items():
+            files.append(f'{path}_{name}.{fmt}')
+            fig.savefig(files[-1], format=fmt, dpi=dpi)
+        return files
+
+    def figures(self) -> dict:
+        """
+        Return the prepared figures, as a dictionary of {'pq', 'vp', 'vq', 'v3' or 'fp': figure}
+        """
+        figures = {'pq': self.fig_pq, 'vp': self.fig_vp, 'vq': self.fig_vq, 'v3': self.fig_v3, 'fp': self.fig_fp}
+        return {name: fig for name, fig in figures.items() if fig is not None}
+
+    def close(self) -> None:
+        """
+        Close all prepared figures, releasing them from matplotlib.pyplot
+        """
+        for fig in self.figures().values():
+            plt.close(fig)
+        self.fig_pq = self.fig_vp = self.fig_vq = self.fig_v3 = self.fig_fp = None
+        self.ax_pq = self.ax_vp = self.ax_vq = self.ax_v3 = self.ax_fp = None
 
     def set_title_labels(self, axes: plt.Axes, title: str, xlabel: str, ylabel: str):
         """
@@ -123,28 +160,34 @@ class XYPlots:
 
     def add_point_to_plot(self, der_obj: opender.DER = None) -> None:
         """
-        Save current operating status information of the OpenDER object for future plotting.
+        Save current operating status information of the OpenDER object for future plotting. A compact record of the
+        fields in self.point_fields (output and desired P and Q, voltage, frequency and enabled modes) is added to
+        self.points, rather than a copy of the object.
         :param der_obj: If not provided, the OpenDER object provided in the initialization process will be used.
         """
         if der_obj is None:
             der_obj = self.der_obj
 
-        self.plot_points.append(deepcopy(der_obj))
-
-        '''
-        {
-            'p_out_pu': der_obj.p_out_pu,
-            'q_out_pu': der_obj.q_out_pu,
-            'p_desired_pu': der_obj.p_desired_pu,
-            'q_desired_pu': der_obj.q_desired_pu,
-            'CONST_PF_MODE_ENABLE': der_obj.exec_delay.const_pf_mode_enable_exec,
-            'CONST_PF':der_obj.exec_delay.const_pf_exec,
-            'CONST_PF_EXCITATION': der_obj.exec_delay.const_pf_excitation_exec,
-            'v_meas_pu': der_obj.der_input.v_meas_pu,
-            'freq_hz': der_obj.der_input.freq_hz
-        }
-        
-        '''
+        values = [func(der_obj) for func in self.point_fields.values()]
+        self.points.append([np.nan if value is None else value for value in values])
+
+    def add_point_field(self, name: str, func: Callable) -> None:
+        """
+        Add a field to the operating point records. Points recorded before have NaN in this field.
+
+        :param name: Field name
+        :param func: Function reading the value from an OpenDER object
+        """
+        self.point_fields[name] = func
+        self.points.declare(0, name)
+
+    def point_values(self, name: str) -> np.ndarray:
+        """
+        Return the recorded values of a field of the operating points
+
+        :param name: Field name
+        """
+        return self.points.column(0, name)
 
     def add_measurement_to_plot(self, V: float = None, P: float = None, Q: float = None, F: float = None) -> None:
         """
@@ -184,12 +227,39 @@ class XYPlots:
 
         :param value: active power in pu of nameplate active power rating, considering the difference of charging and discharging
         """
+        if np.ndim(value) > 0:
+            # vectorized for arrays of values
+            value = np.asarray(value, dtype=float)
+            return np.where(value > 0, self.__calc_P(1.0) * value, -self.__calc_P(-1.0) * value)
+
         if self.pu:
             return value * self.der_file.NP_P_MAX / self.der_file.NP_VA_MAX if value > 0 \
                 else value * self.der_file.NP_P_MAX_CHARGE / self.der_file.NP_VA_MAX
         else:
             return value * self.der_file.NP_P_MAX / 1000 if value > 0 else value * self.der_file.NP_P_MAX_CHARGE / 1000
 
+    def __meas_values(self, key: str) -> np.ndarray:
+        """
+        Return the values of measured points as an array, missing values as NaN. self.meas_points is also updated.
+
+        :param key: 'V', 'P', 'Q' or 'F'
+        """
+        if self.meas_points_dict != []:
+            self.meas_points = pd.DataFrame(self.meas_points_dict)
+        else:
+            self.meas_points = pd.DataFrame()
+        if key not in self.meas_points:
+            return np.zeros(0)
+        return self.meas_points[key].to_numpy(dtype=float, na_value=np.nan)
+
+    @staticmethod
+    def __scatter(axes: plt.Axes, x: np.ndarray, y: np.ndarray, **kwargs) -> None:
+        """
+        Draw a series of points in one collection, if there is any point
+        """
+        if len(x) > 0:
+            axes.scatter(x, y, s=90, **kwargs)
+
     def prepare_pq_plot(self):
         """
         Prepare plot with x-axis as P and y-axis as Q. Show apparent power circle, reactive power capability requirement
@@ -199,6 +269,8 @@ class XYPlots:
         """
 
         # Initialize figure
+        if self.fig_pq is not None:
+            plt.close(self.fig_pq)
         self.fig_pq, self.ax_pq = plt.subplots(nrows=1, ncols=1)
         self.ax_pq.set_title("PQ Plane")
         if self.pu:
@@ -243,38 +315,26 @@ class XYPlots:
         self.plot_element.append(self.ax_pq.plot([self.__calc_P(0.2), self.__calc_S(1)], [self.__calc_S(-0.44), self.__calc_S(-0.44)], color='pink'))
         self.plot_element.append(self.ax_pq.plot([self.__calc_P(0.05), self.__calc_P(0.2)], [self.__calc_S(-0.11), self.__calc_S(-0.44)], color='pink'))
 
-        # Draw DER Q capability
-        k=8
+        # Draw DER Q capability, each piecewise linear curve as one line
+        q_capability = self.der_obj.der_file.NP_Q_CAPABILITY_BY_P_CURVE
         # Q injection capability
-        for i in range(len(self.der_obj.der_file.NP_Q_CAPABILITY_BY_P_CURVE['P_Q_INJ_PU']) - 1):
-            k = k + 1
-            self.plot_element.append(self.ax_pq.plot(
-                [self.__calc_S(self.der_obj.der_file.NP_Q_CAPABILITY_BY_P_CURVE['P_Q_INJ_PU'][i]),
-                 self.__calc_S(self.der_obj.der_file.NP_Q_CAPABILITY_BY_P_CURVE['P_Q_INJ_PU'][i + 1])],
-                [self.__calc_S(self.der_obj.der_file.NP_Q_CAPABILITY_BY_P_CURVE['Q_MAX_INJ_PU'][i]),
-                 self.__calc_S(self.der_obj.der_file.NP_Q_CAPABILITY_BY_P_CURVE['Q_MAX_INJ_PU'][i + 1])], color='black'))
+        self.plot_element.append(self.ax_pq.plot(
+            self.__calc_S(np.asarray(q_capability['P_Q_INJ_PU'], dtype=float)),
+            self.__calc_S(np.asarray(q_capability['Q_MAX_INJ_PU'], dtype=float)), color='black'))
 
         # Q absorption capability
-        for i in range(len(self.der_obj.der_file.NP_Q_CAPABILITY_BY_P_CURVE['P_Q_ABS_PU']) - 1):
-            k = k + 1
-            self.plot_element.append(self.ax_pq.plot(
-                [self.__calc_S(self.der_obj.der_file.NP_Q_CAPABILITY_BY_P_CURVE['P_Q_ABS_PU'][i]),
-                 self.__calc_S(self.der_obj.der_file.NP_Q_CAPABILITY_BY_P_CURVE['P_Q_ABS_PU'][i + 1])],
-                [self.__calc_S(-self.der_obj.der_file.NP_Q_CAPABILITY_BY_P_CURVE['Q_MAX_ABS_PU'][i]),
-                 self.__calc_S(-self.der_obj.der_file.NP_Q_CAPABILITY_BY_P_CURVE['Q_MAX_ABS_PU'][i + 1])], color='blue'))
-
-        k=k+2
+        self.plot_element.append(self.ax_pq.plot(
+            self.__calc_S(np.asarray(q_capability['P_Q_ABS_PU'], dtype=float)),
+            self.__calc_S(-np.asarray(q_capability['Q_MAX_ABS_PU'], dtype=float)), color='blue'))
+
         self.plot_element.append(self.ax_pq.plot([0, 0], [0, 0], color='black', label="Q Inj Max"))
         self.plot_element.append(self.ax_pq.plot([0, 0], [0, 0], color='blue', label="Q Abs Max"))
 
         # Draw DER operation status (P and Q)
-        self.meas_points = pd.DataFrame(self.meas_points_dict)
-
-        for der_obj in self.plot_points:
-            self.ax_pq.scatter(self.__calc_S(der_obj.p_out_pu),self.__calc_S(der_obj.q_out_pu), s=90, marker='^', color='blue')
-        for i, point in self.meas_points.iterrows():
-            self.ax_pq.scatter(self.__calc_S(self.meas_points['P'].values[i]), self.__calc_S(self.meas_points['Q'].values[i]),
-                               marker='v', s=90, color='orange')
+        self.__scatter(self.ax_pq, self.__calc_S(self.point_values('p_out_pu')),
+                       self.__calc_S(self.point_values('q_out_pu')), marker='^', color='blue')
+        self.__scatter(self.ax_pq, self.__calc_S(self.__meas_values('P')), self.__calc_S(self.__meas_values('Q')),
+                       marker='v', color='orange')
 
         # Draw constant power factor line
         if self.der_obj.der_file.CONST_PF_MODE_ENABLE:
@@ -336,6 +396,8 @@ class XYPlots:
         """
         Prepare plot with x-axis as V and y-axis as Q. Volt-var curve is also plotted based on modeled OpenDER setting
         """
+        if self.fig_vq is not None:
+            plt.close(self.fig_vq)
         self.fig_vq, self.ax_vq = plt.subplots(nrows=1, ncols=1)
         v_curve = np.array([0.85, self.der_file.QV_CURVE_V1, self.der_file.QV_CURVE_V2, self.der_file.QV_CURVE_V3,
                             self.der_file.QV_CURVE_V4, 1.15])
@@ -343,20 +405,13 @@ class XYPlots:
             [self.der_file.QV_CURVE_Q1, self.der_file.QV_CURVE_Q1, self.der_file.QV_CURVE_Q2, self.der_file.QV_CURVE_Q3,
              self.der_file.QV_CURVE_Q4, self.der_file.QV_CURVE_Q4])
 
-        q_curve = [self.__calc_S(q) for q in q_curve]
+        q_curve = self.__calc_S(q_curve)
         self.ax_vq.plot(v_curve, q_curve, color='red', label='Volt-Var Curve')
 
-        for der_obj in self.plot_points:
-            self.ax_vq.scatter(der_obj.der_input.v_meas_pu, self.__calc_S(der_obj.q_out_pu), marker='^', s=90, color='blue')
-
-        if self.meas_points_dict != []:
-            self.meas_points = pd.DataFrame(self.meas_points_dict)
-        else:
-            self.meas_points = pd.DataFrame()
-
-        for i, point in self.meas_points.iterrows():
-            self.ax_vq.scatter(self.meas_points['V'].values[i], self.__calc_S(self.meas_points['Q'].values[i]),
-                               marker='v', s=90, color='orange')
+        self.__scatter(self.ax_vq, self.point_values('v_meas_pu'), self.__calc_S(self.point_values('q_out_pu')),
+                       marker='^', color='blue')
+        self.__scatter(self.ax_vq, self.__meas_values('V'), self.__calc_S(self.__meas_values('Q')),
+                       marker='v', color='orange')
 
         if self.pu:
             self.set_title_labels(self.ax_vq, 'Volt-var', "Voltage (pu)", "Reactive Power (pu)")
@@ -369,6 +424,8 @@ class XYPlots:
         """
         Prepare plot with x-axis as V and y-axis as P. Volt-watt curve is also plotted based on modeled OpenDER setting
         """
+        if self.fig_vp is not None:
+            plt.close(self.fig_vp)
         self.fig_vp, self.ax_vp = plt.subplots(nrows=1, ncols=1)
 
         v_curve = np.array([0.98, self.der_file.PV_CURVE_V1, self.der_file.PV_CURVE_V2, 1.12])
@@ -380,16 +437,10 @@ class XYPlots:
              self.__calc_P(self.der_file.PV_CURVE_P2)])
         self.ax_vp.plot(v_curve, p_curve, color='red', label='Volt-Watt Curve')
 
-        if self.meas_points_dict != []:
-            self.meas_points = pd.DataFrame(self.meas_points_dict)
-        else:
-            self.meas_points = pd.DataFrame()
-
-        for der_obj in self.plot_points:
-            self.ax_vp.scatter(der_obj.der_input.v_meas_pu, self.__calc_S(der_obj.p_out_pu), marker='^', s=90, color='blue')
-        for i, point in self.meas_points.iterrows():
-            self.ax_vp.scatter(self.meas_points['V'].values[i], self.__calc_S(self.meas_points['P'].values[i]),
-                               marker='v', s=90, color='orange')
+        self.__scatter(self.ax_vp, self.point_values('v_meas_pu'), self.__calc_S(self.point_values('p_out_pu')),
+                       marker='^', color='blue')
+        self.__scatter(self.ax_vp, self.__meas_values('V'), self.__calc_S(self.__meas_values('P')),
+                       marker='v', color='orange')
 
         if self.der_obj.der_file.AP_LIMIT_ENABLE:
             p = self.__calc_P(self.der_obj.der_file.AP_LIMIT)
@@ -417,6 +468,8 @@ class XYPlots:
         :param l2l: Print line-to-line voltage phasors
         :param v_vector: Print arbitrary phasor coordinates. If not provided, the OpenDER object's RPA voltage is used
         """
+        if self.fig_v3 is not None:
+            plt.close(self.fig_v3)
         self.fig_v3, self.ax_v3 = plt.subplots(nrows=1, ncols=1)
 
         # Calculate coordinates with
@@ -478,6 +531,8 @@ class XYPlots:
         :param p_avl_list: List of available active power P_avl values for plotting frequency-droop curve
         """
 
+        if self.fig_fp is not None:
+            plt.close(self.fig_fp)
         self.fig_fp, self.ax_fp = plt.subplots(nrows=1, ncols=1)
 
         colors = ['red', 'blue', 'purple', 'orange']
@@ -515,7 +570,7 @@ class XYPlots:
 
             f_curve = [f1, f2, 60-self.der_file.PF_DBUF, 60, 60+self.der_file.PF_DBOF, f3, f4]
 
-            p_curve = [self.__calc_S(p) for p in[p1, p2, p_pre, p_pre, p_pre, p3, p4]]
+            p_curve = self.__calc_S(np.array([p1, p2, p_pre, p_pre, p_pre, p3, p4]))
 
             self.ax_fp.plot(f_curve, p_curve)
 
@@ -526,18 +581,12 @@ class XYPlots:
         self.ax_fp.plot([self.der_file.OF1_TRIP_F, self.der_file.OF1_TRIP_F], [self.__calc_S(-1.1), self.__calc_S(1.1)], color='gray', linestyle='-.')
 
         # Plot OpenDER outputs
-        for der_obj in self.plot_points:
-            self.ax_fp.scatter(der_obj.der_input.freq_hz, self.__calc_S(der_obj.p_out_pu), marker='^', s=90, color='blue')
+        self.__scatter(self.ax_fp, self.point_values('freq_hz'), self.__calc_S(self.point_values('p_out_pu')),
+                       marker='^', color='blue')
 
         # Plot measured points
-        if self.meas_points_dict != []:
-            self.meas_points = pd.DataFrame(self.meas_points_dict)
-        else:
-            self.meas_points = pd.DataFrame()
-
-        for i, point in self.meas_points.iterrows():
-            self.ax_fp.scatter(self.meas_points['F'].values[i], self.__calc_S(self.meas_points['P'].values[i]),
-                               marker='v', s=90, color='orange')
+        self.__scatter(self.ax_fp, self.__meas_values('F'), self.__calc_S(self.__meas_values('P')),
+                       marker='v', color='orange')
 
         self.ax_fp.legend(loc=1)
         # self.ax_fp.set_ylim(0, 1.05)
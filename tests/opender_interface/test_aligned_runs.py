@@ -0,0 +1,82 @@
+"""
+Copyright © 2023 Electric Power Research Institute, Inc. All rights reserved.
+
+Redistribution and use in source and binary forms, with or without modification,
+are permitted provided that the following conditions are met:
+· Redistributions of source code must retain the above copyright notice,
+  this list of conditions and the following disclaimer.
+· Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+· Neither the name of the EPRI nor the names of its contributors may be used
+  to endorse or promote products derived from this software without specific
+  prior written permission.
+"""
+
+import pytest
+import numpy as np
+import opender.der
+from opender_interface import TimePlots, CombinedTimePlots, TraceStore, AlignedRuns
+
+
+def create_tplot(n, k):
+    tplot = TimePlots(2, 1)
+    for i in range(n):
+        tplot.add_to_traces({'A': i * k, 'B': -i}, {'c': i + k})
+    return tplot
+
+
+class TestAlignedRuns:
+    @pytest.mark.parametrize("method", ['linear', 'hold'])
+    def test_align(self, tmp_path, monkeypatch, method):
+        # Runs with different lengths and time steps
+        monkeypatch.setattr(opender.der.DER, 't_s', 1)
+        tplot_1 = create_tplot(100, 1)
+        tplot_2 = create_tplot(10, 2)
+        store = TraceStore.create(tmp_path.joinpath('store'), [['A'], ['c']], t_s=0.5)
+        for i in range(11):
+            store.append([i], [i * 10], t=i * 0.5)
+        datapath = tmp_path.joinpath('run.npz')
+        create_tplot(10, 3).save_data(datapath, run_id='file')
+
+        runs = AlignedRuns([tplot_1, tplot_2, store, datapath], 2, run_t_s=[0.1, 1, None, None], method=method,
+                           trace_names=[['A'], ['c']])
+        assert runs.t_s == 0.1
+        assert len(runs) == 100
+        assert runs.channels == [['A (run0)', 'A (run1)', 'A (run2)', 'A (file)'],
+                                 ['c (run0)', 'c (run1)', 'c (run2)', 'c (file)']]
+
+        # Same time step, no resampling
+        assert list(runs.column(0, 'A (run0)')) == list(range(100))
+        # Resampled, NaN outside of the run
+        a = runs.column(0, 'A (run2)')
+        assert np.isnan(a[51:]).all()
+        if method == 'linear':
+            assert np.allclose(a[:51], np.arange(51) / 5)
+        else:
+            assert np.allclose(a[:51], np.floor(np.arange(51) / 5 + 1e-9))
+        assert runs.column(0, 'A (run1)')[30] == 6
+        assert runs.column(1, 'c (file)')[90] == 12
+
+        with pytest.raises(ValueError):
+            runs.column(0, 'B (run0)')
+
+    def test_combine_runs(self, tmp_path):
+        file_list = []
+        for k in range(20):
+            datapath = tmp_path.joinpath(f'run{k}.npz')
+            create_tplot(100 + k * 10, k).save_data(datapath, run_id=f'run{k}')
+            file_list.append(datapath)
+
+        tplot = CombinedTimePlots(2, 1)
+        tplot.combine_runs(file_list)
+        assert len(tplot.recorder) == 290
+        tplot.prepare(max_points=100)
+        assert len(tplot.axes[0].lines) == 40
+        assert tplot.traces[1].shape == (290, 20)
+
+        t_s = tplot.recorder.t_s
+        tplot.combine_runs(file_list, t_start=10 * t_s, t_end=50 * t_s, trace_names=[['A'], []])
+        assert tplot.traces[0].shape == (41, 20) and tplot.traces[1].shape == (41, 0)
+        tplot.close()
+        assert list(tplot.traces[0]['A (run3)']) == [i * 3 for i in range(10, 51)]
@@ -0,0 +1,41 @@
+"""
+Copyright © 2023 Electric Power Research Institute, Inc. All rights reserved.
+
+Redistribution and use in source and binary forms, with or without modification,
+are permitted provided that the following conditions are met:
+· Redistributions of source code must retain the above copyright notice,
+  this list of conditions and the following disclaimer.
+· Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+· Neither the name of the EPRI nor the names of its contributors may be used
+  to endorse or promote products derived from this software without specific
+  prior written permission.
+"""
+
+import pytest
+import pathlib
+import os
+import sys
+import json
+
+sys.path.insert(0, str(pathlib.Path(os.path.dirname(__file__)).parents[1].joinpath('benchmarks')))
+import run_benchmarks
+
+
+class TestBenchmarks:
+    def test_run_benchmarks(self, tmp_path):
+        output = str(tmp_path.joinpath('results.json'))
+        run_benchmarks.main(['--benchmarks', 'initialize', 'read_der_voltage', 'VR_Model.run', '--cases', 'test_circuit',
+                             '--synthetic-sizes', '--repeat', '2', '--min-time', '0.001', '--output', output])
+
+        with open(output) as f:
+            results = json.load(f)
+        assert [(result['benchmark'], result['case']) for result in results['results']] == [
+            ('initialize', 'test_circuit'), ('read_der_voltage', 'test_circuit'), ('VR_Model.run', None)]
+        assert all(len(result['times']) == 2 and result['median'] > 0 for result in results['results'])
+        assert results['environment']['versions']['opender'] is not None
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            run_benchmarks.run_benchmarks(['solve'], synthetic_sizes=[])
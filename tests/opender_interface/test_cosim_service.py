@@ -0,0 +1,121 @@
+"""
+Copyright © 2023 Electric Power Research Institute, Inc. All rights reserved.
+
+Redistribution and use in source and binary forms, with or without modification,
+are permitted provided that the following conditions are met:
+· Redistributions of source code must retain the above copyright notice,
+  this list of conditions and the following disclaimer.
+· Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+· Neither the name of the EPRI nor the names of its contributors may be used
+  to endorse or promote products derived from this software without specific
+  prior written permission.
+"""
+
+import asyncio
+import json
+import pathlib
+import os
+from opender import DERCommonFileFormat
+from opender_interface import DERInterface, OpenDSSInterface, CoSimService, LocalFederate, StreamFederate
+
+
+def create_ckt_int():
+    script_path = pathlib.Path(os.path.dirname(__file__))
+    dss_file = script_path.joinpath("test_circuit.dss")
+
+    ckt = OpenDSSInterface(str(dss_file))
+    ckt_int = DERInterface(ckt, t_s=1, print_der=False)
+    ckt_int.cmd('New generator.PV1 Bus1=der.1.2.3 Phases=3, kV=12.47 kw=5000 kVA=5000 ')
+    ckt_int.initialize(DER_sim_type='generator')
+    der_file = DERCommonFileFormat(NP_VA_MAX=4000000,
+                                   NP_P_MAX=4000000,
+                                   NP_Q_MAX_INJ=1760000,
+                                   NP_Q_MAX_ABS=1760000)
+    ckt_int.create_opender_objs(p_pu=0.5, der_files=der_file)
+    ckt_int.der_convergence_process()
+    return ckt_int
+
+
+class TestCoSimService:
+    def test_local_federate(self):
+        ckt_int = create_ckt_int()
+
+        async def external_federate(federate, observations):
+            for t in range(5):
+                await federate.send({'time': t, 'p_pu': {'PV1': 0.9}})
+            await federate.close()
+            for t in range(5):
+                observations.append(await federate.receive())
+
+        async def main():
+            federate = LocalFederate(maxsize=2, batch_size=3)
+            service = CoSimService(ckt_int, federate)
+            observations = []
+            steps, _ = await asyncio.gather(service.run(), external_federate(federate, observations))
+            return steps, observations
+
+        steps, observations = asyncio.run(main())
+
+        assert steps == 5
+        assert [obs['time'] for obs in observations] == [0, 1, 2, 3, 4]
+        assert abs(observations[-1]['der']['pv1']['p_kw'] - 3600) < 1
+
+    def test_run_again(self):
+        ckt_int = create_ckt_int()
+
+        async def external_federate(federate, t_start):
+            for t in range(t_start, t_start + 3):
+                await federate.send({'time': t, 'p_pu': {'PV1': 0.9}})
+            await federate.close()
+            return [await federate.receive() for _ in range(3)]
+
+        async def main():
+            service = CoSimService(ckt_int, LocalFederate())
+            runs = []
+            for t_start in [0, 3]:
+                # continue the simulation with a new federate
+                service.federate = LocalFederate()
+                runs.append(await asyncio.gather(service.run(), external_federate(service.federate, t_start)))
+            return runs
+
+        runs = asyncio.run(main())
+        assert [steps for steps, _ in runs] == [3, 6]
+        assert [obs['time'] for obs in runs[1][1]] == [3, 4, 5]
+
+    def test_batched_messages(self):
+        merged = CoSimService.group_messages([{'time': 1, 'p_pu': {'PV1': 0.2}},
+                                              {'time': 0, 'p_pu': {'PV1': 0.1}, 'v_source_pu': 1.02},
+                                              {'time': 1, 'p_pu': {'PV1': 0.3}}])
+        assert merged == [(0, {'p_pu': {'PV1': 0.1}, 'v_source_pu': 1.02}),
+                          (1, {'p_pu': {'PV1': 0.3}})]
+
+    def test_stream_federate(self):
+        ckt_int = create_ckt_int()
+
+        async def main():
+            done = asyncio.Event()
+            steps = []
+
+            async def handle(reader, writer):
+                steps.append(await CoSimService(ckt_int, StreamFederate(reader, writer)).run())
+                writer.close()
+                done.set()
+
+            server = await asyncio.start_server(handle, '127.0.0.1', 0)
+            port = server.sockets[0].getsockname()[1]
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.write((json.dumps([{'time': 0, 'p_pu': {'PV1': 1}}, {'time': 1}]) + '\n').encode())
+            writer.write(b'null\n')
+            await writer.drain()
+            observations = [json.loads(await reader.readline()) for _ in range(2)]
+            await done.wait()
+            writer.close()
+            server.close()
+            return steps[0], observations
+
+        steps, observations = asyncio.run(main())
+        assert steps == 2
+        assert observations[1]['time'] == 1
+        assert 'pv1' in observations[1]['der']
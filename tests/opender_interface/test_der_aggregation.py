@@ -0,0 +1,87 @@
+"""
+Copyright © 2023 Electric Power Research Institute, Inc. All rights reserved.
+
+Redistribution and use in source and binary forms, with or without modification,
+are permitted provided that the following conditions are met:
+· Redistributions of source code must retain the above copyright notice,
+  this list of conditions and the following disclaimer.
+· Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+· Neither the name of the EPRI nor the names of its contributors may be used
+  to endorse or promote products derived from this software without specific
+  prior written permission.
+"""
+
+import pytest
+import pathlib
+import os
+from opender import DERCommonFileFormat
+from opender_interface import DERInterface, OpenDSSInterface
+
+
+def run_ckt(aggregate, DER_sim_type):
+    script_path = pathlib.Path(os.path.dirname(__file__))
+    dss_file = script_path.joinpath("test_circuit.dss")
+
+    ckt = OpenDSSInterface(str(dss_file))
+    ckt_int = DERInterface(ckt, print_der=False)
+    for i in range(4):
+        if DER_sim_type == 'generator':
+            ckt_int.cmd(f'New generator.PV{i} Bus1=der.1.2.3 Phases=3, kV=12.47 kw=1000 kVA=1000')
+        else:
+            ckt_int.cmd(f'New PVSystem.PV{i} Bus1=der.1.2.3 Phases=3, kV=12.47 Pmpp=1000 kVA=1000 irradiance=1 '
+                        f'pf=1 vminpu=0.1 %cutin=0.00001, %cutout=0.0000001')
+    ckt_int.initialize(DER_sim_type=DER_sim_type)
+
+    der_file = DERCommonFileFormat(NP_VA_MAX=1000000,
+                                   NP_P_MAX=1000000,
+                                   NP_Q_MAX_INJ=440000,
+                                   NP_Q_MAX_ABS=440000,
+                                   QV_MODE_ENABLE=True)
+    ckt_int.create_opender_objs(p_pu=0.9, der_files=der_file, aggregate=aggregate)
+    ckt_int.der_convergence_process()
+    return ckt_int
+
+
+class TestDERAggregation:
+    @pytest.mark.parametrize("DER_sim_type", ['generator', 'pvsystem'])
+    def test_der_aggregation(self, DER_sim_type):
+        detailed = run_ckt(False, DER_sim_type)
+        aggregated = run_ckt(True, DER_sim_type)
+
+        assert len(detailed.der_objs) == 4
+        assert len(aggregated.der_objs) == 1
+        assert aggregated.aggregation_factor == 4
+        assert aggregated.der_groups == {'pv0': ['pv0', 'pv1', 'pv2', 'pv3']}
+
+        # Equivalent unit produces the same circuit solution as the individual DERs
+        flow_detailed = detailed.read_line_flow()['flowS_A'].loc['line1']
+        flow_aggregated = aggregated.read_line_flow()['flowS_A'].loc['line1']
+        assert abs(flow_detailed - flow_aggregated) < 1
+
+        outputs = aggregated.disaggregate_der_outputs()
+        assert list(outputs.index) == ['pv0', 'pv1', 'pv2', 'pv3']
+        for der_obj in detailed.der_objs:
+            assert abs(outputs.loc[der_obj.name, 'p_out_kw'] - der_obj.p_out_kw) < 0.1
+            assert abs(outputs.loc[der_obj.name, 'q_out_kvar'] - der_obj.q_out_kvar) < 0.1
+
+    def test_unsupported(self):
+        # isources cannot be disabled, the circuit and OpenDER objects are left unchanged
+        script_path = pathlib.Path(os.path.dirname(__file__))
+        ckt = OpenDSSInterface(str(script_path.joinpath("test_circuit.dss")))
+        ckt_int = DERInterface(ckt, print_der=False)
+        for i in range(2):
+            ckt_int.cmd([f'New isource.PV{i}_a Bus1=der.1 Phases=1',
+                         f'New isource.PV{i}_b Bus1=der.2 Phases=1',
+                         f'New isource.PV{i}_c Bus1=der.3 Phases=1'])
+        ckt_int.initialize(DER_sim_type='isource')
+        der_file = DERCommonFileFormat(NP_VA_MAX=1000000, NP_P_MAX=1000000, NP_Q_MAX_INJ=440000, NP_Q_MAX_ABS=440000)
+
+        with pytest.raises(ValueError):
+            ckt_int.create_opender_objs(p_pu=0.9, der_files=der_file, aggregate=True)
+        assert ckt_int.der_objs == [] and ckt_int.der_groups == {}
+        assert ckt.disabled_ders == []
+
+        # detailed DERs can still be created
+        assert len(ckt_int.create_opender_objs(p_pu=0.9, der_files=der_file)) == 2
@@ -0,0 +1,48 @@
+"""
+Copyright © 2023 Electric Power Research Institute, Inc. All rights reserved.
+
+Redistribution and use in source and binary forms, with or without modification,
+are permitted provided that the following conditions are met:
+· Redistributions of source code must retain the above copyright notice,
+  this list of conditions and the following disclaimer.
+· Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+· Neither the name of the EPRI nor the names of its contributors may be used
+  to endorse or promote products derived from this software without specific
+  prior written permission.
+"""
+
+import pytest
+import numpy as np
+from opender import DER, DERCommonFileFormat, DERCommonFileFormatBESS
+from opender_interface import DERFleet
+
+
+settings = [
+    {},
+    {'CONST_PF_MODE_ENABLE': True, 'CONST_PF': 0.9, 'CONST_PF_EXCITATION': 'ABS'},
+    {'QV_MODE_ENABLE': True},
+    {'QP_MODE_ENABLE': True},
+    {'QV_MODE_ENABLE': True, 'PV_MODE_ENABLE': True, 'AP_LIMIT_ENABLE': True, 'AP_LIMIT': 0.7},
+]
+
+
+class TestDERFleet:
+    @pytest.mark.parametrize("setting", settings)
+    def test_der_fleet_validation(self, setting, monkeypatch):
+        monkeypatch.setattr(DER, 't_s', 0.1)
+        rng = np.random.default_rng(0)
+        fleet = DERFleet(DERCommonFileFormat(**setting), 10, validate=True)
+
+        for i in range(60):
+            v_pu = np.clip(1 + 0.05 * rng.standard_normal((10, 3)), 0.92, 1.09)
+            fleet.step(v_pu, rng.uniform(0, 1.1, 10))
+
+        assert fleet.max_deviation['p_out_pu'] < 1e-9
+        assert fleet.max_deviation['q_out_pu'] < 1e-9
+        assert fleet.p_out_kw.shape == (10,)
+
+    def test_der_fleet_unsupported(self):
+        with pytest.raises(ValueError):
+            DERFleet(DERCommonFileFormatBESS(), 2)
@@ -0,0 +1,57 @@
+"""
+Copyright © 2023 Electric Power Research Institute, Inc. All rights reserved.
+
+Redistribution and use in source and binary forms, with or without modification,
+are permitted provided that the following conditions are met:
+· Redistributions of source code must retain the above copyright notice,
+  this list of conditions and the following disclaimer.
+· Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+· Neither the name of the EPRI nor the names of its contributors may be used
+  to endorse or promote products derived from this software without specific
+  prior written permission.
+"""
+
+import pytest
+import numpy as np
+from opender_interface import TimePlots, TraceRecorder
+from opender_interface.downsample import downsample
+
+
+class TestDownsample:
+    @pytest.mark.parametrize("method", ['minmax', 'lttb'])
+    @pytest.mark.parametrize("n", [10, 1001, 100000])
+    def test_downsample(self, method, n):
+        rng = np.random.default_rng(0)
+        x = np.arange(n) * 0.1
+        y = np.sin(x) + rng.normal(0, 0.1, n)
+        y[n // 3] = 5
+        y[n // 2] = np.nan
+
+        xd, yd = downsample(x, y, 100, method)
+        assert len(xd) == len(yd) <= 100 if n > 100 else len(xd) == n
+        assert np.all(np.diff(xd) > 0)
+        assert xd[0] == x[0] and xd[-1] == x[-1]
+        # downsampled points are original samples, and the peak is kept
+        assert np.all(np.isin(xd, x))
+        assert np.nanmax(yd) == 5
+
+    def test_minmax_envelope(self):
+        rng = np.random.default_rng(1)
+        y = rng.normal(0, 1, 100000)
+        xd, yd = downsample(np.arange(len(y)), y, 1000, 'minmax')
+        assert yd.min() == y.min() and yd.max() == y.max()
+        with pytest.raises(ValueError):
+            downsample(xd, yd, 10, 'mean')
+
+    @pytest.mark.parametrize("method", ['minmax', 'lttb'])
+    def test_time_plots(self, method):
+        recorder = TraceRecorder(1, [['A']], capacity=100000)
+        for i in range(100000):
+            recorder.append([i % 1000])
+        tplot = TimePlots(1, 1, recorder=recorder)
+        tplot.prepare(max_points=2000, method=method)
+        assert len(tplot.axes[0].lines[0].get_xdata()) <= 2000
+        assert tplot.axes[0].lines[0].get_ydata().max() == 999
+        tplot.close()
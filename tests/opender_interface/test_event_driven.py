@@ -0,0 +1,77 @@
+"""
+Copyright © 2023 Electric Power Research Institute, Inc. All rights reserved.
+
+Redistribution and use in source and binary forms, with or without modification,
+are permitted provided that the following conditions are met:
+· Redistributions of source code must retain the above copyright notice,
+  this list of conditions and the following disclaimer.
+· Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+· Neither the name of the EPRI nor the names of its contributors may be used
+  to endorse or promote products derived from this software without specific
+  prior written permission.
+"""
+
+import pytest
+import pathlib
+import os
+from opender import DERCommonFileFormat
+from opender_interface import DERInterface, OpenDSSInterface
+
+
+def simulate(event_driven, **settings):
+    script_path = pathlib.Path(os.path.dirname(__file__))
+    dss_file = script_path.joinpath("test_circuit.dss")
+
+    ckt = OpenDSSInterface(str(dss_file))
+    ckt_int = DERInterface(ckt, t_s=0.1, print_der=False)
+    for i in range(3):
+        ckt_int.cmd(f'New generator.PV{i} Bus1=der.1.2.3 Phases=3, kV=12.47 kw=1000 kVA=1000')
+    ckt_int.initialize(DER_sim_type='generator')
+    ckt_int.create_vr_objs()
+
+    der_file = DERCommonFileFormat(NP_VA_MAX=1000000,
+                                   NP_P_MAX=1000000,
+                                   NP_Q_MAX_INJ=440000,
+                                   NP_Q_MAX_ABS=440000,
+                                   QV_MODE_ENABLE=True,
+                                   QV_OLRT=2,
+                                   **settings)
+    ckt_int.create_opender_objs(p_pu=0.5, der_files=der_file)
+    ckt_int.der_convergence_process()
+    if event_driven is not None:
+        ckt_int.enable_event_driven(**event_driven)
+
+    results = []
+    for step in range(150):
+        if step == 80:
+            ckt_int.update_der_p_pu([0.9, 0.5, 0.5])
+        ckt_int.run()
+        ckt_int.update_der_output_powers()
+        ckt_int.write_vr()
+        ckt_int.solve_power_flow()
+        results.append([(der.p_out_kw, der.q_out_kvar, der.time) for der in ckt_int.der_objs])
+    return ckt_int, results
+
+
+class TestEventDriven:
+    # Without the slow filter of the volt-var reference voltage, DER states settle exactly, so that exact
+    # event-driven stepping can skip them. With it, a state tolerance is needed.
+    @pytest.mark.parametrize("event_driven, settings", [({}, {'QV_VREF_TIME': 0}),
+                                                        ({'state_tolerance': 1e-9}, {})])
+    def test_event_driven(self, event_driven, settings):
+        _, reference = simulate(None, **settings)
+        ckt_int, results = simulate(event_driven, **settings)
+
+        assert ckt_int.skip_ratio > 0.3
+        if not event_driven:
+            # Exact skipping keeps the results identical
+            assert results == reference
+        else:
+            for step, step_ref in zip(results, reference):
+                for (p, q, t), (p_ref, q_ref, t_ref) in zip(step, step_ref):
+                    assert abs(p - p_ref) < 0.001 and abs(q - q_ref) < 0.001 and abs(t - t_ref) < 1e-9
+
+            # DER woken up by the change of available power
+            assert abs(results[-1][0][0] - 900) < 1
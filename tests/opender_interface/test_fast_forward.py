@@ -0,0 +1,153 @@
+"""
+Copyright © 2023 Electric Power Research Institute, Inc. All rights reserved.
+
+Redistribution and use in source and binary forms, with or without modification,
+are permitted provided that the following conditions are met:
+· Redistributions of source code must retain the above copyright notice,
+  this list of conditions and the following disclaimer.
+· Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+· Neither the name of the EPRI nor the names of its contributors may be used
+  to endorse or promote products derived from this software without specific
+  prior written permission.
+"""
+
+import pytest
+import pathlib
+import os
+from opender import DERCommonFileFormat
+from opender_interface import DERInterface, OpenDSSInterface, FastForwardDriver, TimePlots
+
+
+def create_ckt_int(QV_MODE_ENABLE, t_s=1, vrs=True):
+    script_path = pathlib.Path(os.path.dirname(__file__))
+    dss_file = script_path.joinpath("test_circuit.dss")
+
+    ckt = OpenDSSInterface(str(dss_file))
+    ckt_int = DERInterface(ckt, t_s=t_s, print_der=False)
+    ckt_int.cmd('New generator.PV1 Bus1=der.1.2.3 Phases=3, kV=12.47 kw=5000 kVA=5000 ')
+    ckt_int.initialize(DER_sim_type='generator')
+    if vrs:
+        ckt_int.create_vr_objs()
+    der_file = DERCommonFileFormat(NP_VA_MAX=4000000,
+                                   NP_P_MAX=4000000,
+                                   NP_Q_MAX_INJ=1760000,
+                                   NP_Q_MAX_ABS=1760000,
+                                   QV_MODE_ENABLE=QV_MODE_ENABLE,
+                                   ES_DELAY=60,
+                                   ES_RAMP_RATE=60,
+                                   ES_RANDOMIZED_DELAY=0)
+    ckt_int.create_opender_objs(p_pu=1, der_files=der_file)
+    ckt_int.cmd('New Fault.F1 Phases=3 Bus1=der R=1000000')
+
+    ckt_int.enable_control()
+    ckt_int.der_convergence_process()
+    if vrs:
+        ckt_int.read_vr()
+        ckt_int.update_vr_tap()
+    ckt_int.disable_control()
+    return ckt_int
+
+
+def record(ckt_int):
+    vrs = {'tap': ckt_int.vr_objs[0].tap, 'Vreg': ckt_int.vr_objs[0].Vreg} if ckt_int.vr_objs else {}
+    return {'p': ckt_int.der_objs[0].p_out_kw, 'q': ckt_int.der_objs[0].q_out_kvar}, vrs
+
+
+class TestFastForwardDriver:
+    @pytest.mark.parametrize("QV_MODE_ENABLE", [False, True])
+    def test_fast_forward(self, QV_MODE_ENABLE):
+        # Reference simulation solving the circuit in every time step
+        ckt_int = create_ckt_int(QV_MODE_ENABLE)
+        reference = []
+        for t in range(400):
+            if 10 <= t < 15:
+                ckt_int.cmd('Edit Fault.F1 R=0.01')
+            else:
+                ckt_int.cmd('Edit Fault.F1 R=1000000')
+            ckt_int.run()
+            ckt_int.update_der_output_powers()
+            ckt_int.write_vr()
+            ckt_int.solve_power_flow()
+            reference.append(record(ckt_int))
+
+        ckt_int = create_ckt_int(QV_MODE_ENABLE)
+        driver = FastForwardDriver(ckt_int)
+        driver.add_event(10, lambda d: d.der_interface.cmd('Edit Fault.F1 R=0.01'))
+        driver.add_event(15, lambda d: d.der_interface.cmd('Edit Fault.F1 R=1000000'))
+        plot_obj = TimePlots(2, 1)
+        driver.run(400, plot_obj, lambda d: record(d.der_interface))
+
+        assert driver.steps == 400
+        assert driver.solves < 200
+        assert list(zip(*[plot_obj.recorder.records(i) for i in range(2)])) == reference
+
+        # Tripped during the fault, then entered service again
+        assert reference[20][0]['p'] == 0
+        assert abs(reference[-1][0]['p'] - 4000) < 1
+
+    def test_jump(self):
+        ckt_int = create_ckt_int(False)
+        reference = []
+        for t in range(400):
+            ckt_int.run()
+            ckt_int.update_der_output_powers()
+            ckt_int.write_vr()
+            ckt_int.solve_power_flow()
+            reference.append(record(ckt_int))
+        der_time = ckt_int.der_objs[0].time
+
+        ckt_int = create_ckt_int(False)
+        driver = FastForwardDriver(ckt_int, state_tolerance=1e-9)
+        plot_obj = TimePlots(2, 1)
+        driver.run(400, plot_obj, lambda d: record(d.der_interface))
+
+        assert driver.steps == 400
+        assert driver.jumped_steps > 300
+        assert ckt_int.der_objs[0].time == der_time
+        for (der, vr), (der_ref, vr_ref) in zip(zip(*[plot_obj.recorder.records(i) for i in range(2)]), reference):
+            assert abs(der['p'] - der_ref['p']) < 1e-6 and abs(der['q'] - der_ref['q']) < 1e-6
+            assert vr['tap'] == vr_ref['tap'] and abs(vr['Vreg'] - vr_ref['Vreg']) < 1e-6
+
+    # Without VR_Model objects for the fractional time step, as their timers are advanced in one shot
+    @pytest.mark.parametrize("t_s, vrs", [(1, True), (0.1, False)])
+    def test_enter_service_delay(self, t_s, vrs):
+        # Reference simulation stepping through the trip and the enter service delay of 60 s after the fault
+        ckt_int = create_ckt_int(False, t_s, vrs)
+        k_end = round(100 / t_s)
+        reference = []
+        for k in range(k_end):
+            if 10 <= k * t_s < 15:
+                ckt_int.cmd('Edit Fault.F1 R=0.01')
+            else:
+                ckt_int.cmd('Edit Fault.F1 R=1000000')
+            ckt_int.run()
+            ckt_int.update_der_output_powers()
+            if vrs:
+                ckt_int.write_vr()
+            ckt_int.solve_power_flow()
+            reference.append(record(ckt_int))
+        der_time = ckt_int.der_objs[0].time
+
+        ckt_int = create_ckt_int(False, t_s, vrs)
+        driver = FastForwardDriver(ckt_int, state_tolerance=1e-9)
+        driver.add_event(10, lambda d: d.der_interface.cmd('Edit Fault.F1 R=0.01'))
+        driver.add_event(15, lambda d: d.der_interface.cmd('Edit Fault.F1 R=1000000'))
+        plot_obj = TimePlots(2, 1)
+
+        # Still tripped at 70 s, with the enter service delay counting
+        driver.run(70, plot_obj, lambda d: record(d.der_interface))
+        assert ckt_int.der_objs[0].der_status == 'Trip'
+        assert driver.jumped_steps * t_s > 15
+
+        driver.run(100, plot_obj, lambda d: record(d.der_interface))
+        plot_obj.close()
+
+        assert driver.steps == k_end
+        assert ckt_int.der_objs[0].time == der_time
+        assert list(zip(*[plot_obj.recorder.records(i) for i in range(2)])) == reference
+
+        # Tripped during the fault, then entering service again
+        assert reference[round(20 / t_s)][0]['p'] == 0
+        assert reference[-1][0]['p'] > 0
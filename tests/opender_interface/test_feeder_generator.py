@@ -0,0 +1,57 @@
+"""
+Copyright © 2023 Electric Power Research Institute, Inc. All rights reserved.
+
+Redistribution and use in source and binary forms, with or without modification,
+are permitted provided that the following conditions are met:
+· Redistributions of source code must retain the above copyright notice,
+  this list of conditions and the following disclaimer.
+· Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+· Neither the name of the EPRI nor the names of its contributors may be used
+  to endorse or promote products derived from this software without specific
+  prior written permission.
+"""
+
+import pytest
+from opender import DERCommonFileFormat
+from opender_interface import DERInterface, OpenDSSInterface, FeederGenerator
+
+
+class TestFeederGenerator:
+    def test_deterministic(self):
+        assert FeederGenerator(200, seed=1).generate() == FeederGenerator(200, seed=1).generate()
+        assert FeederGenerator(200, seed=1).generate() != FeederGenerator(200, seed=2).generate()
+
+    @pytest.mark.parametrize('der_type', ['pvsystem', 'generator', 'isource'])
+    def test_circuit(self, tmp_path, der_type):
+        generator = FeederGenerator(60, n_laterals=6, n_loads=40, n_ders=5, der_type=der_type, n_regulators=2, seed=3)
+        dss_file = generator.write(str(tmp_path))
+        assert dss_file.endswith('synthetic_60_3.dss')
+
+        ckt_int = DERInterface(OpenDSSInterface(dss_file), t_s=1, print_der=False)
+        ckt_int.initialize(DER_sim_type=der_type)
+        ckt_int.create_vr_objs()
+        ckt_int.create_opender_objs(p_pu=1, der_files=DERCommonFileFormat(NP_VA_MAX=300e3,
+                                                                          NP_P_MAX=300e3,
+                                                                          NP_Q_MAX_INJ=132e3,
+                                                                          NP_Q_MAX_ABS=132e3))
+        ckt_int.der_convergence_process()
+        buses = ckt_int.read_sys_voltage()
+
+        # source bus, 60 buses and 2 regulator output buses
+        assert len(buses) == 63
+        assert len(ckt_int.ckt.lines) == 60
+        assert len(ckt_int.ckt.loads) == 40
+        assert len(ckt_int.der_objs) == 5
+        assert len(ckt_int.vr_objs) == 6
+        assert buses['distance'].max() > 0
+        assert 0.95 < buses['Vpu_A'].min() and buses['Vpu_A'].max() < 1.1
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            FeederGenerator(10, n_laterals=10)
+        with pytest.raises(ValueError):
+            FeederGenerator(10, der_type='vsource')
+        with pytest.raises(ValueError):
+            FeederGenerator(10, n_ders=11).generate()
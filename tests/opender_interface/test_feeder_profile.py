@@ -0,0 +1,65 @@
+"""
+Copyright © 2023 Electric Power Research Institute, Inc. All rights reserved.
+
+Redistribution and use in source and binary forms, with or without modification,
+are permitted provided that the following conditions are met:
+· Redistributions of source code must retain the above copyright notice,
+  this list of conditions and the following disclaimer.
+· Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+· Neither the name of the EPRI nor the names of its contributors may be used
+  to endorse or promote products derived from this software without specific
+  prior written permission.
+"""
+
+import pytest
+import pathlib
+import os
+import numpy as np
+import matplotlib.pyplot as plt
+from opender_interface import OpenDSSInterface
+
+
+@pytest.fixture
+def ckt():
+    script_path = pathlib.Path(os.path.dirname(__file__))
+    ckt = OpenDSSInterface(str(script_path.joinpath("test_circuit.dss")))
+    ckt.initialize(DER_sim_type='generator')
+    ckt.solve_power_flow()
+    ckt.read_sys_voltage()
+    ckt.read_line_flow()
+    return ckt
+
+
+class TestFeederProfile:
+    def test_voltage_profile(self, ckt):
+        assert list(ckt.transformers['bus1']) == ['xfmr_g']
+        profile = ckt.plot_profile('voltage', phases='AB')
+
+        # line1, reg1a and line2, each drawn in one collection per phase
+        assert list(profile.collections) == ['A', 'B']
+        segments = profile.collections['A'].get_segments()
+        assert len(segments) == 3
+        assert np.isclose(segments[0][0][1], ckt.buses.loc['sub_src', 'Vpu_A'])
+
+        ckt.set_source_voltage(0.95)
+        ckt.solve_power_flow()
+        ckt.read_sys_voltage()
+        profile.update()
+        assert np.isclose(profile.markers['A'].get_ydata()[0], ckt.buses.loc['sub_src', 'Vpu_A'])
+        plt.close(profile.fig)
+
+    def test_power_profile(self, ckt):
+        profile = ckt.plot_profile('power')
+
+        # line2 is connected to line1 through the regulator
+        segments = profile.collections['A'].get_segments()
+        assert len(segments) == 1
+        assert np.isclose(segments[0][0][1], ckt.lines.loc['line1', 'flowS_A'].real)
+        plt.close(profile.fig)
+
+    def test_invalid(self, ckt):
+        with pytest.raises(ValueError):
+            ckt.plot_profile('current')
+
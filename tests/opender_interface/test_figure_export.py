@@ -0,0 +1,87 @@
+"""
+Copyright © 2023 Electric Power Research Institute, Inc. All rights reserved.
+
+Redistribution and use in source and binary forms, with or without modification,
+are permitted provided that the following conditions are met:
+· Redistributions of source code must retain the above copyright notice,
+  this list of conditions and the following disclaimer.
+· Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+· Neither the name of the EPRI nor the names of its contributors may be used
+  to endorse or promote products derived from this software without specific
+  prior written permission.
+"""
+
+import pytest
+import os
+import numpy as np
+import matplotlib.pyplot as plt
+from opender import DER_PV
+from opender_interface import FigureExporter, XYPlots
+from opender_interface import figure_export
+
+
+def make_ders(n):
+    ders = []
+    for i in range(n):
+        der_obj = DER_PV()
+        der_obj.name = f'DER{i}'
+        der_obj.update_der_input(p_dc_pu=1, v_pu=1 + i * 0.01, f=60)
+        der_obj.run()
+        ders.append(der_obj)
+    return ders
+
+
+class TestFigureExport:
+    @pytest.mark.parametrize('processes', [1, 2])
+    def test_export(self, tmp_path, processes):
+        ders = make_ders(4)
+        xyplot = XYPlots(ders[0])
+        for v in np.linspace(0.95, 1.1, 10):
+            ders[0].update_der_input(v_pu=v)
+            ders[0].run()
+            xyplot.add_point_to_plot()
+        xyplot.add_measurement_to_plot(V=1, P=0.5, Q=0.1, F=60)
+
+        figures_open = plt.get_fignums()
+        exporter = FigureExporter(figures=['pq', 'vq', 'fp'], processes=processes, dpi=50)
+        files = exporter.export([xyplot] + ders[1:], str(tmp_path))
+
+        assert len(files) == 12
+        assert all(os.path.getsize(file) > 0 for file in files)
+        assert os.path.join(str(tmp_path), 'DER3_fp.png') in files
+        assert exporter.report['ders'] == 4 and exporter.report['figures'] == 12
+        assert exporter.report['figures_per_second'] > 0
+        # no figure is left open
+        assert plt.get_fignums() == figures_open
+
+    def test_serial_backend(self, tmp_path, monkeypatch):
+        # rendered with Agg even if another backend is active, which is restored afterwards
+        backends = []
+        render = figure_export._render
+        monkeypatch.setattr(figure_export, '_render', lambda job: backends.append(plt.get_backend()) or render(job))
+        backend = plt.get_backend()
+        plt.switch_backend('svg')
+        try:
+            FigureExporter(figures=['pq'], processes=1, dpi=50).export(make_ders(2), str(tmp_path))
+            assert [name.lower() for name in backends] == ['agg', 'agg']
+            assert plt.get_backend() == 'svg'
+        finally:
+            plt.switch_backend(backend)
+
+    def test_close(self):
+        xyplot = XYPlots(make_ders(1)[0])
+        xyplot.add_point_to_plot()
+        figures_open = len(plt.get_fignums())
+        xyplot.prepare_vq_plot()
+        xyplot.prepare_vq_plot()
+        assert len(plt.get_fignums()) == figures_open + 1
+        xyplot.close()
+        assert len(plt.get_fignums()) == figures_open and xyplot.figures() == {}
+
+    def test_invalid(self, tmp_path):
+        with pytest.raises(ValueError):
+            FigureExporter(figures=['xy'])
+        with pytest.raises(ValueError):
+            FigureExporter(processes=1).export(make_ders(2), str(tmp_path), names=['a', 'a'])
@@ -0,0 +1,62 @@
+"""
+Copyright © 2023 Electric Power Research Institute, Inc. All rights reserved.
+
+Redistribution and use in source and binary forms, with or without modification,
+are permitted provided that the following conditions are met:
+· Redistributions of source code must retain the above copyright notice,
+  this list of conditions and the following disclaimer.
+· Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+· Neither the name of the EPRI nor the names of its contributors may be used
+  to endorse or promote products derived from this software without specific
+  prior written permission.
+"""
+
+import pytest
+import subprocess
+import sys
+
+# Budget of the import time of opender_interface modules themselves (s), excluding dependencies such as opender,
+# pandas and py_dss_interface
+IMPORT_BUDGET = 0.5
+
+
+def import_times(statement):
+    """
+    Import in a fresh interpreter, and return {module: self import time (s)} from -X importtime
+    """
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', statement], capture_output=True, text=True,
+                            check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if line.startswith('import time:') and not line.endswith('package'):
+            self_us, _, module = line[len('import time:'):].split('|')
+            times[module.strip()] = int(self_us) * 1e-6
+    return times
+
+
+class TestImports:
+    def test_core_import(self):
+        times = import_times('from opender_interface import DERInterface, OpenDSSInterface')
+        assert 'opender_interface.der_interface' in times
+        assert not [module for module in times if module.split('.')[0] == 'matplotlib']
+        assert not [module for module in times if module in ['opender_interface.time_plots',
+                                                             'opender_interface.xy_plot']]
+        assert sum(t for module, t in times.items() if module.startswith('opender_interface')) < IMPORT_BUDGET
+
+    @pytest.mark.parametrize('name, module', [
+        ('TimePlots', 'opender_interface.time_plots'),
+        ('CombinedTimePlots', 'opender_interface.time_plots'),
+        ('XYPlots', 'opender_interface.xy_plot'),
+        ('FigureExporter', 'opender_interface.figure_export'),
+    ])
+    def test_lazy_import(self, name, module):
+        import opender_interface
+        assert getattr(opender_interface, name).__module__ == module
+        assert name in dir(opender_interface)
+
+    def test_missing_attribute(self):
+        import opender_interface
+        with pytest.raises(AttributeError):
+            opender_interface.Missing
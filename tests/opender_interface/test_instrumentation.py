@@ -0,0 +1,224 @@
+"""
+Copyright © 2023 Electric Power Research Institute, Inc. All rights reserved.
+
+Redistribution and use in source and binary forms, with or without modification,
+are permitted provided that the following conditions are met:
+· Redistributions of source code must retain the above copyright notice,
+  this list of conditions and the following disclaimer.
+· Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+· Neither the name of the EPRI nor the names of its contributors may be used
+  to endorse or promote products derived from this software without specific
+  prior written permission.
+"""
+
+import pytest
+import pathlib
+import os
+import gzip
+import json
+import zlib
+import numpy as np
+from opender import DERCommonFileFormat
+from opender_interface import DERInterface, OpenDSSInterface, StageTimer, TraceWriter, CoSimService, LocalFederate, \
+    FastForwardDriver, MultirateScheduler
+
+
+@pytest.fixture
+def ckt_int():
+    script_path = pathlib.Path(os.path.dirname(__file__))
+    ckt = OpenDSSInterface(str(script_path.joinpath("test_circuit.dss")))
+    ckt_int = DERInterface(ckt, t_s=1, print_der=False)
+    ckt_int.cmd('New generator.PV1 Bus1=der.1.2.3 Phases=3, kV=12.47 kw=5000 kVA=5000 ')
+    ckt_int.initialize(DER_sim_type='generator')
+    ckt_int.create_vr_objs()
+    ckt_int.create_opender_objs(p_pu=0.5, der_files=DERCommonFileFormat(NP_VA_MAX=4000000,
+                                                                        NP_P_MAX=4000000,
+                                                                        NP_Q_MAX_INJ=1760000,
+                                                                        NP_Q_MAX_ABS=1760000))
+    return ckt_int
+
+
+class TestInstrumentation:
+    def test_stages(self, ckt_int):
+        timer = ckt_int.enable_timing()
+        ckt_int.der_convergence_process()
+        for _ in range(10):
+            ckt_int.run()
+            ckt_int.update_der_output_powers()
+            ckt_int.write_vr()
+            ckt_int.solve_power_flow()
+        ckt_int.read_line_flow()
+
+        report = ckt_int.timing_report()
+        for stage in ['der_step', 'vr_logic', 'read_voltage', 'write_der', 'solve', 'read_line_flow', 'read_vr',
+                      'write_vr', 'convergence', 'convergence_check']:
+            assert report.loc[stage, 'calls'] > 0
+        assert report.loc['read_line_flow', 'calls'] == 1
+        assert report.loc['write_vr', 'calls'] == 10
+        # self time excludes the nested stages
+        assert report.loc['convergence', 'self_s'] < report.loc['convergence', 'total_s']
+        assert np.isclose(report['self_share'].sum(), 1)
+        assert (report['p50_ms'] <= report['p99_ms']).all()
+        edges, counts = timer.histogram('solve')
+        assert counts.sum() == report.loc['solve', 'calls'] and len(edges) == len(counts)
+
+        # the class methods are restored when disabled
+        ckt_int.disable_timing()
+        assert 'run_ders' not in vars(ckt_int) and 'solve_power_flow' not in vars(ckt_int.ckt)
+        ckt_int.solve_power_flow()
+        assert ckt_int.timing_report().loc['solve', 'calls'] == report.loc['solve', 'calls']
+
+    def test_timer(self):
+        ticks = iter([0, 1, 3, 10])
+
+        class Obj:
+            def outer(self):
+                return self.inner() + 1
+
+            def inner(self):
+                return 1
+
+        obj = Obj()
+        timer = StageTimer(clock=lambda: next(ticks))
+        timer.instrument(obj, {'outer': 'outer', 'inner': 'inner'})
+        assert obj.outer() == 2
+        report = timer.report()
+        assert report.loc['outer', 'total_s'] == 10 and report.loc['outer', 'self_s'] == 8
+        assert report.loc['inner', 'total_s'] == 2
+
+        timer.reset()
+        assert timer.stages == []
+        timer.restore()
+        assert 'outer' not in vars(obj)
+
+    def test_not_enabled(self, ckt_int):
+        with pytest.raises(ValueError):
+            ckt_int.timing_report()
+
+    @pytest.mark.parametrize('file_name', ['trace.json', 'trace.json.gz'])
+    def test_tracing(self, ckt_int, tmp_path, file_name):
+        path = str(tmp_path.joinpath(file_name))
+        trace = ckt_int.enable_tracing(path)
+        ckt_int.der_convergence_process()
+        for t in range(3):
+            with ckt_int.timer.span('step', time=t):
+                ckt_int.run()
+                ckt_int.update_der_output_powers()
+                ckt_int.solve_power_flow()
+        ckt_int.disable_tracing()
+
+        with (gzip.open(path, 'rt') if file_name.endswith('.gz') else open(path)) as f:
+            events = json.load(f)
+        spans = [event for event in events if event['ph'] == 'X']
+        assert len(events) == trace.events and trace.dropped == 0
+        names = [event['name'] for event in spans]
+        assert names.count('step') == 3 and names.count('convergence') == 1
+        assert names.count('convergence_iteration') == ckt_int.convergence_iterations
+        for name in ['run', 'der_step', 'read_voltage', 'write_der', 'solve']:
+            assert name in names
+        assert [event['args']['time'] for event in spans if event['name'] == 'step'] == [0, 1, 2]
+        # nested spans are within their top-level span
+        step = [event for event in spans if event['name'] == 'step'][-1]
+        assert step['ts'] <= spans[-2]['ts'] and spans[-2]['ts'] + spans[-2]['dur'] <= step['ts'] + step['dur']
+
+        # timing enabled for the trace is disabled with it
+        assert ckt_int.timer is None and 'run' not in vars(ckt_int)
+
+    def test_trace_sampling(self, tmp_path):
+        ticks = iter(range(100))
+        timer = StageTimer(clock=lambda: next(ticks))
+        path = str(tmp_path.joinpath('trace.json'))
+        timer.trace = TraceWriter(path, every=3, slow=4, min_duration=2, max_events=8)
+        for t in range(7):
+            with timer.span('step', time=t):
+                with timer.span('solve'):
+                    if t == 4:
+                        # slow step, nested long enough to be kept
+                        next(ticks)
+                        next(ticks)
+        timer.trace.close()
+
+        with open(path) as f:
+            events = json.load(f)
+        assert [(event['name'], event.get('args', {}).get('time')) for event in events[1:]] == [
+            ('step', 0), ('step', 3), ('solve', None), ('step', 4), ('step', 6)]
+        assert timer.trace.roots == 7
+
+        with pytest.raises(ValueError):
+            TraceWriter(path, every=0)
+
+    @pytest.mark.parametrize('driver', ['cosim', 'fast_forward', 'multirate'])
+    def test_sampled_steps(self, ckt_int, tmp_path, driver):
+        ckt_int.der_convergence_process()
+        if driver == 'cosim':
+            service = CoSimService(ckt_int, LocalFederate())
+            step = lambda t: service.step(t, {})
+        else:
+            simulation = FastForwardDriver(ckt_int) if driver == 'fast_forward' else MultirateScheduler(ckt_int)
+            step = lambda t: simulation.step()
+
+        path = str(tmp_path.joinpath('trace.json'))
+        trace = ckt_int.enable_tracing(path, every=3)
+        for t in range(7):
+            step(t)
+        ckt_int.disable_tracing()
+
+        with open(path) as f:
+            spans = [event for event in json.load(f) if event['ph'] == 'X']
+        # every 3rd time step is written as a whole, with all the stages nested in it
+        steps = [event for event in spans if event['name'] == 'step']
+        assert trace.roots == 7 and len(steps) == 3
+        for step in steps:
+            nested = [event for event in spans if event['name'] != 'step'
+                      and step['ts'] <= event['ts'] and event['ts'] + event['dur'] <= step['ts'] + step['dur']]
+            assert nested
+        assert len(spans) == len(steps) + sum(
+            1 for event in spans if event['name'] != 'step'
+            and any(step['ts'] <= event['ts'] <= step['ts'] + step['dur'] for step in steps))
+
+    @pytest.mark.parametrize('file_name', ['trace.json', 'trace.json.gz'])
+    def test_unclosed_trace(self, tmp_path, file_name):
+        path = str(tmp_path.joinpath(file_name))
+        timer = StageTimer()
+        timer.trace = TraceWriter(path)
+        for t in range(50):
+            with timer.span('step', time=t):
+                with timer.span('solve'):
+                    pass
+
+        # written spans can be read while the file is still open, e.g. after an interrupted simulation
+        with open(path, 'rb') as f:
+            data = f.read()
+        if file_name.endswith('.gz'):
+            data = zlib.decompressobj(16 + zlib.MAX_WBITS).decompress(data)
+        events = json.loads(data.decode() + ']')
+        assert [event['name'] for event in events].count('step') == 50
+
+        timer.trace.close()
+        with (gzip.open(path, 'rt') if file_name.endswith('.gz') else open(path)) as f:
+            assert len(json.load(f)) == 101
+
+    def test_trace_context(self, tmp_path):
+        path = str(tmp_path.joinpath('trace.json'))
+        timer = StageTimer()
+        with TraceWriter(path) as trace:
+            timer.trace = trace
+            with timer.span('step', time=0):
+                pass
+        with open(path) as f:
+            assert [event['name'] for event in json.load(f)] == ['process_name', 'step']
+
+    def test_timing_while_tracing(self, ckt_int, tmp_path):
+        path = str(tmp_path.joinpath('trace.json'))
+        trace = ckt_int.enable_tracing(path)
+        timer = ckt_int.enable_timing()
+        assert timer.trace is trace
+        ckt_int.solve_power_flow()
+        ckt_int.disable_tracing()
+        # timing enabled explicitly is kept
+        assert ckt_int.timer is timer and ckt_int.timing_report().loc['solve', 'calls'] == 1
+
+        with open(path) as f:
+            assert 'solve' in [event['name'] for event in json.load(f)]
@@ -0,0 +1,86 @@
+"""
+Copyright © 2023 Electric Power Research Institute, Inc. All rights reserved.
+
+Redistribution and use in source and binary forms, with or without modification,
+are permitted provided that the following conditions are met:
+· Redistributions of source code must retain the above copyright notice,
+  this list of conditions and the following disclaimer.
+· Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+· Neither the name of the EPRI nor the names of its contributors may be used
+  to endorse or promote products derived from this software without specific
+  prior written permission.
+"""
+
+import pytest
+import pathlib
+import os
+from opender import DER, DER_PV, DERCommonFileFormat
+from opender_interface import DERInterface, OpenDSSInterface, MultirateScheduler, VR_Model
+
+
+def create_ckt_int():
+    script_path = pathlib.Path(os.path.dirname(__file__))
+    dss_file = script_path.joinpath("test_circuit.dss")
+
+    ckt = OpenDSSInterface(str(dss_file))
+    ckt_int = DERInterface(ckt, t_s=0.1, print_der=False)
+    ckt_int.cmd('New generator.PV1 Bus1=der.1.2.3 Phases=3, kV=12.47 kw=5000 kVA=5000 ')
+    ckt_int.initialize(DER_sim_type='generator')
+    ckt_int.create_vr_objs()
+    der_file = DERCommonFileFormat(NP_VA_MAX=4000000,
+                                   NP_P_MAX=4000000,
+                                   NP_Q_MAX_INJ=1760000,
+                                   NP_Q_MAX_ABS=1760000,
+                                   QV_MODE_ENABLE=True)
+    ckt_int.create_opender_objs(p_pu=0.2, der_files=der_file)
+    ckt_int.der_convergence_process()
+    ckt_int.update_der_p_pu([1])
+    return ckt_int
+
+
+class TestMultirateScheduler:
+    def test_single_rate(self):
+        # Reference simulation stepping everything at the base time step
+        ckt_int = create_ckt_int()
+        reference = []
+        for step in range(100):
+            ckt_int.run()
+            ckt_int.update_der_output_powers()
+            ckt_int.write_vr()
+            ckt_int.solve_power_flow()
+            reference.append((ckt_int.der_objs[0].p_out_kw, ckt_int.der_objs[0].q_out_kvar, ckt_int.vr_objs[0].tap))
+
+        ckt_int = create_ckt_int()
+        scheduler = MultirateScheduler(ckt_int)
+        results = []
+        scheduler.run(10, lambda s: results.append(
+            (ckt_int.der_objs[0].p_out_kw, ckt_int.der_objs[0].q_out_kvar, ckt_int.vr_objs[0].tap)))
+
+        assert scheduler.steps == 100
+        assert results == reference
+
+    def test_multirate(self):
+        ckt_int = create_ckt_int()
+        scheduler = MultirateScheduler(ckt_int, solve_t_s=0.5)
+        scheduler.set_step(DER_PV, 0.5)
+        scheduler.set_step(VR_Model, 1)
+        scheduler.set_step(ckt_int.der_objs[0], 0.2)
+
+        assert scheduler.get_step(ckt_int.der_objs[0]) == 0.2
+        assert scheduler.get_step(ckt_int.vr_objs[0]) == 1
+
+        time_ini = ckt_int.der_objs[0].time
+        scheduler.run(60)
+
+        assert abs(scheduler.time - 60) < 1e-9
+        assert scheduler.solves < 120
+        assert DER.t_s == 0.1
+        # VR time step is only changed while it runs in the scheduler
+        assert ckt_int.vr_objs[0].Ts == 0.1
+        assert abs(ckt_int.der_objs[0].time - time_ini - 60) < 1e-6
+        assert abs(ckt_int.der_objs[0].p_out_kw - 4000) < 1
+
+        with pytest.raises(ValueError):
+            scheduler.set_step(VR_Model, 0.25)
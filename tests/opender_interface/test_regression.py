@@ -0,0 +1,68 @@
+"""
+Copyright © 2023 Electric Power Research Institute, Inc. All rights reserved.
+
+Redistribution and use in source and binary forms, with or without modification,
+are permitted provided that the following conditions are met:
+· Redistributions of source code must retain the above copyright notice,
+  this list of conditions and the following disclaimer.
+· Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+· Neither the name of the EPRI nor the names of its contributors may be used
+  to endorse or promote products derived from this software without specific
+  prior written permission.
+"""
+
+import pytest
+import pathlib
+import os
+import sys
+
+sys.path.insert(0, str(pathlib.Path(os.path.dirname(__file__)).parents[1].joinpath('benchmarks')))
+import regression
+
+
+def results(median, iqr, convergence_iterations, duration=600):
+    return {'duration': duration,
+            'wall_time': {'median': median, 'iqr': iqr},
+            'max_rss_mb': None,
+            'counters': {'steps': 600, 'convergence_iterations': convergence_iterations}}
+
+
+class TestRegression:
+    @pytest.mark.parametrize('median, iqr, convergence_iterations, regressions', [
+        (1.05, 0.01, 100, []),  # within relative tolerance
+        (1.2, 0.01, 100, ['wall_time']),  # beyond relative tolerance and noise
+        (1.2, 0.1, 100, []),  # within noise of the current runs
+        (1.0, 0.01, 101, ['convergence_iterations']),  # one more convergence iteration
+        (0.5, 0.01, 90, []),  # improvement
+    ])
+    def test_compare(self, median, iqr, convergence_iterations, regressions):
+        findings = regression.compare(results(1.0, 0.02, 100), results(median, iqr, convergence_iterations))
+        assert [finding['metric'] for finding in findings] == ['wall_time', 'steps', 'convergence_iterations']
+        assert [finding['metric'] for finding in findings if finding['regression']] == regressions
+
+    def test_compare_duration(self):
+        with pytest.raises(ValueError):
+            regression.compare(results(1.0, 0.02, 100), results(1.0, 0.02, 100, duration=60))
+
+    def test_summarize(self):
+        summary = regression.summarize([1, 2, 3, 4, 100])
+        assert summary['median'] == 3
+        assert summary['iqr'] == 2
+        assert regression.summarize([None, None]) is None
+
+    def test_fingerprint(self):
+        assert regression.fingerprint() == regression.fingerprint()
+        assert len(regression.fingerprint()['key']) == 12
+
+    def test_run_scenario(self):
+        current = regression.run_scenario('ieee34_enter_service', repeat=2, duration=5, isolated=False)
+        assert current['counters']['steps'] == 5
+        assert current['counters']['convergence_iterations'] > 0
+        # power flow solutions of the time steps and of the convergence process
+        assert current['counters']['solves'] > current['counters']['steps']
+        assert len(current['wall_time']['samples']) == 2
+
+        findings = regression.compare(current, current)
+        assert not any(finding['regression'] for finding in findings)
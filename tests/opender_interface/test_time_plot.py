@@ -13,7 +13,9 @@ are permitted provided that the following conditions are met:
   prior written permission.
 """
 
+import os
 import pytest
+import opender.der
 # from opender import DER, DER_PV, DER_BESS
 from opender_interface import TimePlots
 from conftest import showplt
@@ -53,3 +55,25 @@ class TestTimePlot:
         timeplot.prepare_ani()
         if showplt:
             timeplot.show()
+
+    def test_time_plot_animation_save(self, tmp_path):
+        timeplot = TimePlots(2,1,['1','2'],['4','5'])
+
+        for i in range(10000):
+            timeplot.add_to_traces(
+                {
+                    'A':i,
+                    'B':i-1,
+                },
+                {
+                    'c':i*10
+                }
+            )
+        timeplot.prepare_ani(frames=20, max_points=500)
+        lines = timeplot.animate(19)
+        assert len(lines) == 3
+        assert lines[2].get_xdata()[-1] == 9999 * opender.der.DER.t_s
+        assert len(lines[0].get_xdata()) <= 500
+
+        path = timeplot.save_ani(str(tmp_path.joinpath('fig.gif')), fps=5)
+        assert os.path.getsize(path) > 0
@@ -0,0 +1,94 @@
+"""
+Copyright © 2023 Electric Power Research Institute, Inc. All rights reserved.
+
+Redistribution and use in source and binary forms, with or without modification,
+are permitted provided that the following conditions are met:
+· Redistributions of source code must retain the above copyright notice,
+  this list of conditions and the following disclaimer.
+· Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+· Neither the name of the EPRI nor the names of its contributors may be used
+  to endorse or promote products derived from this software without specific
+  prior written permission.
+"""
+
+import pytest
+import pickle
+import numpy as np
+import matplotlib.pyplot as plt
+from opender_interface import TimePlots, CombinedTimePlots, TraceFile
+
+
+def create_tplot(k):
+    tplot = TimePlots(2, 1, ['P', 'V'], ['kW', 'pu'])
+    for i in range(100):
+        tplot.add_to_traces({'A': i * k, 'B': -i}, {'c': i + k})
+    return tplot
+
+
+class TestTraceFile:
+    def test_save_load(self, tmp_path):
+        datapath = tmp_path.joinpath('traces.npz')
+        with create_tplot(1) as tplot:
+            tplot.prepare()
+            tplot.save(str(tmp_path.joinpath('fig.svg')), datapath=datapath, run_id='run1', units={'A': 'kW'})
+
+        with TraceFile(datapath) as trace_file:
+            assert trace_file.run_id == 'run1'
+            assert trace_file.channels == [['A', 'B'], ['c']]
+            assert [trace['units'] for trace in trace_file.traces] == ['kW', None, None]
+            assert trace_file.traces[2]['subplot'] == 1
+            assert list(trace_file.column(1, 'c')) == list(tplot.recorder.column(1, 'c'))
+            assert trace_file.read(0, ['B']).shape == (100, 1)
+            with pytest.raises(ValueError):
+                trace_file.column(1, 'A')
+
+        with TimePlots.load(datapath) as tplot_loaded:
+            assert tplot_loaded.title == ['P', 'V'] and tplot_loaded.ylabel == ['kW', 'pu']
+            for i in range(2):
+                assert tplot_loaded.traces[i].equals(tplot.traces[i])
+            tplot_loaded.prepare()
+
+    def test_close(self, tmp_path):
+        datapath = tmp_path.joinpath('traces.npz')
+        create_tplot(1).save_data(datapath)
+        figures_open = plt.get_fignums()
+        with TimePlots.load(datapath) as tplot:
+            tplot.prepare()
+            traces = tplot.traces
+        assert plt.get_fignums() == figures_open
+        # file is released, traces already accessed are kept
+        with pytest.raises(ValueError):
+            tplot.recorder.column(1, 'c')
+        assert list(traces[1]['c']) == list(create_tplot(1).traces[1]['c'])
+
+    def test_load_pickle(self, tmp_path):
+        # data files saved by earlier versions
+        tplot = create_tplot(1)
+        picklepath = tmp_path.joinpath('traces.pkl')
+        with open(picklepath, 'wb') as f:
+            pickle.dump(tplot.traces, f)
+
+        tplot_loaded = TimePlots.load_pickle(picklepath)
+        datapath = tmp_path.joinpath('traces.npz')
+        tplot_loaded.save_data(datapath)
+        with TimePlots.load(datapath) as tplot_converted:
+            for i in range(2):
+                assert tplot_loaded.traces[i].equals(tplot.traces[i])
+                assert np.array_equal(tplot_converted.traces[i].values, tplot.traces[i].values)
+
+    def test_combine_files(self, tmp_path):
+        figures_open = plt.get_fignums()
+        file_list = []
+        for k in range(3):
+            datapath = tmp_path.joinpath(f'run{k}.npz')
+            create_tplot(k).save_data(datapath, run_id=f'run{k}')
+            file_list.append(datapath)
+
+        with CombinedTimePlots(2, 1) as tplot:
+            tplot.combine_time_plots(file_list=file_list, trace_names=[['A'], ['c']])
+            assert list(tplot.traces[0].columns) == ['A (run0)', 'A (run1)', 'A (run2)']
+            assert list(tplot.traces[1]['c (run2)']) == [i + 2 for i in range(100)]
+            tplot.prepare()
+        assert plt.get_fignums() == figures_open
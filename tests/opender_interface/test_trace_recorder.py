@@ -0,0 +1,68 @@
+"""
+Copyright © 2023 Electric Power Research Institute, Inc. All rights reserved.
+
+Redistribution and use in source and binary forms, with or without modification,
+are permitted provided that the following conditions are met:
+· Redistributions of source code must retain the above copyright notice,
+  this list of conditions and the following disclaimer.
+· Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+· Neither the name of the EPRI nor the names of its contributors may be used
+  to endorse or promote products derived from this software without specific
+  prior written permission.
+"""
+
+import pytest
+import numpy as np
+from opender_interface import TraceRecorder, TimePlots, CombinedTimePlots
+
+
+class TestTraceRecorder:
+    @pytest.mark.parametrize("dtype", [np.float64, np.float32])
+    def test_append(self, dtype):
+        recorder = TraceRecorder(2, [['A', 'B'], ['c']], capacity=4, dtype=dtype)
+        for i in range(50):
+            recorder.append([i, i - 1], [i * 10])
+        recorder.repeat(10)
+
+        assert len(recorder) == 60
+        assert recorder.capacity == 64
+        assert recorder.column(0, 'A').dtype == dtype
+        assert list(recorder.column(0, 'A')) == list(range(50)) + [49] * 10
+        assert list(recorder.column(1, 'c')[:50]) == [i * 10 for i in range(50)]
+        assert list(recorder.to_frame(0).columns) == ['A', 'B']
+
+    def test_append_dicts(self):
+        recorder = TraceRecorder(2, capacity=1)
+        recorder.append_dicts({'A': 1, 'B': 2}, {'c': 3})
+        recorder.append_dicts({'A': 4, 'D': 5})
+        recorder.append_dicts({'B': None}, {'c': 6})
+
+        assert recorder.channels == [['A', 'B', 'D'], ['c']]
+        records = recorder.records(0)
+        assert records[0]['A'] == 1 and records[0]['B'] == 2 and np.isnan(records[0]['D'])
+        assert records[1]['A'] == 4 and records[1]['D'] == 5 and np.isnan(records[1]['B'])
+        assert np.isnan(records[2]['A']) and np.isnan(records[2]['B'])
+        assert np.isnan(recorder.column(1, 'c')[1]) and recorder.column(1, 'c')[2] == 6
+
+        with pytest.raises(ValueError):
+            recorder.append([1, 2, 3])
+
+    def test_time_plots(self):
+        tplot_dict = TimePlots(2, 1)
+        tplot_record = TimePlots(2, 1, channels=[['A', 'B'], ['c']], dtype=np.float32)
+        for i in range(50):
+            tplot_dict.add_to_traces({'A': i, 'B': i - 1}, {'c': i * 10})
+            tplot_record.record([i, i - 1], [i * 10])
+
+        for i in range(2):
+            assert (tplot_dict.traces[i] == tplot_record.traces[i]).all().all()
+
+        tplot_combined = CombinedTimePlots(2, 1)
+        tplot_combined.combine_time_plots([tplot_dict, tplot_record])
+        assert tplot_combined.traces[0].shape == (50, 4)
+        tplot_combined.prepare()
+        tplot_record.prepare()
+        tplot_combined.close()
+        tplot_record.close()
@@ -0,0 +1,85 @@
+"""
+Copyright © 2023 Electric Power Research Institute, Inc. All rights reserved.
+
+Redistribution and use in source and binary forms, with or without modification,
+are permitted provided that the following conditions are met:
+· Redistributions of source code must retain the above copyright notice,
+  this list of conditions and the following disclaimer.
+· Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+· Neither the name of the EPRI nor the names of its contributors may be used
+  to endorse or promote products derived from this software without specific
+  prior written permission.
+"""
+
+import pytest
+import numpy as np
+from opender_interface import TraceRecorder, TraceStore, TimePlots, CombinedTimePlots
+
+
+class TestTraceStore:
+    @pytest.mark.parametrize("dtype", [np.float64, np.float32])
+    def test_store(self, tmp_path, dtype):
+        recorder = TraceRecorder(2, [['A', 'B'], ['c']], dtype=dtype)
+        store = TraceStore.create(tmp_path, [['A', 'B'], ['c']], dtype=dtype, capacity=4, t_s=0.5)
+        for i in range(50):
+            recorder.append_dicts({'A': i, 'B': None}, {'c': i * 10})
+            store.append_dicts({'A': i, 'B': None}, {'c': i * 10})
+            if i % 10 == 0:
+                recorder.repeat(3)
+                store.repeat(3)
+        store.close()
+
+        store = TraceStore(tmp_path)
+        assert len(store) == len(recorder) == 65
+        assert store.capacity == 128
+        assert store.column(0, 'A').dtype == dtype
+        assert list(store.time) == [0.5 * i for i in range(65)]
+        for group in range(2):
+            assert store.to_frame(group).equals(recorder.to_frame(group))
+
+        # Time range read
+        frame = store.read(0, ['A'], t_start=10, t_end=12)
+        assert list(frame.index) == [10, 10.5, 11, 11.5, 12]
+        assert list(frame['A']) == list(store.column(0, 'A')[20:25])
+        assert list(store.column(1, 'c', t_start=31.8)) == list(recorder.column(1, 'c')[64:])
+
+        with pytest.raises(ValueError):
+            store.append([1, 2], [3])
+        with pytest.raises(ValueError):
+            TraceStore.create(tmp_path, [['A']])
+
+    def test_time(self, tmp_path):
+        with TraceStore.create(tmp_path, [['A']]) as store:
+            for t in [0, 1, 5, 6]:
+                store.append([t * 2], t=t)
+            with pytest.raises(ValueError):
+                store.append([0], t=2)
+            with pytest.raises(ValueError):
+                store.append_dicts({'D': 0})
+
+        store = TraceStore(tmp_path, mode='r+')
+        assert store.index_range(1, 5) == (1, 3)
+        store.append([14])
+        assert list(store.time) == [0, 1, 5, 6, 7]
+
+    def test_time_plots(self, tmp_path):
+        stores = []
+        for k in range(2):
+            store = TraceStore.create(tmp_path.joinpath(f'run{k}'), [[f'A{k}'], [f'c{k}']], capacity=16)
+            for i in range(100):
+                store.append([i * k], [i + k], t=i + k * 10)
+            stores.append(store)
+
+        tplot = TimePlots(2, 1, recorder=stores[0])
+        tplot.prepare()
+        assert list(tplot.axes[0].lines[0].get_xdata()) == list(range(100))
+
+        tplot_combined = CombinedTimePlots(2, 1)
+        tplot_combined.combine_time_plots(store_list=stores, t_start=20, t_end=50)
+        assert tplot_combined.traces[0].shape == (31, 2)
+        tplot_combined.prepare()
+        assert list(tplot_combined.axes[1].lines[1].get_xdata()) == list(range(20, 51))
+        tplot_combined.close()
+        tplot.close()
@@ -0,0 +1,61 @@
+"""
+Copyright © 2023 Electric Power Research Institute, Inc. All rights reserved.
+
+Redistribution and use in source and binary forms, with or without modification,
+are permitted provided that the following conditions are met:
+· Redistributions of source code must retain the above copyright notice,
+  this list of conditions and the following disclaimer.
+· Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+· Neither the name of the EPRI nor the names of its contributors may be used
+  to endorse or promote products derived from this software without specific
+  prior written permission.
+"""
+
+import pytest
+import numpy as np
+from opender_interface import TraceRecorder, StreamingTraceRecorder, TimePlots
+
+
+class TestStreamingTraceRecorder:
+    @pytest.mark.parametrize("chunk_size", [1, 7, 1000])
+    def test_stream(self, tmp_path, chunk_size):
+        recorder = TraceRecorder(2)
+        stream = StreamingTraceRecorder(tmp_path, 2, [['A'], ['c']], chunk_size=chunk_size)
+        for i in range(50):
+            traces = ({'A': i, 'B': i - 1} if i >= 20 else {'A': i}, {'c': i * 10})
+            recorder.append_dicts(*traces)
+            stream.append_dicts(*traces)
+            if i % 10 == 0:
+                recorder.repeat(i)
+                stream.repeat(i)
+
+        assert len(stream) == len(recorder) == 150
+        assert len(stream.chunks) == 150 // chunk_size
+        for group in range(2):
+            assert stream.channels[group] == recorder.channels[group]
+            assert stream.to_frame(group).equals(recorder.to_frame(group))
+
+    def test_resume(self, tmp_path):
+        stream = StreamingTraceRecorder(tmp_path, 1, [['A']], chunk_size=10)
+        for i in range(25):
+            stream.append([i])
+        # Unflushed time steps are lost, e.g. in a crash
+        del stream
+
+        with pytest.raises(ValueError):
+            StreamingTraceRecorder(tmp_path, 1, [['A']], chunk_size=10)
+
+        with StreamingTraceRecorder(tmp_path, chunk_size=10, resume=True) as stream:
+            assert len(stream) == 20
+            for i in range(20, 30):
+                stream.append([i])
+
+        stream = StreamingTraceRecorder(tmp_path, resume=True)
+        assert list(stream.column(0, 'A')) == list(range(30))
+
+        tplot = TimePlots(1, 1, recorder=stream)
+        assert list(tplot.traces[0]['A']) == list(range(30))
+        tplot.prepare()
+        tplot.close()
@@ -0,0 +1,155 @@
+"""
+Copyright © 2023 Electric Power Research Institute, Inc. All rights reserved.
+
+Redistribution and use in source and binary forms, with or without modification,
+are permitted provided that the following conditions are met:
+· Redistributions of source code must retain the above copyright notice,
+  this list of conditions and the following disclaimer.
+· Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+· Neither the name of the EPRI nor the names of its contributors may be used
+  to endorse or promote products derived from this software without specific
+  prior written permission.
+"""
+
+import pytest
+import pathlib
+import os
+import numpy as np
+from opender import DERCommonFileFormat
+from opender_interface import DERInterface, OpenDSSInterface, VR_Model, VRBank
+
+
+def create_vr_objs(rng, n, Ts):
+    return [VR_Model(name=f'vr{i}',
+                     Ts=Ts,
+                     Td_ctrl=rng.choice([0, 5, 30]),
+                     Td_tap=rng.choice([0, 2, 5]),
+                     Vref=rng.uniform(118, 122),
+                     db=rng.uniform(1, 3),
+                     LDC_R=rng.uniform(0, 3),
+                     LDC_X=rng.uniform(0, 3),
+                     PT_Ratio=60,
+                     CT_Primary=100,
+                     tap_max=4,
+                     tap_min=-4,
+                     tap_ini=rng.integers(-4, 5))
+            for i in range(n)]
+
+
+def assert_identical(bank, vr_objs):
+    for i, vr in enumerate(vr_objs):
+        assert bank.tap[i] == vr.tap and bank.tap.dtype.kind == 'i'
+        assert bank.Ti_ctrl[i] == vr.Ti_ctrl
+        assert bank.Ti_tap[i] == vr.Ti_tap
+        assert VRBank.STATES[bank.state[i]] == vr.state
+        assert bank.total_sw[i] == vr.total_sw
+        assert bank.Vreg[i] == vr.Vreg
+
+
+class TestVRBank:
+    @pytest.mark.parametrize("Ts", [0.1, 1])
+    def test_vreg(self, Ts):
+        rng = np.random.default_rng(0)
+        vr_objs = create_vr_objs(rng, 20, Ts)
+        bank = VRBank(vr_objs)
+
+        Vreg = np.full(len(vr_objs), 120.0)
+        for step in range(1000):
+            Vreg = Vreg + rng.normal(0, 0.3, len(vr_objs))
+            for vr, v in zip(vr_objs, Vreg):
+                vr.run(Vreg=v)
+            bank.run(Vreg=Vreg)
+            assert_identical(bank, vr_objs)
+
+    def test_vpri_ipri(self):
+        rng = np.random.default_rng(1)
+        vr_objs = create_vr_objs(rng, 6, 1)
+        bank = VRBank(vr_objs)
+
+        for step in range(200):
+            # Regulators with 3 or 1 phase, with or without current measurements
+            Vpri = [list(7200 * rng.uniform(0.95, 1.05, 3 if i % 2 else 1) * np.exp(1j * rng.uniform(-3, 3)))
+                    for i in range(len(vr_objs))]
+            Ipri = [list(rng.uniform(50, 100, len(v)) * np.exp(1j * rng.uniform(-3, 3))) if i % 3 else []
+                    for i, v in enumerate(Vpri)]
+            for vr, v, i in zip(vr_objs, Vpri, Ipri):
+                vr.run(Vpri=v, Ipri=i)
+            bank.run(Vpri=Vpri, Ipri=Ipri)
+            assert_identical(bank, vr_objs)
+
+    def test_der_interface(self):
+        script_path = pathlib.Path(os.path.dirname(__file__))
+        dss_file = script_path.joinpath("test_circuit.dss")
+
+        taps = []
+        for bank in [False, True]:
+            ckt = OpenDSSInterface(str(dss_file))
+            ckt_int = DERInterface(ckt, t_s=1, print_der=False)
+            ckt_int.cmd('New generator.PV1 Bus1=der.1.2.3 Phases=3, kV=12.47 kw=5000 kVA=5000 ')
+            ckt_int.initialize(DER_sim_type='generator')
+            ckt_int.create_vr_objs(bank=bank)
+            ckt_int.create_opender_objs(p_pu=0.5, der_files=DERCommonFileFormat(NP_VA_MAX=4000000,
+                                                                                NP_P_MAX=4000000,
+                                                                                NP_Q_MAX_INJ=1760000,
+                                                                                NP_Q_MAX_ABS=1760000))
+            ckt_int.der_convergence_process()
+            ckt_int.set_source_voltage(0.9)
+
+            result = []
+            for step in range(100):
+                ckt_int.run()
+                ckt_int.update_der_output_powers()
+                ckt_int.write_vr()
+                ckt_int.solve_power_flow()
+                result.append([vr.tap for vr in ckt_int.vr_objs])
+            taps.append(result)
+            # tap positions written back from the bank are kept as integers, e.g. for CoSimService.observe()
+            assert all(type(vr.tap) is int for vr in ckt_int.vr_objs)
+
+        assert taps[0] == taps[1]
+        assert taps[1][-1] != taps[1][0]
+
+    def test_mixed_stepping(self):
+        # VR_Model objects run directly (e.g. by MultirateScheduler or FastForwardDriver) between bank calculations
+        script_path = pathlib.Path(os.path.dirname(__file__))
+        dss_file = script_path.joinpath("test_circuit.dss")
+
+        results = []
+        for bank in [False, True]:
+            ckt = OpenDSSInterface(str(dss_file))
+            ckt_int = DERInterface(ckt, t_s=1, print_der=False)
+            ckt_int.cmd('New generator.PV1 Bus1=der.1.2.3 Phases=3, kV=12.47 kw=5000 kVA=5000 ')
+            ckt_int.initialize(DER_sim_type='generator')
+            ckt_int.create_vr_objs(bank=bank)
+            ckt_int.create_opender_objs(p_pu=0.5, der_files=DERCommonFileFormat(NP_VA_MAX=4000000,
+                                                                                NP_P_MAX=4000000,
+                                                                                NP_Q_MAX_INJ=1760000,
+                                                                                NP_Q_MAX_ABS=1760000))
+            ckt_int.der_convergence_process()
+            ckt_int.set_source_voltage(0.9)
+
+            # changes made outside the bank are kept
+            ckt_int.vr_objs[0].tap = 3
+            ckt_int.vr_objs[0].total_sw = 7
+            ckt_int.write_vr()
+            ckt_int.solve_power_flow()
+            ckt_int.run()
+            assert ckt_int.vr_objs[0].tap in [2, 3, 4] and ckt_int.vr_objs[0].total_sw >= 7
+
+            result = []
+            for step in range(100):
+                if step % 3 == 0:
+                    ckt_int.run()
+                else:
+                    for vr in ckt_int.vr_objs:
+                        Vpri, Ipri = ckt_int.read_vr_v_i(vr.name)
+                        vr.run(Vpri=Vpri, Ipri=Ipri)
+                ckt_int.write_vr()
+                ckt_int.solve_power_flow()
+                result.append([(vr.tap, vr.Ti_ctrl, vr.Ti_tap, vr.state, vr.total_sw) for vr in ckt_int.vr_objs])
+            results.append(result)
+
+        assert results[0] == results[1]
+        assert results[1][-1][0][4] > 7
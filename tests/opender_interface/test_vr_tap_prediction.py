@@ -0,0 +1,95 @@
+"""
+Copyright © 2023 Electric Power Research Institute, Inc. All rights reserved.
+
+Redistribution and use in source and binary forms, with or without modification,
+are permitted provided that the following conditions are met:
+· Redistributions of source code must retain the above copyright notice,
+  this list of conditions and the following disclaimer.
+· Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+· Neither the name of the EPRI nor the names of its contributors may be used
+  to endorse or promote products derived from this software without specific
+  prior written permission.
+"""
+
+import pytest
+import math
+import copy
+import numpy as np
+from opender_interface import VR_Model, VRBank
+
+
+def create_vr_objs(rng, n, Ts):
+    vr_objs = [VR_Model(name=f'vr{i}',
+                        Ts=Ts,
+                        Td_ctrl=rng.choice([0, 5, 30]),
+                        Td_tap=rng.choice([0, 2, 5]),
+                        Vref=120,
+                        db=2,
+                        tap_max=2,
+                        tap_min=-2,
+                        tap_ini=rng.integers(-2, 3))
+               for i in range(n)]
+    # Bring the regulators to random states
+    for vr in vr_objs:
+        for _ in range(rng.integers(0, 20)):
+            vr.run(Vreg=rng.choice([118, 120, 122]))
+    return vr_objs
+
+
+def simulate_to_tap(vr, Vreg, t_max=100):
+    vr = copy.deepcopy(vr)
+    tap = vr.tap
+    t = 0
+    while t < t_max:
+        vr.run(Vreg=Vreg)
+        t = t + vr.Ts
+        if vr.tap != tap:
+            return t
+    return math.inf
+
+
+class TestVRTapPrediction:
+    @pytest.mark.parametrize("Ts", [0.5, 1])
+    def test_time_to_next_tap(self, Ts):
+        rng = np.random.default_rng(0)
+        vr_objs = create_vr_objs(rng, 50, Ts)
+        Vreg = rng.choice([118, 118.5, 120, 121.5, 122], len(vr_objs))
+        bank = VRBank(vr_objs)
+
+        for vr, v, t_bank in zip(vr_objs, Vreg, bank.time_to_next_tap(Vreg)):
+            assert vr.time_to_next_tap(v) == simulate_to_tap(vr, v)
+            assert t_bank == vr.time_to_next_tap(v)
+
+    @pytest.mark.parametrize("Ts", [0.5, 1])
+    def test_advance(self, Ts):
+        rng = np.random.default_rng(1)
+        vr_objs = create_vr_objs(rng, 50, Ts)
+        Vreg = rng.choice([118, 118.5, 120, 121.5, 122], len(vr_objs))
+        bank = VRBank(vr_objs)
+        dt = min(min(vr.time_to_next_tap(v) for vr, v in zip(vr_objs, Vreg)), 50) - Ts
+        bank.advance(dt, Vreg)
+
+        for i, (vr, v) in enumerate(zip(vr_objs, Vreg)):
+            vr_ref = copy.deepcopy(vr)
+            for _ in range(round(dt / Ts)):
+                vr_ref.run(Vreg=v)
+            vr.advance(dt, v)
+            assert (vr.tap, vr.Ti_ctrl, vr.Ti_tap, vr.state, vr.Vreg) \
+                   == (vr_ref.tap, vr_ref.Ti_ctrl, vr_ref.Ti_tap, vr_ref.state, vr_ref.Vreg)
+            assert (bank.tap[i], bank.Ti_ctrl[i], bank.Ti_tap[i], VRBank.STATES[bank.state[i]], bank.Vreg[i]) \
+                   == (vr_ref.tap, vr_ref.Ti_ctrl, vr_ref.Ti_tap, vr_ref.state, vr_ref.Vreg)
+
+    def test_advance_error(self):
+        vr = VR_Model(name='vr', Ts=1, Td_ctrl=30, Td_tap=2)
+        vr.run(Vreg=122)
+        assert vr.time_to_next_tap() == 31
+        vr.advance(30)
+        with pytest.raises(ValueError):
+            vr.advance(1)
+        with pytest.raises(ValueError):
+            vr.advance(0.5)
+        vr.run(Vreg=122)
+        assert vr.tap == -1
+        assert vr.time_to_next_tap(120) == math.inf
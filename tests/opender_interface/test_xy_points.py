@@ -0,0 +1,64 @@
+"""
+Copyright © 2023 Electric Power Research Institute, Inc. All rights reserved.
+
+Redistribution and use in source and binary forms, with or without modification,
+are permitted provided that the following conditions are met:
+· Redistributions of source code must retain the above copyright notice,
+  this list of conditions and the following disclaimer.
+· Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+· Neither the name of the EPRI nor the names of its contributors may be used
+  to endorse or promote products derived from this software without specific
+  prior written permission.
+"""
+
+import pytest
+import numpy as np
+from opender import DER_PV
+from opender_interface import XYPlots
+
+
+class TestXYPoints:
+    def test_points(self):
+        der_obj = DER_PV()
+        der_obj.der_file.QV_MODE_ENABLE = True
+        xyplot = XYPlots(der_obj, point_fields={'p_out_kw': lambda der: der.p_out_kw})
+
+        for v in np.linspace(0.95, 1.1, 20):
+            der_obj.update_der_input(p_dc_pu=1, v_pu=v, f=60)
+            der_obj.run()
+            xyplot.add_point_to_plot()
+        xyplot.add_point_field('time', lambda der: der.time)
+        xyplot.add_point_to_plot()
+
+        assert len(xyplot.points) == 21
+        assert xyplot.point_values('v_meas_pu')[-1] == der_obj.der_input.v_meas_pu
+        assert xyplot.point_values('q_out_pu')[-1] == der_obj.q_out_pu
+        assert xyplot.point_values('p_out_kw')[-1] == der_obj.p_out_kw
+        assert (xyplot.point_values('QV_MODE_ENABLE') == 1).all()
+        assert (xyplot.point_values('CONST_PF_MODE_ENABLE') == 0).all()
+        assert np.isnan(xyplot.point_values('time')[0]) and xyplot.point_values('time')[-1] == der_obj.time
+
+        xyplot.prepare_vq_plot()
+        # all stored points are drawn as one collection
+        assert len(xyplot.ax_vq.collections) == 1
+        assert len(xyplot.ax_vq.collections[0].get_offsets()) == 21
+        xyplot.close()
+
+    @pytest.mark.parametrize('prepare', ['prepare_pq_plot', 'prepare_vq_plot', 'prepare_vp_plot'])
+    def test_batched_scatter(self, prepare):
+        der_obj = DER_PV()
+        xyplot = XYPlots(der_obj)
+        for v in np.linspace(0.9, 1.1, 2000):
+            der_obj.update_der_input(p_dc_pu=1, v_pu=v, f=60)
+            der_obj.run()
+            xyplot.add_point_to_plot()
+            xyplot.add_measurement_to_plot(V=v, P=0.5, Q=None)
+
+        getattr(xyplot, prepare)()
+        ax = {'prepare_pq_plot': xyplot.ax_pq, 'prepare_vq_plot': xyplot.ax_vq, 'prepare_vp_plot': xyplot.ax_vp}[prepare]
+        assert len(ax.collections) == 2
+        assert [len(collection.get_offsets()) for collection in ax.collections] == [2000, 2000]
+        xyplot.close()
+